@@ -36,6 +36,12 @@ setup(
     python_requires=">=3.9",
     install_requires=requirements,
     extras_require={
+        "arrow": [
+            "pyarrow>=10.0",
+        ],
+        "polars": [
+            "polars>=1.0",
+        ],
         "dev": [
             "pytest>=6.0",
             "pytest-cov",
@@ -43,6 +49,11 @@ setup(
             "flake8",
         ],
     },
+    entry_points={
+        "console_scripts": [
+            "pywib=pywib.cli:main",
+        ],
+    },
     include_package_data=True,
     zip_safe=False,
 )
\ No newline at end of file
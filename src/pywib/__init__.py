@@ -8,12 +8,25 @@ __email__ = "carvajalguillermo@uniovi.es"
 from .constants import *
 from .utils import (validate_dataframe, validate_dataframe_keyboard, 
                     extract_traces_by_session, visualize_trace, compute_space_time_diff, 
-                    video_from_trace, validate_duplicate_timestamps, keyboard_heatmap)
+                    video_from_trace, validate_duplicate_timestamps, keyboard_heatmap,
+                    replay_frames, replay_session, keyboard_counts, keyboard_heatmaps,
+                    read_interactions, iter_interactions, columns_for_metrics,
+                    chunked_metrics, iter_chunks, ChunkedAggregator, IncrementalSession,
+                    TraceSet, write_traces, DiskCache, SessionIndex, rolling_metrics,
+                    rdp_mask, simplify_trace, simplify_traces, render_traces, render_sessions,
+                    DensityHeatmap, lttb_indices, downsample_trace,
+                    dtw_distance, lb_kim, lb_keogh, dtw_nearest, dtw_matrix,
+                    KLLSketch, MetricState, PauseState, DeviationState, ClickSlipState, TypingSpeedState,
+                    merge_states, finalize_states)
 from .core import (velocity, acceleration, jerkiness, path, auc, 
                    execution_time, movement_time, pauses_metrics, velocity_metrics, 
                    acceleration_metrics, jerkiness_metrics, number_of_clicks, 
-                   click_slip, num_pauses, deviations,
+                   click_slip, num_pauses, deviations, event_counts,
+                   trajectory_geometry, geometry_metrics, fitts_traces, fitts_metrics,
                      typing_speed_metrics, typing_speed, backspace_usage, typing_durations)
+from .streaming import StreamPipeline, LocalEventSource, stream_metrics
+from .features import session_features
+from .store import FeatureStore, session_hashes
 
 __all__ = [
     # Version info
@@ -32,8 +45,53 @@ __all__ = [
     "compute_space_time_diff",
     "extract_traces_by_session",
     "video_from_trace",
+    "replay_frames",
+    "replay_session",
     "validate_duplicate_timestamps",
     "keyboard_heatmap",
+    "keyboard_counts",
+    "keyboard_heatmaps",
+    "read_interactions",
+    "iter_interactions",
+    "columns_for_metrics",
+    "chunked_metrics",
+    "iter_chunks",
+    "ChunkedAggregator",
+    "IncrementalSession",
+    "TraceSet",
+    "write_traces",
+    "DiskCache",
+    "SessionIndex",
+    "rolling_metrics",
+    "rdp_mask",
+    "simplify_trace",
+    "simplify_traces",
+    "render_traces",
+    "render_sessions",
+    "DensityHeatmap",
+    "lttb_indices",
+    "downsample_trace",
+    "dtw_distance",
+    "lb_kim",
+    "lb_keogh",
+    "dtw_nearest",
+    "dtw_matrix",
+    "StreamPipeline",
+    "LocalEventSource",
+    "stream_metrics",
+    "session_features",
+    "FeatureStore",
+    "session_hashes",
+
+    # Mergeable metric states
+    "KLLSketch",
+    "MetricState",
+    "PauseState",
+    "DeviationState",
+    "ClickSlipState",
+    "TypingSpeedState",
+    "merge_states",
+    "finalize_states",
 
     # Movement functions
     "velocity",
@@ -44,12 +102,19 @@ __all__ = [
     "acceleration_metrics",
     "jerkiness_metrics",
     "deviations",
+    "trajectory_geometry",
+    "geometry_metrics",
+    "fitts_traces",
+    "fitts_metrics",
     "auc",
 
     # Mouse functions
     "number_of_clicks",
     "click_slip",
 
+    # Event functions
+    "event_counts",
+
     # Keyboard functions
     "typing_speed",
     "typing_speed_metrics",
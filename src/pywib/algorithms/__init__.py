@@ -0,0 +1,12 @@
+"""
+Algorithms built on top of the PyWib metrics
+"""
+from .patterns import obtain_straight_patterns, PATTERNS, trace_features, check_patterns, detect_patterns
+
+__all__ = [
+    "obtain_straight_patterns",
+    "PATTERNS",
+    "trace_features",
+    "check_patterns",
+    "detect_patterns",
+]
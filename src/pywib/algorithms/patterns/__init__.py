@@ -0,0 +1,13 @@
+"""
+Interaction patterns detected over the traces of every session
+"""
+from .straight_pattern import obtain_straight_patterns
+from .engine import PATTERNS, trace_features, check_patterns, detect_patterns
+
+__all__ = [
+    "obtain_straight_patterns",
+    "PATTERNS",
+    "trace_features",
+    "check_patterns",
+    "detect_patterns",
+]
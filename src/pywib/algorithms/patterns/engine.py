@@ -0,0 +1,180 @@
+import numpy as np
+import pandas as pd
+from pywib.constants import ColumnNames
+from pywib.utils import validate_dataframe
+from pywib.utils.movement import _execution_auc_batch
+from pywib.utils.segmentation import _move_runs, _ends_in_click, _run_points
+
+TRACE_ID = "trace_id"
+
+# Fraction of the maximum velocity of a trace above which a local maximum counts as a velocity peak
+_PEAK_RATIO = 0.5
+
+# Mouse-behavior patterns, as vectorized predicates over the table of trace_features
+PATTERNS = {
+    # Pause before a direct movement to the target, as in obtain_straight_patterns
+    "straight": lambda f: f["ends_in_click"] & f["initial_pause"] & (f["num_pauses"] == 1) & (f["auc"] <= 100),
+    # Approach to a target split by pauses or sub-movements
+    "hesitation": lambda f: f["ends_in_click"] & ((f["num_pauses"] >= 2) | (f["velocity_peaks"] >= 3)),
+    # Back and forth horizontal movement, as when following the text being read
+    "zigzag": lambda f: (f["x_reversals"] >= 4) & (f["path_length"] >= 2 * f["distance"]),
+    # Long wandering movement that does not end on a target
+    "exploratory": lambda f: ~f["ends_in_click"] & (f["path_length"] >= 300) & (f["path_length"] >= 3 * f["distance"]),
+    # The target is passed and the pointer comes back to click it
+    "overshoot": lambda f: f["ends_in_click"] & (f["overshoot_distance"] >= 20),
+}
+
+
+def _segment_counts(values: np.ndarray, trace: np.ndarray, num_traces: int) -> np.ndarray:
+    return np.bincount(trace[values], minlength=num_traces)
+
+
+def _reversals(delta: np.ndarray, segment_trace: np.ndarray, num_traces: int) -> np.ndarray:
+    """
+    Number of sign changes of the non zero deltas of every trace.
+    """
+    moving = np.flatnonzero(delta != 0)
+    sign = np.sign(delta[moving])
+    trace = segment_trace[moving]
+    change = (sign[1:] != sign[:-1]) & (trace[1:] == trace[:-1])
+    return np.bincount(trace[1:][change], minlength=num_traces)
+
+
+def trace_features(df: pd.DataFrame, pause_threshold: float = 200) -> pd.DataFrame:
+    """
+    Features of every movement trace of every session, shared by the patterns of :py:func:`detect_patterns`.
+
+    The traces are the runs of two or more moves of :py:func:`~pywib.extract_traces_by_session`, processed as flat
+    arrays of points for all the sessions at once.
+
+    Parameters:
+        df (pd.DataFrame): DataFrame containing 'sessionId', 'eventType', 'timeStamp', 'x', and 'y' columns.
+        pause_threshold (float): Time (in ms) between two moves to consider a pause. Default is 200.
+    Returns:
+        pd.DataFrame: One row per trace with the 'sessionId' and 'trace_id' (position of the trace in the list of its
+                      session), 'num_points', 'duration' (ms), 'distance' (straight-line distance between the
+                      endpoints), 'path_length', 'mean_velocity', 'max_velocity', 'velocity_peaks' (local maxima above
+                      half the maximum velocity), 'auc' (execution-deviation AUC), 'num_pauses', 'initial_pause'
+                      (whether the first interval is a pause), 'max_pause', 'x_reversals' and 'y_reversals' (changes
+                      of horizontal and vertical direction), 'overshoot_distance' (px travelled past the end along the
+                      straight line) and 'ends_in_click' (followed by a click, mouse down or mouse up).
+    """
+    validate_dataframe(df)
+    runs = _move_runs(df)
+    selected = runs["lengths"] > 1
+    x, y, offsets = _run_points(df, runs, selected)
+    codes = runs["codes"][runs["start_rows"][selected]]
+    lengths = runs["lengths"][selected]
+    rows = runs["moves"][np.repeat(runs["starts"][selected] - offsets[:-1], lengths) + np.arange(offsets[-1])]
+    t = runs["time_stamp"][rows]
+    num_traces = len(lengths)
+    first, last = offsets[:-1], offsets[1:] - 1
+    trace = np.repeat(np.arange(num_traces), lengths)
+
+    # Segments between consecutive points, those between two traces are masked out
+    segment_trace = trace[:-1]
+    same_trace = trace[1:] == segment_trace
+    dx = np.where(same_trace, np.diff(x), 0.0)
+    dy = np.where(same_trace, np.diff(y), 0.0)
+    dt = np.where(same_trace, np.diff(t), 0.0)
+    ds = np.sqrt(dx * dx + dy * dy)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        velocity = np.where(dt > 0, ds / dt, 0.0)
+    segment_starts = np.minimum(first, max(len(ds) - 1, 0))
+
+    path_length = np.bincount(segment_trace, weights=ds, minlength=num_traces)
+    duration = t[last] - t[first]
+    auc, distance = _execution_auc_batch(x, y, offsets)
+    is_pause = dt > pause_threshold
+    max_velocity = np.maximum.reduceat(velocity, segment_starts) if num_traces else np.zeros(0)
+
+    # Velocity peaks: segments faster than both neighbours of their trace and than a fraction of the trace maximum
+    inner = np.flatnonzero(same_trace[1:-1] & same_trace[2:] & same_trace[:-2]) + 1 if len(ds) > 2 else np.zeros(0, int)
+    is_peak = ((velocity[inner] > velocity[inner - 1]) & (velocity[inner] >= velocity[inner + 1])
+               & (velocity[inner] >= _PEAK_RATIO * max_velocity[segment_trace[inner]]))
+
+    # Distance travelled past the end point, projected on the straight line from the start
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ux = np.where(distance > 0, (x[last] - x[first]) / distance, 0.0)
+        uy = np.where(distance > 0, (y[last] - y[first]) / distance, 0.0)
+    projection = (x - x[first][trace]) * ux[trace] + (y - y[first][trace]) * uy[trace]
+    overshoot = np.maximum.reduceat(projection, first) - distance if num_traces else np.zeros(0)
+
+    features = pd.DataFrame({
+        ColumnNames.SESSION_ID: runs["sessions"][codes],
+        TRACE_ID: np.arange(num_traces) - np.searchsorted(codes, codes, side='left'),
+        "num_points": lengths,
+        "duration": duration,
+        "distance": distance,
+        "path_length": path_length,
+        "mean_velocity": np.divide(path_length, duration, out=np.zeros(num_traces), where=duration > 0),
+        "max_velocity": max_velocity,
+        "velocity_peaks": np.bincount(segment_trace[inner][is_peak], minlength=num_traces),
+        "auc": auc,
+        "num_pauses": _segment_counts(is_pause, segment_trace, num_traces),
+        "initial_pause": is_pause[segment_starts] if num_traces else np.zeros(0, dtype=bool),
+        "max_pause": np.maximum.reduceat(dt, segment_starts) if num_traces else np.zeros(0),
+        "x_reversals": _reversals(dx, segment_trace, num_traces),
+        "y_reversals": _reversals(dy, segment_trace, num_traces),
+        "overshoot_distance": np.where(distance > 0, np.maximum(overshoot, 0.0), 0.0),
+        "ends_in_click": _ends_in_click(runs)[selected],
+    })
+    return features
+
+
+def check_patterns(patterns: list[str] | dict | None) -> dict:
+    """
+    Validate the patterns to detect.
+
+    Parameters:
+        patterns (list[str] | dict): Names of patterns of :py:data:`PATTERNS`, or a dictionary from name to a predicate
+                                     that takes the table of :py:func:`trace_features` and returns a boolean mask.
+                                     If None, all of :py:data:`PATTERNS`.
+    Returns:
+        dict: The predicates by name.
+    """
+    if patterns is None:
+        return dict(PATTERNS)
+    if isinstance(patterns, dict):
+        for name, predicate in patterns.items():
+            if not callable(predicate):
+                raise ValueError(f"The predicate of pattern {name} is not callable.")
+        return dict(patterns)
+    for name in patterns:
+        if name not in PATTERNS:
+            raise ValueError(f"Unknown pattern: {name}")
+    return {name: PATTERNS[name] for name in patterns}
+
+
+def detect_patterns(df: pd.DataFrame = None, features: pd.DataFrame = None, patterns: list[str] | dict = None,
+                    pause_threshold: float = 200) -> pd.DataFrame:
+    """
+    Detect mouse-behavior patterns over every movement trace of a dataset.
+
+    The features of the traces are computed once with :py:func:`trace_features` and every pattern is a vectorized
+    predicate over them, so all the patterns are evaluated in one pass over the table. New patterns are declared by
+    passing a dictionary of predicates, or by adding them to :py:data:`PATTERNS`.
+
+    Parameters:
+        df (pd.DataFrame): DataFrame containing 'sessionId', 'eventType', 'timeStamp', 'x', and 'y' columns.
+        features (pd.DataFrame): Table of :py:func:`trace_features`, to reuse it between calls. If None, computed from df.
+        patterns (list[str] | dict): Patterns to detect, see :py:func:`check_patterns`. By default all of :py:data:`PATTERNS`.
+        pause_threshold (float): Time (in ms) between two moves to consider a pause. Default is 200.
+    Returns:
+        pd.DataFrame: The features of every trace with a boolean column per pattern.
+    """
+    if df is None and features is None:
+        raise ValueError("Either 'df' or 'features' must be provided.")
+    predicates = check_patterns(patterns)
+    if features is None:
+        features = trace_features(df, pause_threshold)
+
+    masks = {}
+    for name, predicate in predicates.items():
+        if name in features.columns:
+            raise ValueError(f"Pattern {name} has the name of a feature.")
+        mask = np.asarray(predicate(features), dtype=bool)
+        if mask.shape != (len(features),):
+            raise ValueError(f"The predicate of pattern {name} must return one value per trace.")
+        masks[name] = mask
+    return pd.concat([features, pd.DataFrame(masks, index=features.index)], axis=1)
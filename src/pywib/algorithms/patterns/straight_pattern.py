@@ -1,39 +1,44 @@
+import numpy as np
 import pandas as pd
-from pywib.utils import validate_dataframe, extract_mouse_click_traces_by_session_with_intial_pause
-from pywib.core import auc_ratio
+from pywib.utils import validate_dataframe
+from pywib.utils.movement import _execution_auc_batch
+from pywib.utils.segmentation import _click_trace_points, _flatten_traces
 
-def obtain_straight_patterns(df: pd.DataFrame = None, traces : list[str, list[pd.DataFrame]] = None, per_traces= False, threshold = 100) -> list[pd.DataFrame]:
+def obtain_straight_patterns(df: pd.DataFrame = None, traces: dict[str, list[pd.DataFrame]] = None, threshold: float = 100,
+                             pause_threshold: float = 200, min_distance: float = 0) -> dict[str, np.ndarray]:
     """
         First described in 'Investigating the Differences in Web Browsing Behaviour of Chinese and European Users Using Mouse Tracking' (Lee & Chen, 2007),
         the Straight Pattern can be described as a direct or straight movement in direction to a target, characterized by a pause before a direct
         movement towards a target without significant pauses in between the initial movement and the target acquisition.
-        
-        TODO : initial pause
+
+        The click traces with an initial pause are found and their execution-deviation AUC computed for all the sessions at once
+        over flat arrays, and the thresholds are applied as masks, so the cost grows linearly with the number of events.
 
         Parameters:
-            df (pd.DataFrame): DataFrame containing 'sessionId', 'sceneId', 'eventType', 'timeStamp', 'x', and 'y' columns.
-            traces (list): List of traces to analyze. Each trace is a pd.DataFrame.
-            per_traces (bool): If True, process per traces. Default is False.
-            threshold (float): Threshold (in px) for the AUC perpendicular distance to consider a movement as a straight pattern. Default is 100.
+            df (pd.DataFrame): DataFrame containing 'sessionId', 'eventType', 'timeStamp', 'x', and 'y' columns.
+            traces (dict): Already extracted traces by session, e.g. from :py:func:`~pywib.utils.extract_mouse_click_traces_by_session_with_intial_pause`.
+                           If None, the traces are found in df.
+            threshold (float): Threshold (in px) for the execution AUC perpendicular distance to consider a movement as a straight pattern. Default is 100.
+            pause_threshold (float): Time (in ms) between two moves to consider a pause, the initial pause must be the only one of the trace. Default is 200.
+            min_distance (float): Minimum straight-line distance (in px) between the start and end of a straight pattern. Default is 0.
         Returns:
-            list[pd.DataFrame]: A list of DataFrames, each corresponding to a straight pattern trace.
+            dict[str, np.ndarray]: Mapping of sessionId to the positions of its straight pattern traces in the list of click traces
+                                   of that session, as returned by :py:func:`~pywib.utils.extract_mouse_click_traces_by_session_with_intial_pause`.
     """
-    if(traces is None and per_traces):
+    if df is None and traces is None:
+        raise ValueError("Either 'df' or 'traces' must be provided.")
+
+    if traces is None:
         validate_dataframe(df)
-        # This variable will always contain point and click traces
-        traces = extract_mouse_click_traces_by_session_with_intial_pause(df)
+        points = _click_trace_points(df, pause_threshold)
+    else:
+        points = _flatten_traces(traces)
 
-    if(not per_traces):
-        raise NotImplementedError("The 'per_traces' functionality is not yet implemented.")
-    
-    auc_values = auc_ratio(None, traces= traces, per_traces= True)
+    auc, straight_dist = _execution_auc_batch(points["x"], points["y"], points["offsets"])
+    # NaN AUCs (traces that end where they start) are never straight
+    is_straight = (auc <= threshold) & (straight_dist >= min_distance)
 
-    straight_patterns_per_session = {}
-    for session_id, trace in auc_values.items():
-        straight_patterns = []
-        for i, auc in enumerate(trace):
-            # TODO usar auc_ratio con un porcentaje del threshold?
-            if(auc['auc_perp'] <= threshold):
-                straight_patterns.append(traces[session_id][i])
-        straight_patterns_per_session[session_id] = straight_patterns
-    return straight_patterns_per_session
\ No newline at end of file
+    codes = points["codes"][is_straight]
+    trace_ids = points["trace_ids"][is_straight]
+    bounds = np.searchsorted(codes, np.arange(len(points["sessions"]) + 1))
+    return {session_id: trace_ids[bounds[i]:bounds[i + 1]] for i, session_id in enumerate(points["sessions"])}
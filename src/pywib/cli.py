@@ -0,0 +1,278 @@
+"""
+Command line interface to extract session features from directories of interaction logs.
+
+Example:
+    pywib "logs/2025-*/*.parquet" -m velocity_metrics pauses_metrics -j 8 -o features.parquet --checkpoint-dir .pywib-checkpoint
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sys
+import zlib
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+
+from . import __version__
+from .constants import ColumnNames
+from .features import FEATURE_METRICS, DEFAULT_FEATURE_METRICS, check_feature_metrics, session_features
+from .utils.io import columns_for_metrics, read_interactions
+from .utils.validation import validate_dataframe
+
+
+def expand_inputs(patterns: list[str]) -> list[str]:
+    """
+    Expand the input glob patterns (recursive '**' is supported) into the list of files.
+
+    Parameters:
+        patterns (list[str]): File paths or glob patterns.
+    Returns:
+        list[str]: The sorted, unique matching files.
+    """
+    files = set()
+    for pattern in patterns:
+        matches = glob.glob(pattern, recursive=True)
+        if not matches and os.path.exists(pattern):
+            matches = [pattern]
+        files.update(os.path.abspath(match) for match in matches if os.path.isfile(match))
+    return sorted(files)
+
+
+# Rows of the CSV chunks filtered by session while they are read
+_CSV_CHUNK_ROWS = 1_000_000
+
+
+def read_events(path: str, metrics: list[str], sep: str = ",", sessions: list = None) -> pd.DataFrame:
+    """
+    Read the columns of an interaction log (CSV, Parquet or Arrow IPC) needed by the metrics.
+
+    When `sessions` are given, the other events are dropped while the file is read (by chunks of a CSV file, with a
+    filter pushed down to the Parquet or Arrow IPC reader), so only the events of those sessions are held in memory.
+    """
+    if path.lower().endswith(".csv"):
+        columns = columns_for_metrics(metrics)
+        if sessions is None:
+            df = pd.read_csv(path, sep=sep, usecols=lambda col: col in columns)
+        else:
+            chunks = pd.read_csv(path, sep=sep, usecols=lambda col: col in columns, chunksize=_CSV_CHUNK_ROWS)
+            df = pd.concat([chunk[chunk[ColumnNames.SESSION_ID].isin(sessions)] for chunk in chunks], ignore_index=True)
+        validate_dataframe(df)
+        if df[ColumnNames.TIME_STAMP].dtype == object:
+            df[ColumnNames.TIME_STAMP] = df[ColumnNames.TIME_STAMP].astype(str).str.replace(',', '', regex=False)
+        df[ColumnNames.TIME_STAMP] = pd.to_numeric(df[ColumnNames.TIME_STAMP], errors='coerce')
+        return df
+    return read_interactions(path, metrics=metrics, sessions=None if sessions is None else list(sessions))
+
+
+def session_shards(session_ids, num_shards: int) -> np.ndarray:
+    """
+    Stable shard of every sessionId, the same across runs and processes.
+    """
+    return np.array([zlib.crc32(str(session_id).encode("utf-8")) % num_shards for session_id in session_ids], dtype=int)
+
+
+def _unit_key(path: str, shard: int, num_shards: int, metrics: list[str], threshold: float) -> str:
+    """
+    Name of the checkpoint of a (file, shard) unit. It changes if the file or the settings change.
+    """
+    stat = os.stat(path)
+    description = json.dumps([path, stat.st_size, stat.st_mtime_ns, shard, num_shards, sorted(metrics), threshold])
+    return hashlib.sha1(description.encode("utf-8")).hexdigest()
+
+
+def _sessions_key(paths: list[str], sessions: list, metrics: list[str], threshold: float) -> str:
+    """
+    Name of the checkpoint of a unit of sessions found in several files. It changes if a file or the settings change.
+    """
+    files = [[path, os.stat(path).st_size, os.stat(path).st_mtime_ns] for path in paths]
+    description = json.dumps([files, sorted(str(session_id) for session_id in sessions), sorted(metrics), threshold])
+    return hashlib.sha1(description.encode("utf-8")).hexdigest()
+
+
+def _write_checkpoint(features: pd.DataFrame, checkpoint: str | None):
+    if checkpoint is not None:
+        # Written to a temporary file first, so an interrupted write never looks like a finished unit
+        temporary = checkpoint + ".tmp"
+        features.to_pickle(temporary)
+        os.replace(temporary, checkpoint)
+
+
+def _process_unit(path: str, shard: int, num_shards: int, metrics: list[str], threshold: float, sep: str,
+                  checkpoint: str | None) -> tuple[str, int, pd.DataFrame]:
+    df = read_events(path, metrics, sep)
+    if num_shards > 1:
+        sessions = pd.unique(df[ColumnNames.SESSION_ID])
+        selected = sessions[session_shards(sessions, num_shards) == shard]
+        df = df[df[ColumnNames.SESSION_ID].isin(selected)]
+    features = session_features(df, metrics, threshold) if not df.empty else pd.DataFrame()
+    _write_checkpoint(features, checkpoint)
+    return path, shard, features
+
+
+def _process_sessions(paths: list[str], sessions: list, shard: int, metrics: list[str], threshold: float, sep: str,
+                      checkpoint: str | None) -> tuple[int, pd.DataFrame]:
+    """
+    Features of sessions found in several files, from their events of all those files.
+    """
+    events = pd.concat([read_events(path, metrics, sep, sessions) for path in paths], ignore_index=True)
+    features = session_features(events, metrics, threshold)
+    _write_checkpoint(features, checkpoint)
+    return shard, features
+
+
+def _spanning_units(units: list[tuple[str, pd.DataFrame]], num_shards: int) -> list[tuple[list[str], list, int]]:
+    """
+    The sessions with features in more than one file, split in shards, with the files of the sessions of every shard.
+    """
+    files_by_session = {}
+    for path, features in units:
+        for session_id in features.index:
+            files_by_session.setdefault(session_id, set()).add(path)
+    spanning = [session_id for session_id, paths in files_by_session.items() if len(paths) > 1]
+    shard_of = session_shards(spanning, num_shards)
+    result = []
+    for shard in range(num_shards):
+        sessions = sorted((session_id for session_id, session_shard in zip(spanning, shard_of) if session_shard == shard),
+                          key=str)
+        if sessions:
+            paths = sorted(set().union(*(files_by_session[session_id] for session_id in sessions)))
+            result.append((paths, sessions, shard))
+    return result
+
+
+def _progress(quiet: bool, done: int, total: int, message: str):
+    if not quiet:
+        print(f"[{done}/{total}] {message}", file=sys.stderr, flush=True)
+
+
+def _write_table(features: pd.DataFrame, output: str):
+    if output.lower().endswith((".parquet", ".pq")):
+        features.to_parquet(output)
+    elif output.lower().endswith(".csv"):
+        features.to_csv(output)
+    else:
+        raise ValueError(f"Unsupported output format: {output}, use '.csv' or '.parquet'.")
+
+
+def extract_features(inputs: list[str], output: str, metrics: list[str] = None, workers: int = 1, shards: int = 1,
+                     threshold: float = 100, checkpoint_dir: str = None, sep: str = ",", quiet: bool = True) -> pd.DataFrame:
+    """
+    Compute the session by feature table of several interaction logs in parallel and write it to `output`.
+
+    The work is split in units of (file, session shard). When `checkpoint_dir` is given, every finished unit is stored
+    there and a later run with the same inputs and settings only computes the missing units. The sessions found in
+    several files are then computed again from their events of all those files, in units of one session shard that
+    are run and checkpointed the same way, so every session has a single row.
+
+    Parameters:
+        inputs (list[str]): Files or glob patterns of CSV, Parquet or Arrow IPC logs.
+        output (str): Path of the '.csv' or '.parquet' table.
+        metrics (list[str]): Names of the metrics, any of :py:data:`~pywib.features.FEATURE_METRICS`.
+        workers (int): Number of parallel workers.
+        shards (int): Number of session shards every file is split in.
+        threshold (float): Time threshold in milliseconds to consider a pause, by default 100 ms.
+        checkpoint_dir (str): Directory to store the finished units in, to resume an interrupted run.
+        sep (str): Separator of the CSV files.
+        quiet (bool): If False, the progress is reported on the standard error.
+    Returns:
+        pd.DataFrame: The features, indexed by sessionId.
+    """
+    metrics = check_feature_metrics(metrics)
+    if shards < 1:
+        raise ValueError("'shards' must be at least 1.")
+    # The output of a previous run may match the input patterns
+    files = [path for path in expand_inputs(inputs) if path != os.path.abspath(output)]
+    if not files:
+        raise ValueError(f"No input files match {inputs}.")
+    if checkpoint_dir is not None:
+        os.makedirs(checkpoint_dir, exist_ok=True)
+
+    results = []
+    pending = []
+    for path in files:
+        for shard in range(shards):
+            checkpoint = None
+            if checkpoint_dir is not None:
+                checkpoint = os.path.join(checkpoint_dir, _unit_key(path, shard, shards, metrics, threshold) + ".pkl")
+                if os.path.exists(checkpoint):
+                    results.append((path, pd.read_pickle(checkpoint)))
+                    continue
+            pending.append((path, shard, checkpoint))
+
+    total = len(results) + len(pending)
+    if results:
+        _progress(quiet, len(results), total, "units restored from the checkpoint")
+    tasks = (delayed(_process_unit)(path, shard, shards, metrics, threshold, sep, checkpoint)
+             for path, shard, checkpoint in pending)
+    for path, shard, features in Parallel(n_jobs=workers, return_as="generator_unordered")(tasks):
+        results.append((path, features))
+        _progress(quiet, len(results), total, f"{os.path.basename(path)} shard {shard + 1}/{shards}: {len(features)} sessions")
+
+    # Sessions found in several files, their rows of every file are replaced by one from all their events
+    merged = []
+    pending = []
+    spanning_units = _spanning_units(results, shards)
+    for paths, sessions, shard in spanning_units:
+        checkpoint = None
+        if checkpoint_dir is not None:
+            checkpoint = os.path.join(checkpoint_dir, _sessions_key(paths, sessions, metrics, threshold) + ".pkl")
+            if os.path.exists(checkpoint):
+                merged.append(pd.read_pickle(checkpoint))
+                continue
+        pending.append((paths, sessions, shard, checkpoint))
+    tasks = (delayed(_process_sessions)(paths, sessions, shard, metrics, threshold, sep, checkpoint)
+             for paths, sessions, shard, checkpoint in pending)
+    for shard, features in Parallel(n_jobs=workers, return_as="generator_unordered")(tasks):
+        merged.append(features)
+        _progress(quiet, len(merged), len(spanning_units),
+                  f"shard {shard + 1}/{shards}: {len(features)} sessions found in several files")
+
+    spanning = [session_id for _, sessions, _ in spanning_units for session_id in sessions]
+    results = [features[~features.index.isin(spanning)] for _, features in results] + merged
+    results = [features for features in results if not features.empty]
+    features = pd.concat(results).sort_index() if results else pd.DataFrame()
+    _write_table(features, output)
+    return features
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="pywib",
+        description="Extract a session by feature table from interaction logs (CSV, Parquet or Arrow IPC).")
+    parser.add_argument("inputs", nargs="+", help="Input files or glob patterns, e.g. 'logs/**/*.csv'.")
+    parser.add_argument("-o", "--output", required=True, help="Output table, '.csv' or '.parquet'.")
+    parser.add_argument("-m", "--metrics", nargs="+", default=DEFAULT_FEATURE_METRICS, choices=list(FEATURE_METRICS),
+                        metavar="METRIC", help="Metrics to compute, by default all the mouse and timing metrics.")
+    parser.add_argument("-j", "--workers", type=int, default=1, help="Number of parallel workers, -1 for all the CPUs.")
+    parser.add_argument("--shards", type=int, default=1, help="Number of session shards every file is split in.")
+    parser.add_argument("--threshold", type=float, default=100, help="Pause threshold in milliseconds.")
+    parser.add_argument("--checkpoint-dir", help="Directory for the finished units, an interrupted run resumes from it.")
+    parser.add_argument("--sep", default=",", help="Separator of the CSV files.")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Do not report the progress.")
+    parser.add_argument("--version", action="version", version=f"%(prog)s {__version__}")
+    return parser
+
+
+def main(argv: list[str] = None) -> int:
+    """
+    Entry point of the `pywib` console script.
+    """
+    args = _parser().parse_args(argv)
+    try:
+        features = extract_features(args.inputs, args.output, metrics=args.metrics, workers=args.workers,
+                                    shards=args.shards, threshold=args.threshold, checkpoint_dir=args.checkpoint_dir,
+                                    sep=args.sep, quiet=args.quiet)
+    except ValueError as e:
+        print(f"pywib: error: {e}", file=sys.stderr)
+        return 2
+    if not args.quiet:
+        print(f"{len(features)} sessions written to {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,8 +4,9 @@ Core metrics functions from PyWib
 from .timing import execution_time, movement_time, num_pauses, pauses_metrics
 from .movement import (velocity, acceleration, jerkiness, auc,
                        velocity_metrics, acceleration_metrics, jerkiness_metrics,
-                       deviations, path)
-from .mouse import click_slip, number_of_clicks
+                       deviations, path, trajectory_geometry, geometry_metrics)
+from .mouse import click_slip, number_of_clicks, fitts_traces, fitts_metrics
+from .events import event_counts
 from .keyboard import (typing_speed, typing_speed_metrics, backspace_usage, typing_durations)
 
 __all__ = [
@@ -23,7 +24,12 @@ __all__ = [
     "jerkiness_metrics",
     "click_slip",
     "number_of_clicks",
+    "fitts_traces",
+    "fitts_metrics",
+    "event_counts",
     "deviations",
+    "trajectory_geometry",
+    "geometry_metrics",
     "typing_speed",
     "typing_speed_metrics",
     "backspace_usage",
@@ -0,0 +1,8 @@
+"""
+Core metrics functions from PyWib
+"""
+from .events import event_counts
+
+__all__ = [
+    "event_counts",
+]
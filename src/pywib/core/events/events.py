@@ -0,0 +1,47 @@
+import pandas as pd
+import numpy as np
+
+from pywib.utils import validate_dataframe
+from pywib.constants import ColumnNames, EventTypes
+from pywib.utils.validation import validate_any_not_none
+from pywib.utils.windows import windowed
+
+# Every event type code defined in EventTypes, in the order of their values
+EVENT_TYPE_CODES = sorted(value for name, value in vars(EventTypes).items() if name.startswith("EVENT_"))
+
+
+@windowed
+def event_counts(df: pd.DataFrame, event_types: list[int] = None) -> pd.DataFrame:
+    """
+    Count the events of every type in every session.
+    The whole matrix is computed in a single pass, with one bincount over the (session, event type) cells.
+
+    Parameters:
+        df (pd.DataFrame): DataFrame containing 'sessionId' and 'eventType' columns.
+        event_types (list[int]): Event type codes to count, see :py:class:`~pywib.EventTypes`. By default all of them.
+    Returns:
+        pd.DataFrame: The number of events, indexed by sessionId with one column per event type code.
+    """
+    validate_any_not_none(df)
+    validate_dataframe(df)
+    if event_types is None:
+        event_types = EVENT_TYPE_CODES
+    event_types = np.asarray(event_types, dtype=np.int64)
+    if len(np.unique(event_types)) != len(event_types):
+        raise ValueError("Event types must not be repeated.")
+
+    codes, sessions = pd.factorize(df[ColumnNames.SESSION_ID], sort=True)
+    events = pd.to_numeric(df[ColumnNames.EVENT_TYPE], errors='coerce').to_numpy(dtype=float)
+
+    # Column of every event, events of other types (or without session) are not counted
+    order = np.argsort(event_types)
+    sorted_types = event_types[order]
+    position = np.minimum(np.searchsorted(sorted_types, events), len(sorted_types) - 1)
+    counted = (codes >= 0) & (sorted_types[position] == events) if len(sorted_types) > 0 else np.zeros(len(codes), bool)
+    columns = order[position[counted]]
+
+    num_types = len(event_types)
+    counts = np.bincount(codes[counted] * num_types + columns, minlength=len(sessions) * num_types)
+    return pd.DataFrame(counts.reshape(len(sessions), num_types),
+                        index=pd.Index(sessions, name=ColumnNames.SESSION_ID),
+                        columns=pd.Index(event_types, name=ColumnNames.EVENT_TYPE))
@@ -11,7 +11,10 @@ from pywib.utils import validate_dataframe_keyboard
 from pywib.constants import EventTypes, ColumnNames
 from pywib.utils.keyboard import (backspace_usage_df, backspace_usage_traces, typing_durations_df, typing_durations_traces, typing_speed_df, typing_speed_traces)
 from pywib.utils.validation import validate_any_not_none
+from pywib.utils.aggregation import MetricState, TypingSpeedState, finalize_states
+from pywib.utils.windows import windowed
 
+@windowed
 def typing_durations(df: pd.DataFrame = None, traces: dict[str, list[pd.DataFrame]] = None, per_traces: bool = True, single: bool = False) -> list:
     """
     Calculate the durations of individual keystrokes.
@@ -38,6 +41,7 @@ def typing_durations(df: pd.DataFrame = None, traces: dict[str, list[pd.DataFram
 
     return typing_durations_traces(traces, single=single)
 
+@windowed
 def typing_speed(df: pd.DataFrame = None, traces: dict[str, list[pd.DataFrame]] = None, per_traces : bool = True) -> dict[list[float]] | float:
     """
     Calculate the average typing speed in characters per minute (CPM).
@@ -64,7 +68,9 @@ def typing_speed(df: pd.DataFrame = None, traces: dict[str, list[pd.DataFrame]]
 
     return typing_speed_traces(traces)
 
-def typing_speed_metrics(df: pd.DataFrame = None, traces: dict[str, list[pd.DataFrame]] = None) -> dict:
+@windowed
+def typing_speed_metrics(df: pd.DataFrame = None, traces: dict[str, list[pd.DataFrame]] = None, as_state: bool = False,
+                         quantiles: list[float] = None, sketch_size: int = 200) -> dict:
     """
     Calculate typing speed metrics including average CPM, total characters typed, and total time spent typing.
     
@@ -76,6 +82,9 @@ def typing_speed_metrics(df: pd.DataFrame = None, traces: dict[str, list[pd.Data
         df : pd.DataFrame DataFrame containing interaction data with 'event_type', 'timestamp', and 'key' columns.
         traces : dict[str, list[pd.DataFrame]], optional Pre-extracted keystroke traces by session.
         per_trace : bool, optional Whether to calculate metrics per trace. Default is True.
+        as_state : bool, optional If True, returns a mergeable :py:class:`~pywib.TypingSpeedState` per session instead of the final metrics.
+        quantiles : list[float], optional Quantiles (between 0 and 1) of the keydown to keyup durations to add under the 'keydown_to_keyup_quantiles' key, estimated with a mergeable sketch.
+        sketch_size : int, optional Size of the quantile sketch, larger values are more accurate but use more memory.
     Returns:
         dict: A dictionary with session IDs as keys and their corresponding typing speed metrics as values.
         """
@@ -90,22 +99,27 @@ def typing_speed_metrics(df: pd.DataFrame = None, traces: dict[str, list[pd.Data
     metrics_by_session = {}
     for session_id, speeds in session_speeds.items():
         if speeds:
-            avg_speed = np.mean(speeds)
             total_chars = sum(session_traces[session_traces[ColumnNames.EVENT_TYPE] == EventTypes.EVENT_KEY_UP][ColumnNames.EVENT_TYPE].count() for session_traces in traces[session_id])
             total_time = sum((session_traces[ColumnNames.TIME_STAMP].diff().fillna(0).sum() / 1000.0) for session_traces in traces[session_id])
-            avg_keydown_to_keyup_duration = np.mean([
-                (trace[trace[ColumnNames.EVENT_TYPE] == EventTypes.EVENT_KEY_UP][ColumnNames.TIME_STAMP].values - trace[trace[ColumnNames.EVENT_TYPE] == EventTypes.EVENT_KEY_DOWN][ColumnNames.TIME_STAMP].values).mean()
+            latencies = [
+                trace[trace[ColumnNames.EVENT_TYPE] == EventTypes.EVENT_KEY_UP][ColumnNames.TIME_STAMP].values - trace[trace[ColumnNames.EVENT_TYPE] == EventTypes.EVENT_KEY_DOWN][ColumnNames.TIME_STAMP].values
                 for trace in traces[session_id]
-            ])
-            metrics_by_session[session_id] = {
-                "average_typing_speed": avg_speed,
-                ColumnNames.TOTAL_CHARS: total_chars,
-                "total_time_seconds": total_time,
-                "avg_keydown_to_keyup_duration": avg_keydown_to_keyup_duration  # TODO Review
-            }
-    return metrics_by_session
-
-
+            ]
+            keydown_to_keyup_durations = [trace_latencies.mean() for trace_latencies in latencies]
+            metrics_by_session[session_id] = TypingSpeedState(
+                MetricState.from_values(speeds),
+                total_chars,
+                total_time,
+                MetricState.from_values(keydown_to_keyup_durations),  # TODO Review
+                MetricState.from_values(np.concatenate(latencies), quantiles=quantiles, sketch_size=sketch_size) if quantiles is not None else None
+            )
+
+    if as_state:
+        return metrics_by_session
+    return finalize_states(metrics_by_session)
+
+
+@windowed
 def backspace_usage(df: pd.DataFrame = None, traces: dict[str, list[pd.DataFrame]] = None, per_trace: bool = True) -> dict:
     """
     Calculate the backspace usage rate (backspaces per 100 characters typed) for each session.
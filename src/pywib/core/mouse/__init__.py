@@ -2,8 +2,11 @@
 Core metrics functions from PyWib
 """
 from .mouse import click_slip, number_of_clicks
+from .fitts import fitts_traces, fitts_metrics
 
 __all__ = [
     "click_slip",
     "number_of_clicks",
+    "fitts_traces",
+    "fitts_metrics",
 ]
\ No newline at end of file
@@ -0,0 +1,154 @@
+import pandas as pd
+import numpy as np
+
+from pywib.utils import validate_dataframe
+from pywib.constants import ColumnNames
+from pywib.utils.segmentation import _move_runs, _ends_in_click, _run_points
+from pywib.utils.windows import windowed
+
+# Ratio between the effective width and the standard deviation of the endpoints, 96% of them fall within the width
+_EFFECTIVE_WIDTH_FACTOR = 4.133
+
+WIDTH = "width"
+
+
+def _width_lookup(widths) -> pd.Series:
+    """
+    Widths of the targets as a Series indexed by elementId.
+    """
+    if widths is None:
+        return pd.Series(dtype=float)
+    if isinstance(widths, pd.DataFrame):
+        if ColumnNames.ELEMENT_ID not in widths.columns or WIDTH not in widths.columns:
+            raise ValueError(f"The widths table must have '{ColumnNames.ELEMENT_ID}' and '{WIDTH}' columns.")
+        widths = widths.set_index(ColumnNames.ELEMENT_ID)[WIDTH]
+    widths = pd.Series(widths, dtype=float)
+    if widths.index.has_duplicates:
+        raise ValueError("The widths table has more than one width for some elementId.")
+    return widths
+
+
+def _click_trace_endpoints(df: pd.DataFrame) -> dict:
+    """
+    Start and end points, duration and target of the traces of
+    :py:func:`~pywib.utils.extract_mouse_click_traces_by_session`, found for all the sessions at once.
+    """
+    runs = _move_runs(df)
+    selected = (runs["lengths"] > 1) & _ends_in_click(runs)
+    x, y, offsets = _run_points(df, runs, selected)
+    codes = runs["codes"][runs["start_rows"][selected]]
+    start_rows, end_rows = runs["start_rows"][selected], runs["end_rows"][selected]
+    return {
+        "sessions": runs["sessions"],
+        "codes": codes,
+        "trace_ids": np.arange(len(codes)) - np.searchsorted(codes, codes, side='left'),
+        "start": (x[offsets[:-1]], y[offsets[:-1]]),
+        "end": (x[offsets[1:] - 1], y[offsets[1:] - 1]),
+        "duration": runs["time_stamp"][end_rows] - runs["time_stamp"][start_rows],
+        # The target is the element of the click that ends the trace
+        "elements": df[ColumnNames.ELEMENT_ID].to_numpy()[runs["order"][end_rows + 1]],
+    }
+
+
+def fitts_traces(df: pd.DataFrame, widths=None, by_session: bool = True) -> pd.DataFrame:
+    """
+    Calculate the Fitts's law index of difficulty, movement time and throughput of every click trace.
+
+    The click traces are those of :py:func:`~pywib.utils.extract_mouse_click_traces_by_session`, found for all the
+    sessions at once. The target of a trace is the 'elementId' of its click and its movement time is the time from the
+    first to the last move. The effective width of a target is 4.133 times the standard deviation of the endpoints of
+    its traces projected on the direction of the movements, from their start points to the mean endpoint.
+
+    Parameters:
+        df (pd.DataFrame): DataFrame containing 'sessionId', 'eventType', 'timeStamp', 'x', 'y' and 'elementId' columns.
+        widths (dict | pd.Series | pd.DataFrame): Nominal width in px of the targets by elementId, as a mapping or a table with
+                                                  'elementId' and 'width' columns. Targets without a width have a NaN nominal index of difficulty.
+        by_session (bool): Whether the effective width of a target is computed from the traces of every session separately, by default True.
+    Returns:
+        pd.DataFrame: One row per click trace with the 'sessionId', 'trace_id', 'elementId', 'start_x', 'start_y',
+                      'end_x', 'end_y', the 'distance' (px) and 'movement_time' (ms), the nominal 'width' and
+                      'index_of_difficulty', the 'effective_width' and 'effective_index_of_difficulty' (bits) and
+                      the 'throughput' (effective bits per second). The effective values are NaN for the targets with
+                      less than two traces.
+    """
+    validate_dataframe(df)
+    if ColumnNames.ELEMENT_ID not in df.columns:
+        raise ValueError(f"The '{ColumnNames.ELEMENT_ID}' column is required to know the target of every click.")
+    widths = _width_lookup(widths)
+    traces = _click_trace_endpoints(df)
+    (x0, y0), (x1, y1) = traces["start"], traces["end"]
+    distance = np.hypot(x1 - x0, y1 - y0)
+    duration = traces["duration"]
+
+    # Targets, one per elementId (and session), and the mean endpoint of their traces
+    elements, element_ids = pd.factorize(pd.Series(traces["elements"], dtype=object))
+    valid = elements >= 0
+    key = traces["codes"] * len(element_ids) + elements if by_session else elements
+    target, _ = pd.factorize(np.where(valid, key, -1), use_na_sentinel=True)
+    target = np.where(valid, target, 0)
+    num_targets = int(target.max()) + 1 if len(target) else 0
+    counts = np.bincount(target[valid], minlength=num_targets)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        center_x = np.bincount(target[valid], weights=x1[valid], minlength=num_targets) / counts
+        center_y = np.bincount(target[valid], weights=y1[valid], minlength=num_targets) / counts
+
+        # Deviation of every endpoint from the mean endpoint, along the direction of the movement to it
+        ax, ay = center_x[target] - x0, center_y[target] - y0
+        amplitude = np.hypot(ax, ay)
+        deviation = ((x1 - center_x[target]) * ax + (y1 - center_y[target]) * ay) / amplitude
+        deviation = np.where(amplitude > 0, deviation, 0.0)
+        squares = np.bincount(target[valid], weights=deviation[valid] ** 2, minlength=num_targets)
+        sums = np.bincount(target[valid], weights=deviation[valid], minlength=num_targets)
+        variance = (squares - sums ** 2 / counts) / (counts - 1)
+        effective_width = np.where(valid, _EFFECTIVE_WIDTH_FACTOR * np.sqrt(np.maximum(variance, 0))[target], np.nan)
+
+        width = widths.reindex(traces["elements"]).to_numpy(dtype=float)
+        index_of_difficulty = np.log2(distance / width + 1)
+        effective_index_of_difficulty = np.log2(distance / effective_width + 1)
+        throughput = np.where(duration > 0, effective_index_of_difficulty / (duration / 1000.0), np.nan)
+
+    return pd.DataFrame({
+        ColumnNames.SESSION_ID: np.asarray(traces["sessions"], dtype=object)[traces["codes"]],
+        "trace_id": traces["trace_ids"],
+        ColumnNames.ELEMENT_ID: traces["elements"],
+        "start_x": x0,
+        "start_y": y0,
+        "end_x": x1,
+        "end_y": y1,
+        "distance": distance,
+        "movement_time": duration,
+        WIDTH: width,
+        "index_of_difficulty": index_of_difficulty,
+        "effective_width": effective_width,
+        "effective_index_of_difficulty": effective_index_of_difficulty,
+        "throughput": throughput,
+    })
+
+
+@windowed
+def fitts_metrics(df: pd.DataFrame = None, widths=None, by_session: bool = True,
+                  computed_fitts: pd.DataFrame = None) -> dict:
+    """
+    Calculate the Fitts's law metrics of the click traces of every session.
+
+    Parameters:
+        df (pd.DataFrame): DataFrame containing 'sessionId', 'eventType', 'timeStamp', 'x', 'y' and 'elementId' columns.
+        widths (dict | pd.Series | pd.DataFrame): Nominal width in px of the targets by elementId, see :py:func:`fitts_traces`.
+        by_session (bool): Whether the effective width of a target is computed from the traces of every session separately, by default True.
+        computed_fitts (pd.DataFrame): Precomputed result of :py:func:`fitts_traces`. If None, it is computed from df.
+    Returns:
+        dict: A dictionary with keys as (sessionId) and values as dictionaries with the number of click 'traces' and the
+              mean 'movement_time', 'index_of_difficulty', 'effective_index_of_difficulty' and 'throughput' of
+              them, leaving out the NaN values.
+    """
+    if computed_fitts is None:
+        if df is None:
+            raise ValueError("Either 'df' or 'computed_fitts' must be provided.")
+        computed_fitts = fitts_traces(df, widths, by_session)
+
+    columns = ["movement_time", "index_of_difficulty", "effective_index_of_difficulty", "throughput"]
+    grouped = computed_fitts.groupby(ColumnNames.SESSION_ID, sort=False)
+    means = grouped[columns].mean()
+    sizes = grouped.size()
+    return {session_id: {"traces": int(sizes[session_id]), **{column: float(row[column]) for column in columns}}
+            for session_id, row in means.iterrows()}
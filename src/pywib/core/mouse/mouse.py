@@ -4,7 +4,11 @@ import numpy as np
 from pywib.utils import validate_dataframe
 from pywib.constants import ColumnNames, EventTypes
 from pywib.utils.validation import validate_any_not_none
+from pywib.utils.aggregation import ClickSlipState, MetricState, finalize_states
+from pywib.core.events import event_counts
+from pywib.utils.windows import windowed
 
+@windowed
 def number_of_clicks(df: pd.DataFrame) -> dict:
     """
     Calculate the number of clicks per session.
@@ -13,16 +17,11 @@ def number_of_clicks(df: pd.DataFrame) -> dict:
     Returns:
         dict: A dictionary with session IDs as keys and number of clicks as values.
     """
-    validate_any_not_none(df)
-    validate_dataframe(df)
-
-    clicks_per_session = {}
-    df = df.groupby(ColumnNames.SESSION_ID)
-    for session_id, group in df:
-        clicks_per_session[session_id] = group[group[ColumnNames.EVENT_TYPE] == EventTypes.EVENT_ON_CLICK].shape[0]
-    return clicks_per_session
+    clicks = event_counts(df, [EventTypes.EVENT_ON_CLICK])[EventTypes.EVENT_ON_CLICK]
+    return {session_id: int(count) for session_id, count in clicks.items()}
 
-def click_slip(df: pd.DataFrame, threshold: float = 5.0) -> dict:
+@windowed
+def click_slip(df: pd.DataFrame, threshold: float = 5.0, as_state: bool = False) -> dict:
     """
     Calculate the number of click slips per session.
     A click slip is defined as a click event that occurs within a certain distance
@@ -34,6 +33,7 @@ def click_slip(df: pd.DataFrame, threshold: float = 5.0) -> dict:
     Parameters:
         df (pd.DataFrame): DataFrame containing mouse event data.
         threshold (float): Distance threshold to consider a click as a slip.
+        as_state (bool): If True, returns a mergeable :py:class:`~pywib.ClickSlipState` per session instead of the final metrics.
 
     Returns:
         dict: A dictionary with session IDs as keys and the metrics (click slips, max, min, average) as values.
@@ -46,7 +46,6 @@ def click_slip(df: pd.DataFrame, threshold: float = 5.0) -> dict:
     metrics_per_session = {}
     for session_id, group in df:
         group = group.sort_values(by=ColumnNames.TIME_STAMP)
-        slips = 0
         in_down = False
         last_move_x = None
         last_move_y = None
@@ -83,7 +82,6 @@ def click_slip(df: pd.DataFrame, threshold: float = 5.0) -> dict:
                     d = np.hypot(x - last_move_x, y - last_move_y)
                     accumulated_move_distance += d
                 if accumulated_move_distance >= threshold:
-                    slips += 1
                     distances.append(accumulated_move_distance)
                 durations.append(duration)
                 in_down = False
@@ -91,14 +89,9 @@ def click_slip(df: pd.DataFrame, threshold: float = 5.0) -> dict:
                 last_move_y = None
                 mouse_down_time = None
                 accumulated_move_distance = 0.0
-        metrics = {
-            ColumnNames.CLICK_SLIPS: slips,
-            ColumnNames.MAX_CLICK_SLIP: max(distances) if distances else 0,
-            ColumnNames.MIN_CLICK_SLIP: min(distances) if distances else 0,
-            ColumnNames.MEAN_CLICK_SLIP: np.mean(distances) if distances else 0,
-            ColumnNames.MEAN_CLICK_DURATION: np.mean(durations) if durations else 0,
-            ColumnNames.MAX_CLICK_DURATION: max(durations) if durations else 0,
-            ColumnNames.MIN_CLICK_DURATION: min(durations) if durations else 0,
-        }
-        metrics_per_session[session_id] = metrics
-    return metrics_per_session
\ No newline at end of file
+        metrics_per_session[session_id] = ClickSlipState(MetricState.from_values(distances),
+                                                         MetricState.from_values(durations))
+
+    if as_state:
+        return metrics_per_session
+    return finalize_states(metrics_per_session)
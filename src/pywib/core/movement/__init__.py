@@ -5,6 +5,8 @@ from .movement import (velocity, acceleration, jerkiness, velocity_metrics, acce
 
 from .trajectory import (path, auc, deviations)
 
+from .geometry import (trajectory_geometry, geometry_metrics)
+
 __all__ = [
     # Movement metrics
     "velocity",
@@ -16,5 +18,8 @@ __all__ = [
     # Trajectory metrics
     "path",
     "auc",
-    "deviations"
+    "deviations",
+    # Geometry metrics
+    "trajectory_geometry",
+    "geometry_metrics",
 ]
\ No newline at end of file
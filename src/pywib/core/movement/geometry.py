@@ -0,0 +1,119 @@
+import pandas as pd
+import numpy as np
+
+from pywib.constants import ColumnNames
+from pywib.utils import validate_dataframe
+from pywib.utils.segmentation import _move_trace_points, _flatten_traces
+from pywib.utils.validation import validate_any_not_none
+from pywib.utils.windows import windowed
+
+# Features of trajectory_geometry aggregated per session by geometry_metrics, the heading is an angle and has no mean
+GEOMETRY_FEATURES = ("mean_angular_velocity", "max_angular_velocity", "mean_curvature", "max_curvature",
+                     "total_turn", "direction_changes", "straightness")
+
+
+def _segment_max(values: np.ndarray, groups: np.ndarray, num_groups: int) -> np.ndarray:
+    """
+    Maximum of the values of every group, 0 for the groups without values.
+    """
+    result = np.zeros(num_groups)
+    np.maximum.at(result, groups, values)
+    return result
+
+
+def trajectory_geometry(df: pd.DataFrame = None, traces: dict[str, list[pd.DataFrame]] = None,
+                        angle_threshold: float = np.pi / 4) -> pd.DataFrame:
+    """
+    Calculate the heading, angular velocity, curvature, direction changes and straightness of every trace.
+
+    All the traces are processed at once from the flat dx, dy and dt arrays of their points: the headings of the
+    segments come from arctan2, the turning angles between consecutive segments are unwrapped to (-pi, pi] and
+    the per trace values are segmented reductions. Segments without length have no heading and are skipped.
+
+    Parameters:
+        df (pd.DataFrame): DataFrame containing 'sessionId', 'eventType', 'timeStamp', 'x' and 'y' columns.
+        traces (dict): A dictionary with keys as (sessionId) and values as lists of DataFrames. If None, traces will be computed from df.
+        angle_threshold (float): Turning angle in radians above which a turn counts as a direction change, by default pi / 4.
+    Returns:
+        pd.DataFrame: One row per trace with the 'sessionId', the 'trace_id' (position of the trace in the list of its
+                      session), the 'heading' from the start to the end (radians, screen coordinates with y downwards),
+                      the 'mean_angular_velocity' and 'max_angular_velocity' (absolute, rad/ms), the 'mean_curvature'
+                      and 'max_curvature' (absolute turning angle per px), the 'total_turn' (radians), the number of
+                      'direction_changes' and the 'straightness' index (straight-line distance over path length).
+    """
+    validate_any_not_none(df, traces)
+    if traces is None:
+        validate_dataframe(df)
+        points = _move_trace_points(df)
+    else:
+        points = _flatten_traces(traces)
+
+    x, y, t, offsets = points["x"], points["y"], points["time_stamp"], points["offsets"]
+    num_traces = len(offsets) - 1
+    trace = np.repeat(np.arange(num_traces), np.diff(offsets))
+    first, last = offsets[:-1], offsets[1:] - 1
+
+    # Segments with length, the ones between two traces are dropped
+    dx, dy, dt = np.diff(x), np.diff(y), np.diff(t)
+    ds = np.sqrt(dx * dx + dy * dy)
+    segments = np.flatnonzero((trace[1:] == trace[:-1]) & (ds > 0))
+    segment_trace = trace[segments]
+    heading = np.arctan2(dy[segments], dx[segments])
+
+    # Turns between consecutive segments of the same trace
+    consecutive = segment_trace[1:] == segment_trace[:-1]
+    turn_trace = segment_trace[1:][consecutive]
+    turn = np.diff(heading)[consecutive]
+    turn = np.abs((turn + np.pi) % (2 * np.pi) - np.pi)
+    turn_dt = dt[segments[1:]][consecutive]
+    turn_ds = ((ds[segments[:-1]] + ds[segments[1:]]) / 2)[consecutive]
+    moving = turn_dt > 0
+    angular_velocity = turn[moving] / turn_dt[moving]
+    curvature = turn / turn_ds
+
+    num_turns = np.bincount(turn_trace, minlength=num_traces)
+    num_moving = np.bincount(turn_trace[moving], minlength=num_traces)
+    path_length = np.bincount(segment_trace, weights=ds[segments], minlength=num_traces)
+    distance = np.hypot(x[last] - x[first], y[last] - y[first])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean_angular_velocity = np.bincount(turn_trace[moving], weights=angular_velocity, minlength=num_traces) / num_moving
+        mean_curvature = np.bincount(turn_trace, weights=curvature, minlength=num_traces) / num_turns
+        straightness = distance / path_length
+
+    return pd.DataFrame({
+        ColumnNames.SESSION_ID: np.asarray(points["sessions"], dtype=object)[points["codes"]],
+        "trace_id": points["trace_ids"],
+        "heading": np.arctan2(y[last] - y[first], x[last] - x[first]),
+        "mean_angular_velocity": np.where(num_moving > 0, mean_angular_velocity, 0.0),
+        "max_angular_velocity": _segment_max(angular_velocity, turn_trace[moving], num_traces),
+        "mean_curvature": np.where(num_turns > 0, mean_curvature, 0.0),
+        "max_curvature": _segment_max(curvature, turn_trace, num_traces),
+        "total_turn": np.bincount(turn_trace, weights=turn, minlength=num_traces),
+        "direction_changes": np.bincount(turn_trace[turn > angle_threshold], minlength=num_traces),
+        "straightness": np.where(path_length > 0, straightness, np.nan),
+    })
+
+
+@windowed
+def geometry_metrics(df: pd.DataFrame = None, traces: dict[str, list[pd.DataFrame]] = None,
+                     angle_threshold: float = np.pi / 4, computed_geometry: pd.DataFrame = None) -> dict:
+    """
+    Calculate the mean, max and min of the geometry features of the traces of every session.
+
+    Parameters:
+        df (pd.DataFrame): DataFrame containing 'sessionId', 'eventType', 'timeStamp', 'x' and 'y' columns.
+        traces (dict): A dictionary with keys as (sessionId) and values as lists of DataFrames. If None, traces will be computed from df.
+        angle_threshold (float): Turning angle in radians above which a turn counts as a direction change, by default pi / 4.
+        computed_geometry (pd.DataFrame): Precomputed result of :py:func:`trajectory_geometry`. If None, it is computed from df or traces.
+    Returns:
+        dict: A dictionary with keys as (sessionId) and values as dictionaries with the 'mean', 'max' and 'min' of
+              every feature of :py:func:`trajectory_geometry` but the heading over the traces of the session.
+    """
+    if computed_geometry is None:
+        computed_geometry = trajectory_geometry(df, traces, angle_threshold)
+
+    aggregates = computed_geometry.groupby(ColumnNames.SESSION_ID, sort=False)[list(GEOMETRY_FEATURES)].agg(
+        ["mean", "max", "min"])
+    return {session_id: {feature: {statistic: float(row[(feature, statistic)]) for statistic in ("mean", "max", "min")}
+                         for feature in GEOMETRY_FEATURES}
+            for session_id, row in aggregates.iterrows()}
@@ -6,6 +6,7 @@ from pywib.utils import (acceleration_traces, velocity_traces, velocity_df,
 from pywib.constants import ColumnNames
 from pywib.utils.movement import velocity_traces_parallel
 from pywib.utils.validation import validate_any_not_none
+from pywib.utils.windows import windowed
 
 def _traces_missing_column(traces: dict[str, list[pd.DataFrame]] | None, column_name: str) -> bool:
     if traces is None:
@@ -16,6 +17,7 @@ def _traces_missing_column(traces: dict[str, list[pd.DataFrame]] | None, column_
         for trace in session_traces
     )
 
+@windowed
 def velocity(df: pd.DataFrame = None, traces: dict[str, list[pd.DataFrame]] = None, per_traces: bool = True, parallel:bool = False, n_jobs: int = 2) -> dict[str, list[pd.DataFrame]]:
     """
     Function to calculate velocity for either a single DataFrame or a traces dictionary.
@@ -53,7 +55,9 @@ def velocity(df: pd.DataFrame = None, traces: dict[str, list[pd.DataFrame]] = No
     return velocity_traces(traces)
 
 
-def velocity_metrics(df: pd.DataFrame = None, traces: dict[str, list[pd.DataFrame]] = None) -> dict:
+@windowed
+def velocity_metrics(df: pd.DataFrame = None, traces: dict[str, list[pd.DataFrame]] = None, as_state: bool = False,
+                     quantiles: list[float] = None, sketch_size: int = 200) -> dict:
     """
     Calculate velocity metrics for the given DataFrame or traces.
     This function computes the mean, max, and min velocity for each session.
@@ -61,6 +65,9 @@ def velocity_metrics(df: pd.DataFrame = None, traces: dict[str, list[pd.DataFram
     Parameters:
         df (pd.DataFrame): DataFrame containing 'velocity' column.
         traces (dict): A dictionary with keys as (sessionId) and values as lists of DataFrames. If None, traces will be computed from df.
+        as_state (bool): If True, returns a mergeable :py:class:`~pywib.MetricState` per session instead of the final metrics.
+        quantiles (list[float]): Quantiles (between 0 and 1) to add to the metrics under the 'quantiles' key, estimated with a mergeable sketch.
+        sketch_size (int): Size of the quantile sketch, larger values are more accurate but use more memory. By default 200 (around 1% rank error).
 
     Returns:
         dict: A dictionary with keys as (sessionId) and values as dictionaries with 'mean ', 'max', and 'min' velocity.
@@ -81,9 +88,13 @@ def velocity_metrics(df: pd.DataFrame = None, traces: dict[str, list[pd.DataFram
         traces=traces,
         column_name=ColumnNames.VELOCITY,
         compute_traces_fn=lambda _: traces,
-        preprocess_fn=lambda s: s[s > 0]  # Exclude zero velocities
+        preprocess_fn=lambda s: s[s > 0],  # Exclude zero velocities
+        as_state=as_state,
+        quantiles=quantiles,
+        sketch_size=sketch_size,
     )
 
+@windowed
 def acceleration(df: pd.DataFrame = None, traces: dict[str, list[pd.DataFrame]] = None, per_traces: bool = True) -> dict[str, list[pd.DataFrame]]:
     """
     Wrapper function to calculate acceleration for either a single DataFrame or a traces dictionary.
@@ -105,7 +116,9 @@ def acceleration(df: pd.DataFrame = None, traces: dict[str, list[pd.DataFrame]]
     # Compute acceleration for each trace
     return acceleration_traces(traces)
 
-def acceleration_metrics(df: pd.DataFrame = None, traces: dict[str, list[pd.DataFrame]] = None) -> dict:
+@windowed
+def acceleration_metrics(df: pd.DataFrame = None, traces: dict[str, list[pd.DataFrame]] = None, as_state: bool = False,
+                         quantiles: list[float] = None, sketch_size: int = 200) -> dict:
     """
     Calculate acceleration metrics for the given DataFrame or traces.
     This function computes the mean, max, and min acceleration for each session.
@@ -113,6 +126,9 @@ def acceleration_metrics(df: pd.DataFrame = None, traces: dict[str, list[pd.Data
     Parameters:
         df (pd.DataFrame): DataFrame containing interaction data. Optionally already including 'acceleration' column.
         traces (dict): A dictionary with keys as (sessionId) and values as lists of DataFrames. If None, traces will be computed from df.
+        as_state (bool): If True, returns a mergeable :py:class:`~pywib.MetricState` per session instead of the final metrics.
+        quantiles (list[float]): Quantiles (between 0 and 1) to add to the metrics under the 'quantiles' key, estimated with a mergeable sketch.
+        sketch_size (int): Size of the quantile sketch, larger values are more accurate but use more memory. By default 200 (around 1% rank error).
     Returns:
         dict: A dictionary with keys as (sessionId) and values as dictionaries with 'mean', 'max', and 'min' acceleration.
     """
@@ -135,9 +151,13 @@ def acceleration_metrics(df: pd.DataFrame = None, traces: dict[str, list[pd.Data
         traces=traces,
         column_name=ColumnNames.ACCELERATION,
         compute_traces_fn=lambda _: traces,  # Already computed above
-        preprocess_fn=lambda s: s[s != 0]    # Exclude zero accelerations
+        preprocess_fn=lambda s: s[s != 0],   # Exclude zero accelerations
+        as_state=as_state,
+        quantiles=quantiles,
+        sketch_size=sketch_size,
     )
 
+@windowed
 def jerkiness(df: pd.DataFrame = None, traces: dict[str, list[pd.DataFrame]] = None, per_traces: bool = True) -> dict[str, list[pd.DataFrame]]:
     """
     Compute jerkiness for either a single DataFrame or multiple traces.
@@ -171,7 +191,9 @@ def jerkiness(df: pd.DataFrame = None, traces: dict[str, list[pd.DataFrame]] = N
     # Compute jerkiness for each trace
     return jerkiness_traces(traces)
 
-def jerkiness_metrics(df: pd.DataFrame, traces: dict[str, list[pd.DataFrame]] = None) -> dict:
+@windowed
+def jerkiness_metrics(df: pd.DataFrame, traces: dict[str, list[pd.DataFrame]] = None, as_state: bool = False,
+                      quantiles: list[float] = None, sketch_size: int = 200) -> dict:
     """
     Calculate jerkiness metrics for the given DataFrame or traces.
     This function computes the mean, max, and min jerkiness for each session.
@@ -179,6 +201,9 @@ def jerkiness_metrics(df: pd.DataFrame, traces: dict[str, list[pd.DataFrame]] =
     Parameters:
         df (pd.DataFrame): DataFrame containing interaction data. Optionally already including 'jerkiness' column.
         traces (dict): A dictionary with keys as (sessionId) and values as lists of DataFrames. If None, traces will be computed from df.
+        as_state (bool): If True, returns a mergeable :py:class:`~pywib.MetricState` per session instead of the final metrics.
+        quantiles (list[float]): Quantiles (between 0 and 1) to add to the metrics under the 'quantiles' key, estimated with a mergeable sketch.
+        sketch_size (int): Size of the quantile sketch, larger values are more accurate but use more memory. By default 200 (around 1% rank error).
     Returns:
         dict: A dictionary with keys as (sessionId) and values as dictionaries with 'mean', 'max', and 'min' jerkiness.
     """
@@ -202,6 +227,9 @@ def jerkiness_metrics(df: pd.DataFrame, traces: dict[str, list[pd.DataFrame]] =
         traces=traces,
         column_name=ColumnNames.JERKINESS,
         compute_traces_fn=lambda _: traces,  # Already computed above
-        preprocess_fn=lambda s: s[s != 0]    # Exclude zero jerkiness
+        preprocess_fn=lambda s: s[s != 0],   # Exclude zero jerkiness
+        as_state=as_state,
+        quantiles=quantiles,
+        sketch_size=sketch_size,
     )
 
@@ -7,9 +7,14 @@ from pywib.utils import (_path, validate_dataframe, compute_space_time_diff,
 from pywib.constants import ColumnNames
 from pywib.utils.movement import auc_df, auc_traces
 from pywib.utils.utils import deprecated
+from pywib.utils.aggregation import DeviationState, finalize_states
+from pywib.utils.cache import DiskCache, cached_trace_result
+from pywib.utils.simplify import simplify_trace, simplify_traces
 from pywib.utils.validation import validate_any_not_none
+from pywib.utils.windows import windowed
 
-def path(df: pd.DataFrame = None, traces: dict[str, list[pd.DataFrame]] = None) -> pd.DataFrame:
+@windowed
+def path(df: pd.DataFrame = None, traces: dict[str, list[pd.DataFrame]] = None, tolerance: float = None) -> pd.DataFrame:
     """
     Calculate the path length for the given DataFrame.
     This function computes the path length based on the Euclidean distance between consecutive points.
@@ -17,6 +22,7 @@ def path(df: pd.DataFrame = None, traces: dict[str, list[pd.DataFrame]] = None)
     Parameters:
         df (pd.DataFrame): DataFrame containing 'x' and 'y' columns.
         traces (dict): A dictionary with keys as (sessionId) and values as lists of DataFrames. If None, traces will be computed from df.
+        tolerance (float): Optional tolerance in pixels to simplify the traces with :py:func:`~pywib.simplify_traces` first.
 
     Returns:
         pd.DataFrame: DataFrame with an additional 'distance' column representing the path length.
@@ -27,6 +33,8 @@ def path(df: pd.DataFrame = None, traces: dict[str, list[pd.DataFrame]] = None)
     if traces is None:
         validate_dataframe(df)
         traces = extract_traces_by_session(df)
+    if tolerance is not None:
+        traces = simplify_traces(traces, tolerance)
 
     for session_id, session_traces in traces.items():
             for i in range(len(session_traces)):
@@ -42,7 +50,9 @@ def path(df: pd.DataFrame = None, traces: dict[str, list[pd.DataFrame]] = None)
     return traces
 
 
-def auc(df: pd.DataFrame, traces: dict[str, list[pd.DataFrame]] = None, per_traces: bool = True) -> tuple| dict:
+@windowed
+def auc(df: pd.DataFrame, traces: dict[str, list[pd.DataFrame]] = None, per_traces: bool = True,
+        cache: DiskCache = None, n_points: int = 100, tolerance: float = None) -> tuple| dict:
     """
     Calculate the Area Under the Curve (AUC) for the given DataFrame.
     
@@ -50,6 +60,9 @@ def auc(df: pd.DataFrame, traces: dict[str, list[pd.DataFrame]] = None, per_trac
         df (pd.DataFrame): DataFrame containing 'timeStamp' and 'y' columns.
         traces (dict): A dictionary with keys as (sessionId) and values as lists of DataFrames. If None, traces will be computed from df.
         per_traces (bool): Whether to compute traces by sessionId, by default True.
+        cache (DiskCache): Optional persistent cache, the AUC of a trace whose coordinates were already seen with the same `n_points` is read from it.
+        n_points (int): Number of points of the optimal path used by the geometric deviation, by default 100.
+        tolerance (float): Optional tolerance in pixels to simplify the traces with :py:func:`~pywib.simplify_traces` first.
     
     Returns:
         tuple: A tuple (Geometric Auc, Execution Auc) as values if not per traces.
@@ -59,15 +72,19 @@ def auc(df: pd.DataFrame, traces: dict[str, list[pd.DataFrame]] = None, per_trac
 
     if not per_traces:
         # Compute directly on the DataFrame (no trace extraction)
-        return auc_df(df)
+        if tolerance is not None:
+            df = simplify_trace(df, tolerance)
+        return cached_trace_result(cache, "auc", df, auc_df, n_points=n_points)
 
     # If traces are not provided, extract them from df
     if traces is None:
         validate_dataframe(df)
         traces = extract_traces_by_session(df)
+    if tolerance is not None:
+        traces = simplify_traces(traces, tolerance)
 
     # Compute auc for each trace
-    return auc_traces(traces)
+    return auc_traces(traces, cache=cache, n_points=n_points)
 
 
 @deprecated
@@ -166,13 +183,22 @@ def auc_ratio_metrics(df: pd.DataFrame = None, computed_auc: dict = None, traces
     return computed_auc
     
 
-def deviations(df: pd.DataFrame = None, traces: dict[str, list[pd.DataFrame]] = None) -> dict:
+def _trace_deviations(trace: pd.DataFrame) -> tuple[float, float]:
+    absolute_deviation = np.abs(trace[ColumnNames.Y] - trace[ColumnNames.Y].mean())
+    return np.mean(absolute_deviation), np.max(absolute_deviation)
+
+
+@windowed
+def deviations(df: pd.DataFrame = None, traces: dict[str, list[pd.DataFrame]] = None, as_state: bool = False,
+               cache: DiskCache = None) -> dict:
     """
     Calculate the Mean Absolute Deviation (MAD) for the given DataFrame.
 
     Parameters:
         df (pd.DataFrame): DataFrame containing 'y' column.
         traces (dict): A dictionary with keys as (sessionId) and values as lists of DataFrames. If None, traces will be computed from df.
+        as_state (bool): If True, returns a mergeable :py:class:`~pywib.DeviationState` per session instead of the final metrics.
+        cache (DiskCache): Optional persistent cache of the deviations of every trace.
     Returns:
         dict: A dictionary with keys as (sessionId) and values as dictionaries with 'mad_mean' (mean of maximum absolute deviations), 'mad_max' (maximum absolute deviation across all traces), 'mad_min' (minimum absolute deviation across all traces) and 'aad' (average absolute deviation).
     """
@@ -183,18 +209,13 @@ def deviations(df: pd.DataFrame = None, traces: dict[str, list[pd.DataFrame]] =
         validate_dataframe(df)
         traces = extract_traces_by_session(df)
 
-    metrics = {}
+    states = {}
     for session_id, session_traces in traces.items():
-        session_average_absolute_deviation = []
-        session_mad_max = []
+        state = DeviationState()
         for trace in session_traces:
-            session_average_absolute_deviation.append(np.mean(np.abs(trace[ColumnNames.Y] - trace[ColumnNames.Y].mean())))
-            session_mad_max.append(np.max(np.abs(trace[ColumnNames.Y] - trace[ColumnNames.Y].mean())))
-        metrics[session_id] = {
-            ColumnNames.AAD: np.mean(session_average_absolute_deviation) if session_average_absolute_deviation else 0,
-            ColumnNames.MAD_MAX: np.max(session_mad_max) if session_mad_max else 0,
-            ColumnNames.MEAN_MAD: np.mean(session_mad_max) if session_mad_max else 0,
-            ColumnNames.MIN_MAD: np.min(session_mad_max) if session_mad_max else 0,
-        }
+            state.update(*cached_trace_result(cache, "deviations", trace, _trace_deviations))
+        states[session_id] = state
 
-    return metrics
\ No newline at end of file
+    if as_state:
+        return states
+    return finalize_states(states)
@@ -4,7 +4,9 @@ from pywib.utils.segmentation import extract_traces_by_session
 from pywib.utils.timing import num_pauses_df, num_pauses_traces, pauses_metrics_df, pauses_metrics_per_trace
 from pywib.utils.utils import compute_space_time_diff
 from pywib.constants import ColumnNames
+from pywib.utils.windows import windowed
 
+@windowed
 def execution_time(df: pd.DataFrame) -> dict:
     """
     Calculate the total execution time of a session in milliseconds, without taking pauses into account.
@@ -26,6 +28,7 @@ def execution_time(df: pd.DataFrame) -> dict:
         total_time_per_session[session_id] = total_time
     return total_time_per_session
 
+@windowed
 def movement_time(df: pd.DataFrame, traces: dict[str, list[pd.DataFrame]] = None) -> dict:
     """
     Calculate the total movement time from traces in milliseconds, taking pauses into account.
@@ -54,6 +57,7 @@ def movement_time(df: pd.DataFrame, traces: dict[str, list[pd.DataFrame]] = None
 
     return movement_time_per_session
 
+@windowed
 def num_pauses(df: pd.DataFrame, traces:dict[str, list[pd.DataFrame]] = None, threshold: float = 100, computeTraces: bool = True) -> dict[str, dict]:
     """
     Calculate the number of pauses in the DataFrame.
@@ -81,7 +85,9 @@ def num_pauses(df: pd.DataFrame, traces:dict[str, list[pd.DataFrame]] = None, th
         return num_pauses_df(df, threshold)
 
 
-def pauses_metrics(df: pd.DataFrame, threshold: float = 100, traces: dict[str, list[pd.DataFrame]] = None, per_traces = True) -> dict:
+@windowed
+def pauses_metrics(df: pd.DataFrame, threshold: float = 100, traces: dict[str, list[pd.DataFrame]] = None, per_traces = True, as_state: bool = False,
+                   quantiles: list[float] = None, sketch_size: int = 200) -> dict:
     """
     Calculate pause metrics for the given DataFrame.
     
@@ -89,6 +95,9 @@ def pauses_metrics(df: pd.DataFrame, threshold: float = 100, traces: dict[str, l
         df (pd.DataFrame): DataFrame containing 'timeStamp' column.
         threshold (float): Time threshold in milliseconds to consider a pause, by default 100 ms.
         traces (dict): Dictionary with sessionId as keys and list of DataFrames as values.
+        as_state (bool): If True, returns a mergeable :py:class:`~pywib.PauseState` per session instead of the final metrics.
+        quantiles (list[float]): Quantiles (between 0 and 1) of the pause durations to add under the 'pause_quantiles' key, estimated with a mergeable sketch.
+        sketch_size (int): Size of the quantile sketch, larger values are more accurate but use more memory.
 
     Returns:
         dict: A dictionary with sessionId as keys and a dictionary of pause metrics as values.
@@ -100,9 +109,9 @@ def pauses_metrics(df: pd.DataFrame, threshold: float = 100, traces: dict[str, l
         if traces is None:
             validate_dataframe(df)
             traces = extract_traces_by_session(df)
-        return pauses_metrics_per_trace(traces, threshold)
+        return pauses_metrics_per_trace(traces, threshold, as_state=as_state, quantiles=quantiles, sketch_size=sketch_size)
     else:
         validate_dataframe(df)
-        return pauses_metrics_df(df, threshold)
+        return pauses_metrics_df(df, threshold, as_state=as_state, quantiles=quantiles, sketch_size=sketch_size)
     
     
\ No newline at end of file
@@ -0,0 +1,92 @@
+"""
+Session by feature tables built from the pywib metrics.
+"""
+
+import numbers
+
+import numpy as np
+import pandas as pd
+
+from .constants import ColumnNames
+from .utils.validation import validate_dataframe, validate_dataframe_keyboard
+from .core import (velocity_metrics, acceleration_metrics, jerkiness_metrics, pauses_metrics, num_pauses,
+                   movement_time, execution_time, number_of_clicks, click_slip, deviations,
+                   typing_speed_metrics, backspace_usage)
+
+# Metrics that summarize every session, computed from the interaction events
+FEATURE_METRICS = {
+    "velocity_metrics": lambda df, threshold: velocity_metrics(df),
+    "acceleration_metrics": lambda df, threshold: acceleration_metrics(df),
+    "jerkiness_metrics": lambda df, threshold: jerkiness_metrics(df),
+    "deviations": lambda df, threshold: deviations(df),
+    "pauses_metrics": lambda df, threshold: pauses_metrics(df, threshold),
+    "num_pauses": lambda df, threshold: num_pauses(df, threshold=threshold),
+    "movement_time": lambda df, threshold: movement_time(df),
+    "execution_time": lambda df, threshold: execution_time(df),
+    "number_of_clicks": lambda df, threshold: number_of_clicks(df),
+    "click_slip": lambda df, threshold: click_slip(df),
+    "typing_speed_metrics": lambda df, threshold: typing_speed_metrics(df),
+    "backspace_usage": lambda df, threshold: backspace_usage(df),
+}
+
+_KEYBOARD_METRICS = ("typing_speed_metrics", "backspace_usage")
+
+DEFAULT_FEATURE_METRICS = [metric for metric in FEATURE_METRICS if metric not in _KEYBOARD_METRICS]
+
+
+def _flatten(prefix: str, value, row: dict):
+    """
+    Add the scalar values of a (possibly nested) metric result to the row, lists are left out.
+    """
+    if isinstance(value, dict):
+        for key, item in value.items():
+            _flatten(f"{prefix}.{key}", item, row)
+    elif isinstance(value, (numbers.Number, np.number, bool, np.bool_)):
+        row[prefix] = value
+
+
+def check_feature_metrics(metrics: list[str] | None) -> list[str]:
+    """
+    Validate a list of feature metric names.
+
+    Parameters:
+        metrics (list[str]): Names of the metrics, any of :py:data:`FEATURE_METRICS`. If None, :py:data:`DEFAULT_FEATURE_METRICS`.
+    Returns:
+        list[str]: The metric names.
+    """
+    if metrics is None:
+        return list(DEFAULT_FEATURE_METRICS)
+    for metric in metrics:
+        if metric not in FEATURE_METRICS:
+            raise ValueError(f"Unknown metric: {metric}")
+    return list(metrics)
+
+
+def session_features(df: pd.DataFrame, metrics: list[str] = None, threshold: float = 100) -> pd.DataFrame:
+    """
+    Compute a table with one row per session and one column per feature.
+
+    Nested metric results are flattened into 'metric.key' columns (e.g. 'velocity_metrics.mean') and metrics that
+    return a single value per session are named after the metric (e.g. 'movement_time'). Lists such as the pause
+    durations are left out.
+
+    Parameters:
+        df (pd.DataFrame): DataFrame containing the interaction events of one or more sessions.
+        metrics (list[str]): Names of the metrics to compute, any of :py:data:`FEATURE_METRICS`. By default all but the keyboard ones.
+        threshold (float): Time threshold in milliseconds to consider a pause, by default 100 ms.
+    Returns:
+        pd.DataFrame: The features, indexed by sessionId.
+    """
+    metrics = check_feature_metrics(metrics)
+    validate_dataframe(df)
+    if any(metric in _KEYBOARD_METRICS for metric in metrics):
+        validate_dataframe_keyboard(df)
+
+    rows = {session_id: {} for session_id in pd.unique(df[ColumnNames.SESSION_ID])}
+    for metric in metrics:
+        for session_id, value in FEATURE_METRICS[metric](df.copy(), threshold).items():
+            _flatten(metric, value, rows.setdefault(session_id, {}))
+
+    features = pd.DataFrame.from_dict(rows, orient='index')
+    features.index.name = ColumnNames.SESSION_ID
+    return features
@@ -0,0 +1,285 @@
+"""
+Polars execution backend for the segmentation and the session metrics.
+
+The functions accept a `polars.DataFrame` or `polars.LazyFrame` and mirror the pandas functions of the same name,
+returning the same result structures. They are built as lazy Polars expressions: the traces are run-length group ids
+computed with window expressions over the sessionId, so the whole log is processed in a single multi-threaded query
+plan instead of a Python loop per session and trace.
+
+Example:
+    import polars as pl
+    from pywib import polars_backend
+
+    events = pl.scan_parquet("logs/*.parquet")
+    polars_backend.velocity_metrics(events)
+"""
+
+import numpy as np
+
+from .constants import ColumnNames, EventTypes, KeyCodeEvents
+from .utils.aggregation import MetricState, PauseState, finalize_states
+from .utils.validation import required_columns, keyboard_columns
+
+_MOVE_EVENTS = [EventTypes.EVENT_ON_MOUSE_MOVE, EventTypes.EVENT_ON_TOUCH_MOVE]
+_TRACE_ID = "_trace_id"
+_TRACE = [ColumnNames.SESSION_ID, _TRACE_ID]
+
+
+def _import_polars():
+    try:
+        import polars as pl
+    except ImportError as e:
+        raise ImportError(
+            "The Polars backend requires 'polars'. Install it with 'pip install pywib[polars]'."
+        ) from e
+    return pl
+
+
+def _lazy(df, columns: list[str] = None):
+    """
+    Validate the input and return it as a LazyFrame sorted by timeStamp, with a numeric timeStamp.
+    """
+    pl = _import_polars()
+    if isinstance(df, pl.DataFrame):
+        lf = df.lazy()
+    elif isinstance(df, pl.LazyFrame):
+        lf = df
+    else:
+        raise ValueError(f"Expected a polars DataFrame or LazyFrame, got {type(df).__name__}.")
+
+    names = lf.collect_schema().names()
+    for col in required_columns + list(columns or []):
+        if col not in names:
+            raise ValueError(f"Missing required column: {col}")
+    # The sort is stable, so events with the same timeStamp keep the order of the log
+    return (lf.with_columns(pl.col(ColumnNames.TIME_STAMP).cast(pl.Float64, strict=False))
+              .sort(ColumnNames.TIME_STAMP, maintain_order=True))
+
+
+def _trace_diff(pl, column: str):
+    return pl.col(column).diff().fill_null(0).over(_TRACE)
+
+
+def _trace_points(lf):
+    """
+    Movement events that belong to a trace, with the id of their trace.
+    """
+    pl = _import_polars()
+    is_move = pl.col(ColumnNames.EVENT_TYPE).is_in(_MOVE_EVENTS)
+    # Every non-move event starts a new run, the moves of a run are a trace if there are at least two of them
+    return (lf.with_columns((~is_move).cast(pl.UInt32).cum_sum().over(ColumnNames.SESSION_ID).alias(_TRACE_ID))
+              .filter(is_move)
+              .filter(pl.len().over(_TRACE) >= 2))
+
+
+def _move_traces(lf):
+    """
+    Movement events that belong to a trace, with the trace id and the kinematics of every point.
+    """
+    pl = _import_polars()
+    dt = pl.col(ColumnNames.DT)
+    return (_trace_points(lf)
+            .with_columns(_trace_diff(pl, ColumnNames.X).cast(pl.Float64).alias(ColumnNames.DX),
+                          _trace_diff(pl, ColumnNames.Y).cast(pl.Float64).alias(ColumnNames.DY),
+                          _trace_diff(pl, ColumnNames.TIME_STAMP).alias(ColumnNames.DT))
+            .with_columns(pl.when(dt != 0)
+                            .then((pl.col(ColumnNames.DX) ** 2 + pl.col(ColumnNames.DY) ** 2).sqrt() / dt)
+                            .otherwise(0.0).alias(ColumnNames.VELOCITY))
+            .with_columns(pl.when(dt != 0)
+                            .then(_trace_diff(pl, ColumnNames.VELOCITY) / dt)
+                            .otherwise(0.0).alias(ColumnNames.ACCELERATION))
+            .with_columns(pl.when(dt != 0)
+                            .then(_trace_diff(pl, ColumnNames.ACCELERATION) / dt)
+                            .otherwise(0.0).alias(ColumnNames.JERKINESS)))
+
+
+def extract_traces_by_session(df, as_pandas: bool = False) -> dict:
+    """
+    Extract the movement traces of every session, see :py:func:`~pywib.extract_traces_by_session`.
+
+    Parameters:
+        df (pl.DataFrame | pl.LazyFrame): Interaction events with 'sessionId', 'eventType', 'timeStamp', 'x' and 'y' columns.
+        as_pandas (bool): If True, the traces are returned as pandas DataFrames, to use them with the pandas metrics.
+    Returns:
+        dict: A dictionary with sessionIds as keys and lists of traces as values.
+    """
+    pl = _import_polars()
+    lf = _lazy(df)
+    sessions, moves = pl.collect_all([lf.select(pl.col(ColumnNames.SESSION_ID).unique()), _trace_points(lf)])
+
+    traces = {session_id: [] for session_id in sorted(sessions.to_series().to_list())}
+    for (session_id, _), trace in moves.partition_by(_TRACE, maintain_order=True, as_dict=True).items():
+        trace = trace.drop(_TRACE_ID)
+        traces[session_id].append(trace.to_pandas() if as_pandas else trace)
+    return traces
+
+
+def compute_space_time_diff(df):
+    """
+    Add the 'dx', 'dy' and 'dt' between consecutive events of every session, see :py:func:`~pywib.compute_space_time_diff`.
+
+    Parameters:
+        df (pl.DataFrame | pl.LazyFrame): Interaction events with 'sessionId', 'timeStamp', 'x' and 'y' columns.
+    Returns:
+        pl.DataFrame | pl.LazyFrame: The events sorted by timeStamp with the new columns, of the same type as `df`.
+    """
+    pl = _import_polars()
+    lf = _lazy(df).with_columns(
+        *(pl.col(column).diff().fill_null(0).over(ColumnNames.SESSION_ID).cast(pl.Float64).alias(name)
+          for column, name in ((ColumnNames.TIME_STAMP, ColumnNames.DT), (ColumnNames.X, ColumnNames.DX),
+                               (ColumnNames.Y, ColumnNames.DY))))
+    return lf if isinstance(df, pl.LazyFrame) else lf.collect()
+
+
+def _kinematic_metrics(df, column: str, keep, as_state: bool) -> dict:
+    pl = _import_polars()
+    lf = _lazy(df)
+    value = pl.col(column).filter(keep(pl.col(column)))
+    # Grouped before filtering, so that the sessions with traces but no kept values get an empty state as in pandas
+    aggregates = (_move_traces(lf)
+                  .group_by(ColumnNames.SESSION_ID)
+                  .agg(value.len().alias("count"), value.sum().alias("sum"), (value ** 2).sum().alias("sum_sq"),
+                       value.min().alias("min"), value.max().alias("max"))
+                  .sort(ColumnNames.SESSION_ID)
+                  .collect())
+
+    # Only the sessions with traces, the pandas metrics leave the others out
+    states = {}
+    for row in aggregates.iter_rows(named=True):
+        states[row[ColumnNames.SESSION_ID]] = (MetricState() if row["count"] == 0 else
+                                               MetricState(row["count"], row["sum"], row["sum_sq"],
+                                                           np.float64(row["min"]), np.float64(row["max"])))
+    if as_state:
+        return states
+    return finalize_states(states)
+
+
+def velocity_metrics(df, as_state: bool = False) -> dict:
+    """
+    Mean, maximum and minimum velocity of the movement traces of every session, see :py:func:`~pywib.velocity_metrics`.
+
+    Parameters:
+        df (pl.DataFrame | pl.LazyFrame): Interaction events with 'sessionId', 'eventType', 'timeStamp', 'x' and 'y' columns.
+        as_state (bool): If True, returns a mergeable :py:class:`~pywib.MetricState` per session instead of the final metrics.
+    Returns:
+        dict: A dictionary with sessionIds as keys and 'mean', 'max' and 'min' velocities as values.
+    """
+    return _kinematic_metrics(df, ColumnNames.VELOCITY, lambda value: value > 0, as_state)
+
+
+def acceleration_metrics(df, as_state: bool = False) -> dict:
+    """
+    Mean, maximum and minimum acceleration of the movement traces of every session, see :py:func:`~pywib.acceleration_metrics`.
+
+    Parameters:
+        df (pl.DataFrame | pl.LazyFrame): Interaction events with 'sessionId', 'eventType', 'timeStamp', 'x' and 'y' columns.
+        as_state (bool): If True, returns a mergeable :py:class:`~pywib.MetricState` per session instead of the final metrics.
+    Returns:
+        dict: A dictionary with sessionIds as keys and 'mean', 'max' and 'min' accelerations as values.
+    """
+    return _kinematic_metrics(df, ColumnNames.ACCELERATION, lambda value: value != 0, as_state)
+
+
+def jerkiness_metrics(df, as_state: bool = False) -> dict:
+    """
+    Mean, maximum and minimum jerkiness of the movement traces of every session, see :py:func:`~pywib.jerkiness_metrics`.
+
+    Parameters:
+        df (pl.DataFrame | pl.LazyFrame): Interaction events with 'sessionId', 'eventType', 'timeStamp', 'x' and 'y' columns.
+        as_state (bool): If True, returns a mergeable :py:class:`~pywib.MetricState` per session instead of the final metrics.
+    Returns:
+        dict: A dictionary with sessionIds as keys and 'mean', 'max' and 'min' jerkiness as values.
+    """
+    return _kinematic_metrics(df, ColumnNames.JERKINESS, lambda value: value != 0, as_state)
+
+
+def _trace_pauses(df, threshold: float):
+    """
+    Number of traces and durations of the pauses inside them, by session.
+    """
+    pl = _import_polars()
+    lf = _lazy(df)
+    dt = pl.col(ColumnNames.DT)
+    pauses = (_move_traces(lf)
+              .group_by(ColumnNames.SESSION_ID)
+              .agg(pl.col(_TRACE_ID).n_unique().alias("num_traces"), dt.filter(dt > threshold).alias("pauses")))
+    sessions, pauses = pl.collect_all([lf.select(pl.col(ColumnNames.SESSION_ID).unique()), pauses])
+    result = {session_id: (0, []) for session_id in sorted(sessions.to_series().to_list())}
+    for row in pauses.iter_rows(named=True):
+        result[row[ColumnNames.SESSION_ID]] = (row["num_traces"], row["pauses"])
+    return result
+
+
+def pauses_metrics(df, threshold: float = 100, as_state: bool = False) -> dict:
+    """
+    Pauses inside the movement traces of every session, see :py:func:`~pywib.pauses_metrics`.
+
+    Parameters:
+        df (pl.DataFrame | pl.LazyFrame): Interaction events with 'sessionId', 'eventType', 'timeStamp', 'x' and 'y' columns.
+        threshold (float): Time threshold in milliseconds to consider a pause, by default 100 ms.
+        as_state (bool): If True, returns a mergeable :py:class:`~pywib.PauseState` per session instead of the final metrics.
+    Returns:
+        dict: A dictionary with sessionIds as keys and a dictionary of pause metrics as values.
+    """
+    states = {}
+    for session_id, (num_traces, durations) in _trace_pauses(df, threshold).items():
+        states[session_id] = PauseState(durations, num_traces)
+    if as_state:
+        return states
+    return finalize_states(states)
+
+
+def num_pauses(df, threshold: float = 100) -> dict:
+    """
+    Number of pauses inside the movement traces of every session, see :py:func:`~pywib.num_pauses`.
+
+    Parameters:
+        df (pl.DataFrame | pl.LazyFrame): Interaction events with 'sessionId', 'eventType', 'timeStamp', 'x' and 'y' columns.
+        threshold (float): Time threshold in milliseconds to consider a pause, by default 100 ms.
+    Returns:
+        dict: A dictionary with sessionIds as keys and the total and mean per trace number of pauses as values.
+    """
+    metrics = {}
+    for session_id, (num_traces, durations) in _trace_pauses(df, threshold).items():
+        metrics[session_id] = {
+            ColumnNames.NUMBER_OF_PAUSES: len(durations),
+            ColumnNames.MEAN_PAUSE_PER_TRACE: len(durations) / num_traces if num_traces > 0 else 0
+        }
+    return metrics
+
+
+def _count_events(lf, condition) -> dict:
+    counts = (lf.group_by(ColumnNames.SESSION_ID)
+                .agg(condition.sum().alias("count"))
+                .sort(ColumnNames.SESSION_ID)
+                .collect())
+    return {session_id: int(count) for session_id, count in counts.iter_rows()}
+
+
+def number_of_clicks(df) -> dict:
+    """
+    Number of clicks of every session, see :py:func:`~pywib.number_of_clicks`.
+
+    Parameters:
+        df (pl.DataFrame | pl.LazyFrame): Interaction events with 'sessionId' and 'eventType' columns.
+    Returns:
+        dict: A dictionary with sessionIds as keys and the number of clicks as values.
+    """
+    pl = _import_polars()
+    return _count_events(_lazy(df), pl.col(ColumnNames.EVENT_TYPE) == EventTypes.EVENT_ON_CLICK)
+
+
+def backspace_usage(df) -> dict:
+    """
+    Number of backspace and delete key presses of every session, see :py:func:`~pywib.backspace_usage`.
+
+    Parameters:
+        df (pl.DataFrame | pl.LazyFrame): Interaction events with 'sessionId', 'eventType' and 'keyCodeEvent' columns.
+    Returns:
+        dict: A dictionary with sessionIds as keys and the number of backspaces as values.
+    """
+    pl = _import_polars()
+    is_backspace = ((pl.col(ColumnNames.EVENT_TYPE) == EventTypes.EVENT_KEY_DOWN)
+                    & pl.col(ColumnNames.KEY_CODE_EVENT).cast(pl.Int64, strict=False)
+                        .is_in([KeyCodeEvents.KEY_CODE_BACKSPACE, KeyCodeEvents.KEY_CODE_DELETE]))
+    return _count_events(_lazy(df, keyboard_columns), is_backspace.fill_null(False))
@@ -0,0 +1,207 @@
+"""
+Persistent on-disk store of session features, updated incrementally by session.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from . import __version__
+from .constants import ColumnNames
+from .features import check_feature_metrics, session_features
+from .utils.io import columns_for_metrics
+from .utils.validation import validate_dataframe
+
+_INDEX_FILE = "_index.parquet"
+_PARTITION_FILE = "part.parquet"
+_DATE = "date"
+_CONTENT_HASH = "content_hash"
+_SETTINGS = "settings"
+
+
+def _date_partition(date) -> str:
+    return pd.Timestamp(date).strftime("%Y-%m-%d")
+
+
+def _write_parquet(df: pd.DataFrame, path: str):
+    # Written to a temporary file first, so an interrupted write never leaves a truncated file
+    temporary = path + ".tmp"
+    df.to_parquet(temporary, index=False)
+    os.replace(temporary, path)
+
+
+def session_hashes(df: pd.DataFrame, columns: list[str] = None) -> pd.Series:
+    """
+    Content hash of the events of every session, independent of the order of the rows and of the other sessions.
+
+    Parameters:
+        df (pd.DataFrame): DataFrame containing the interaction events.
+        columns (list[str]): Columns to hash, by default the base interaction columns present in the DataFrame.
+    Returns:
+        pd.Series: Hexadecimal hashes indexed by sessionId.
+    """
+    if columns is None:
+        columns = columns_for_metrics(None)
+    columns = [col for col in columns if col in df.columns]
+    rows = pd.util.hash_pandas_object(df[columns], index=False).to_numpy()
+    codes, uniques = pd.factorize(df[ColumnNames.SESSION_ID], sort=False)
+    time_stamp = pd.to_numeric(df[ColumnNames.TIME_STAMP], errors='coerce').to_numpy(dtype=float)
+    # Events with the same timeStamp are ordered by their own hash, so the order of the rows does not matter
+    order = np.lexsort((rows, time_stamp, codes))
+    rows = rows[order]
+    codes = codes[order]
+    boundaries = np.r_[0, np.flatnonzero(np.diff(codes)) + 1, len(codes)]
+    hashes = [hashlib.sha1(rows[start:end].tobytes()).hexdigest() for start, end in zip(boundaries[:-1], boundaries[1:])]
+    return pd.Series(hashes, index=pd.Index(uniques, name=ColumnNames.SESSION_ID))
+
+
+class FeatureStore:
+    """
+    Local store of the features of every session (see :py:func:`~pywib.session_features`), partitioned by date in Parquet files.
+
+    Every session is stored with a content hash of its events, so :py:meth:`update` only computes the sessions that are
+    new or whose events changed. A small index of sessionId, date and hash is kept apart from the partitions for point
+    lookups without scanning the store.
+    """
+
+    def __init__(self, path: str, metrics: list[str] = None, threshold: float = 100):
+        """
+        Parameters:
+            path (str): Directory of the store, created if it does not exist.
+            metrics (list[str]): Names of the metrics, any of :py:data:`~pywib.features.FEATURE_METRICS`.
+            threshold (float): Time threshold in milliseconds to consider a pause, by default 100 ms.
+        """
+        self.path = os.fspath(path)
+        self.metrics = check_feature_metrics(metrics)
+        self.threshold = threshold
+        # Features computed with other metrics, threshold or pywib version are computed again
+        self._settings = hashlib.sha1(json.dumps([sorted(self.metrics), threshold, __version__]).encode("utf-8")).hexdigest()
+        os.makedirs(self.path, exist_ok=True)
+        self._index = self._load_index()
+
+    def _load_index(self) -> pd.DataFrame:
+        index_path = os.path.join(self.path, _INDEX_FILE)
+        if not os.path.exists(index_path):
+            return pd.DataFrame({_DATE: pd.Series(dtype=str), _CONTENT_HASH: pd.Series(dtype=str),
+                                 _SETTINGS: pd.Series(dtype=str)}, index=pd.Index([], name=ColumnNames.SESSION_ID))
+        return pd.read_parquet(index_path).set_index(ColumnNames.SESSION_ID)
+
+    def _partition_path(self, date: str) -> str:
+        return os.path.join(self.path, f"{_DATE}={date}", _PARTITION_FILE)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, session_id) -> bool:
+        return session_id in self._index.index
+
+    @property
+    def sessions(self) -> pd.DataFrame:
+        """
+        Date and content hash of every stored session, indexed by sessionId.
+        """
+        return self._index[[_DATE, _CONTENT_HASH]].copy()
+
+    def update(self, df: pd.DataFrame) -> dict:
+        """
+        Add the sessions of the DataFrame to the store, computing only the new or modified ones.
+
+        The other sessions of the rewritten partitions that were computed with other settings are dropped, so every
+        partition has the columns of a single set of metrics. They are computed as new sessions when their events are
+        given again.
+
+        Parameters:
+            df (pd.DataFrame): DataFrame containing all the events of one or more sessions.
+        Returns:
+            dict: Number of 'new', 'modified' and 'unchanged' sessions, and of the 'dropped' sessions of other settings.
+        """
+        validate_dataframe(df)
+        hashes = session_hashes(df, columns_for_metrics(self.metrics))
+        stored = self._index.reindex(hashes.index)
+        is_new = stored[_CONTENT_HASH].isna().to_numpy()
+        is_stale = ~is_new & ((stored[_CONTENT_HASH] != hashes) | (stored[_SETTINGS] != self._settings)).to_numpy()
+        changed = hashes.index[is_new | is_stale]
+        stats = {"new": int(is_new.sum()), "modified": int(is_stale.sum()), "unchanged": int(len(hashes) - len(changed)),
+                 "dropped": 0}
+        if len(changed) == 0:
+            return stats
+
+        events = df[df[ColumnNames.SESSION_ID].isin(changed)]
+        features = session_features(events, self.metrics, self.threshold)
+        first_event = pd.to_numeric(events[ColumnNames.TIME_STAMP], errors='coerce').groupby(events[ColumnNames.SESSION_ID]).min()
+        dates = pd.to_datetime(first_event, unit='ms', utc=True).dt.strftime("%Y-%m-%d").reindex(features.index)
+
+        # Partitions are rewritten with the old rows of the changed sessions removed, also from their previous date
+        affected = set(dates) | set(self._index.loc[self._index.index.intersection(changed), _DATE])
+        other_settings = self._index.index[(self._index[_SETTINGS] != self._settings).to_numpy()].difference(changed)
+        dropped = []
+        for date in sorted(affected):
+            partition = self._partition_path(date)
+            parts = []
+            if os.path.exists(partition):
+                previous = pd.read_parquet(partition)
+                kept = ~previous[ColumnNames.SESSION_ID].isin(changed)
+                stale = previous[ColumnNames.SESSION_ID].isin(other_settings)
+                dropped.extend(previous.loc[kept & stale, ColumnNames.SESSION_ID])
+                parts.append(previous[kept & ~stale])
+            parts.append(features[(dates == date).to_numpy()].reset_index())
+            parts = [part for part in parts if not part.empty]
+            if parts:
+                os.makedirs(os.path.dirname(partition), exist_ok=True)
+                _write_parquet(pd.concat(parts, ignore_index=True), partition)
+            elif os.path.exists(partition):
+                shutil.rmtree(os.path.dirname(partition))
+
+        updates = pd.DataFrame({_DATE: dates, _CONTENT_HASH: hashes.reindex(features.index), _SETTINGS: self._settings})
+        self._index = pd.concat([self._index.drop(index=changed.union(dropped), errors='ignore'), updates])
+        self._index.index.name = ColumnNames.SESSION_ID
+        _write_parquet(self._index.reset_index(), os.path.join(self.path, _INDEX_FILE))
+        stats["dropped"] = len(dropped)
+        return stats
+
+    def get(self, session_id) -> pd.Series | None:
+        """
+        Features of a single session, reading only its partition.
+
+        Parameters:
+            session_id: The sessionId.
+        Returns:
+            pd.Series | None: The features of the session, None if it is not stored.
+        """
+        if session_id not in self:
+            return None
+        partition = self._partition_path(self._index.at[session_id, _DATE])
+        row = pd.read_parquet(partition, filters=[(ColumnNames.SESSION_ID, "==", session_id)])
+        return row.set_index(ColumnNames.SESSION_ID).iloc[0].rename(session_id)
+
+    def scan(self, sessions: list = None, start=None, end=None) -> pd.DataFrame:
+        """
+        Features of the stored sessions, reading only the partitions of the requested dates.
+
+        Parameters:
+            sessions (list): Only return these sessionIds.
+            start (str | datetime): Only return sessions whose first event is on or after this date (UTC).
+            end (str | datetime): Only return sessions whose first event is before this date (UTC).
+        Returns:
+            pd.DataFrame: The features indexed by sessionId, with the 'date' of every session.
+        """
+        index = self._index
+        if sessions is not None:
+            index = index[index.index.isin(list(sessions))]
+        if start is not None:
+            index = index[index[_DATE] >= _date_partition(start)]
+        if end is not None:
+            index = index[index[_DATE] < _date_partition(end)]
+
+        parts = []
+        for date, group in index.groupby(_DATE, sort=True):
+            filters = None if sessions is None else [(ColumnNames.SESSION_ID, "in", list(group.index))]
+            part = pd.read_parquet(self._partition_path(date), filters=filters)
+            parts.append(part.assign(**{_DATE: date}))
+        if not parts:
+            return pd.DataFrame(index=pd.Index([], name=ColumnNames.SESSION_ID))
+        return pd.concat(parts, ignore_index=True).set_index(ColumnNames.SESSION_ID)
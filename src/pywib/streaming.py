@@ -0,0 +1,405 @@
+"""
+Asynchronous ingestion of interaction event streams with windowed metric emission.
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from typing import AsyncIterator
+
+import numpy as np
+import pandas as pd
+
+from .constants import ColumnNames, EventTypes
+from .utils.validation import required_columns, validate_dataframe_keyboard
+from .core import (velocity, acceleration, jerkiness, velocity_metrics, acceleration_metrics, jerkiness_metrics,
+                   pauses_metrics, num_pauses, movement_time, execution_time, number_of_clicks, click_slip,
+                   typing_speed_metrics)
+
+_MOVE_EVENTS = (EventTypes.EVENT_ON_MOUSE_MOVE, EventTypes.EVENT_ON_TOUCH_MOVE)
+_KEY_EVENTS = (EventTypes.EVENT_KEY_UP, EventTypes.EVENT_KEY_DOWN, EventTypes.EVENT_KEY_PRESS)
+
+# Every metric receives the events of the window, its movement traces and its keystroke traces
+STREAM_METRICS = {
+    "velocity_metrics": lambda df, traces, keystrokes, threshold: velocity_metrics(None, velocity(None, traces)),
+    "acceleration_metrics": lambda df, traces, keystrokes, threshold: acceleration_metrics(
+        None, acceleration(None, velocity(None, traces))),
+    "jerkiness_metrics": lambda df, traces, keystrokes, threshold: jerkiness_metrics(
+        None, jerkiness(None, acceleration(None, velocity(None, traces)))),
+    "pauses_metrics": lambda df, traces, keystrokes, threshold: pauses_metrics(None, threshold, traces=traces),
+    "num_pauses": lambda df, traces, keystrokes, threshold: num_pauses(df, traces, threshold),
+    "movement_time": lambda df, traces, keystrokes, threshold: movement_time(None, traces),
+    "execution_time": lambda df, traces, keystrokes, threshold: execution_time(df),
+    "number_of_clicks": lambda df, traces, keystrokes, threshold: number_of_clicks(df),
+    "click_slip": lambda df, traces, keystrokes, threshold: click_slip(df),
+    "typing_speed_metrics": lambda df, traces, keystrokes, threshold: typing_speed_metrics(None, keystrokes),
+}
+
+_KEYBOARD_METRICS = ("typing_speed_metrics",)
+
+
+def _window_metrics(session_id, start: float, end: float, records: list[dict], move_ids: np.ndarray,
+                    key_ids: np.ndarray, metrics: list[str], threshold: float) -> dict:
+    """
+    Compute the metrics of the events of a session window. Runs in the executor of the pipeline.
+    """
+    df = pd.DataFrame.from_records(records)
+    event_type = df[ColumnNames.EVENT_TYPE]
+
+    is_move = event_type.isin(_MOVE_EVENTS).to_numpy()
+    traces = {session_id: [trace for _, trace in df[is_move].groupby(move_ids[is_move]) if len(trace) >= 2]}
+
+    keystrokes = None
+    if any(metric in _KEYBOARD_METRICS for metric in metrics):
+        validate_dataframe_keyboard(df)
+        is_key = event_type.isin(_KEY_EVENTS).to_numpy()
+        keystrokes = {session_id: [trace for _, trace in df[is_key].groupby(key_ids[is_key])]}
+
+    results = {}
+    for metric in metrics:
+        value = STREAM_METRICS[metric](df, traces, keystrokes, threshold)
+        if session_id in value:
+            results[metric] = value[session_id]
+    return {ColumnNames.SESSION_ID: session_id, "start": start, "end": end, "metrics": results}
+
+
+class _StreamSession:
+    """
+    Segmentation and window state of a session of the stream.
+    """
+    __slots__ = ("move_trace", "key_trace", "last_time", "last_seen", "next_start", "events")
+
+    def __init__(self):
+        # Same rules as utils/segmentation.py: a trace is a run of consecutive move (or key) events,
+        # so every other event starts a new one
+        self.move_trace = 0
+        self.key_trace = 0
+        self.last_time = None
+        # Wall-clock time of the last event, for the idle timeout
+        self.last_seen = None
+        self.next_start = None
+        # (timeStamp, record, move trace, keystroke trace) of the events of the windows still open
+        self.events = deque()
+
+
+class StreamPipeline:
+    """
+    Computes per-session metrics over an asynchronous stream of interaction events on tumbling or sliding windows.
+
+    Events are segmented into movement and keystroke traces as they arrive. A window of a session is closed when an event
+    of that session at or after its end arrives, when the watermark (the latest timeStamp of the stream minus
+    `allowed_lateness`) passes its end, or when the stream ends, and its metrics are computed in an executor so the event
+    loop keeps ingesting. A session is closed and forgotten when it sends a tracking end event, when all its windows are
+    closed by the watermark, or when it sends nothing for `idle_timeout` seconds, so sessions that go quiet on a stream
+    that never ends still emit their last windows and free their state. When `max_pending` windows are being computed and
+    `max_pending` more are waiting, the pipeline stops reading from the source until the consumer catches up.
+    """
+
+    def __init__(self, metrics: list[str] = None, window: float = 10_000, step: float = None, threshold: float = 100,
+                 max_pending: int = 8, executor=None, allowed_lateness: float = None, idle_timeout: float = None):
+        """
+        Parameters:
+            metrics (list[str]): Names of the metrics to compute, any of :py:data:`STREAM_METRICS`. By default all but the keyboard ones.
+            window (float): Length of the windows in milliseconds.
+            step (float): Time between the start of consecutive windows in milliseconds. If None, the windows are tumbling (`step = window`).
+            threshold (float): Time threshold in milliseconds to consider a pause, by default 100 ms.
+            max_pending (int): Maximum number of windows being computed, and of closed windows waiting to be computed.
+            executor (concurrent.futures.Executor): Executor for the metric computations. If None, the default executor of the event loop is used.
+            allowed_lateness (float): Time in milliseconds the events of a session may lag behind the latest timeStamp of the stream.
+                                      Older events are dropped as late. If None, there is no watermark.
+            idle_timeout (float): Wall-clock seconds without events after which a session is closed. If None, sessions do not time out.
+        """
+        if metrics is None:
+            metrics = [metric for metric in STREAM_METRICS if metric not in _KEYBOARD_METRICS]
+        for metric in metrics:
+            if metric not in STREAM_METRICS:
+                raise ValueError(f"Metric '{metric}' is not supported in streaming mode.")
+        if step is None:
+            step = window
+        if window <= 0 or step <= 0 or step > window:
+            raise ValueError("'window' and 'step' must be positive, and 'step' must not be larger than 'window'.")
+        if max_pending < 1:
+            raise ValueError("'max_pending' must be at least 1.")
+        if (allowed_lateness is not None and allowed_lateness < 0) or (idle_timeout is not None and idle_timeout <= 0):
+            raise ValueError("'allowed_lateness' must not be negative and 'idle_timeout' must be positive.")
+
+        self.metrics = list(metrics)
+        self.window = window
+        self.step = step
+        self.threshold = threshold
+        self.max_pending = max_pending
+        self.executor = executor
+        self.allowed_lateness = allowed_lateness
+        self.idle_timeout = idle_timeout
+        self.late_events = 0
+        self._sessions = {}
+        self._watermark = None
+        self._next_expiry = None
+
+    def _first_window(self, time_stamp: float) -> float:
+        """
+        Start of the first window that contains the given time.
+        """
+        return (math.floor((time_stamp - self.window) / self.step) + 1) * self.step
+
+    def _close_windows(self, session_id, session: _StreamSession, until: float | None):
+        """
+        Windows of the session that end before `until` (all of them if None), pruning the events no window needs anymore.
+        """
+        while session.events and (until is None or session.next_start + self.window <= until):
+            # Skip the windows without events
+            session.next_start = max(session.next_start, self._first_window(session.events[0][0]))
+            start, end = session.next_start, session.next_start + self.window
+            if until is not None and end > until:
+                break
+            window = [event for event in session.events if event[0] < end]
+            if window:
+                yield (session_id, start, end, [event[1] for event in window],
+                       np.array([event[2] for event in window]), np.array([event[3] for event in window]),
+                       self.metrics, self.threshold)
+            session.next_start += self.step
+            while session.events and session.events[0][0] < session.next_start:
+                session.events.popleft()
+
+    def _add(self, record: dict):
+        """
+        Add an event to its session, returning the windows it closes.
+        """
+        for col in required_columns:
+            if col not in record:
+                raise ValueError(f"Missing required column: {col}")
+        session_id = record[ColumnNames.SESSION_ID]
+        time_stamp = float(record[ColumnNames.TIME_STAMP])
+        if self._watermark is not None and time_stamp < self._watermark:
+            self.late_events += 1
+            return []
+        session = self._sessions.get(session_id)
+        if session is None:
+            session = self._sessions[session_id] = _StreamSession()
+            session.next_start = self._first_window(time_stamp)
+        elif time_stamp < session.last_time:
+            self.late_events += 1
+            return []
+
+        windows = list(self._close_windows(session_id, session, time_stamp))
+        event_type = record[ColumnNames.EVENT_TYPE]
+        if event_type not in _MOVE_EVENTS:
+            session.move_trace += 1
+        if event_type not in _KEY_EVENTS:
+            session.key_trace += 1
+        session.last_time = time_stamp
+        session.last_seen = time.monotonic()
+        session.events.append((time_stamp, dict(record), session.move_trace, session.key_trace))
+        if event_type == EventTypes.EVENT_TRACKING_END:
+            windows += self._end_session(session_id)
+        if self.allowed_lateness is not None:
+            windows += self._advance_watermark(time_stamp - self.allowed_lateness)
+        return windows
+
+    def _end_session(self, session_id) -> list:
+        """
+        Close all the windows of a session and forget it.
+        """
+        session = self._sessions.pop(session_id)
+        return list(self._close_windows(session_id, session, None))
+
+    def _advance_watermark(self, watermark: float) -> list:
+        """
+        Close the windows of every session that end before the watermark, forgetting the sessions left without events.
+        """
+        previous = self._watermark
+        if previous is not None and watermark <= previous:
+            return []
+        self._watermark = watermark
+        # Windows end at `k * step + window`, so nothing can close until the watermark crosses one of those times
+        if previous is not None and (math.floor((watermark - self.window) / self.step)
+                                     == math.floor((previous - self.window) / self.step)):
+            return []
+        windows = []
+        for session_id, session in list(self._sessions.items()):
+            windows += self._close_windows(session_id, session, watermark)
+            # Its later events would be at or after the watermark, so they cannot fall in the closed windows
+            if not session.events:
+                del self._sessions[session_id]
+        return windows
+
+    def _expire_idle(self) -> list:
+        """
+        Close the sessions without events for `idle_timeout` seconds, checked at most twice per timeout.
+        """
+        now = time.monotonic()
+        if self.idle_timeout is None or (self._next_expiry is not None and now < self._next_expiry):
+            return []
+        self._next_expiry = now + self.idle_timeout / 2
+        windows = []
+        for session_id in [session_id for session_id, session in self._sessions.items()
+                           if now - session.last_seen >= self.idle_timeout]:
+            windows += self._end_session(session_id)
+        return windows
+
+    async def _read(self, source, windows: asyncio.Queue):
+        iterator = source.__aiter__()
+        next_record = None
+        try:
+            while True:
+                if next_record is None:
+                    next_record = asyncio.ensure_future(iterator.__anext__())
+                # The wait is bounded so that idle sessions are closed while the source sends nothing
+                timeout = self.idle_timeout / 2 if self.idle_timeout is not None else None
+                await asyncio.wait({next_record}, timeout=timeout)
+                closed = []
+                if next_record.done():
+                    try:
+                        record = next_record.result()
+                    except StopAsyncIteration:
+                        next_record = None
+                        break
+                    next_record = None
+                    closed = self._add(record)
+                closed += self._expire_idle()
+                for window in closed:
+                    await windows.put(window)
+        finally:
+            if next_record is not None:
+                next_record.cancel()
+        for session_id in list(self._sessions):
+            for window in self._end_session(session_id):
+                await windows.put(window)
+        await windows.put(None)
+
+    async def run(self, source) -> AsyncIterator[dict]:
+        """
+        Consume a stream of events and yield the metrics of every window as soon as they are computed.
+
+        Parameters:
+            source (AsyncIterable[dict]): Event records with 'sessionId', 'eventType', 'timeStamp', 'x' and 'y' keys
+                                          (and 'keyValueEvent', 'keyCodeEvent' for the keyboard metrics). The events of a
+                                          session must arrive in timeStamp order, older events are dropped and counted
+                                          in `late_events`.
+        Returns:
+            AsyncIterator[dict]: Dictionaries with 'sessionId', 'start', 'end' and 'metrics' (metric name to the value
+                                 of the session), in the order the windows are closed.
+        """
+        loop = asyncio.get_running_loop()
+        windows = asyncio.Queue(self.max_pending)
+        reader = asyncio.ensure_future(self._read(source, windows))
+        pending = deque()
+        get = None
+        try:
+            while True:
+                if get is None:
+                    get = asyncio.ensure_future(windows.get())
+                waiting = {pending[0]} if pending else set()
+                if len(pending) < self.max_pending:
+                    waiting |= {get, reader}
+                await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+
+                while pending and pending[0].done():
+                    yield pending.popleft().result()
+                if reader.done() and reader.exception() is not None:
+                    raise reader.exception()
+                if get.done():
+                    window = get.result()
+                    get = None
+                    if window is None:
+                        break
+                    pending.append(loop.run_in_executor(self.executor, _window_metrics, *window))
+            while pending:
+                yield await pending.popleft()
+        finally:
+            if get is not None:
+                get.cancel()
+            reader.cancel()
+
+
+def stream_metrics(source, metrics: list[str] = None, window: float = 10_000, step: float = None, threshold: float = 100,
+                   max_pending: int = 8, executor=None, allowed_lateness: float = None,
+                   idle_timeout: float = None) -> AsyncIterator[dict]:
+    """
+    Compute per-session metrics over an asynchronous stream of interaction events on tumbling or sliding windows.
+    See :py:class:`~pywib.StreamPipeline`.
+
+    Parameters:
+        source (AsyncIterable[dict]): Event records with 'sessionId', 'eventType', 'timeStamp', 'x' and 'y' keys.
+        metrics (list[str]): Names of the metrics to compute, any of :py:data:`STREAM_METRICS`.
+        window (float): Length of the windows in milliseconds.
+        step (float): Time between the start of consecutive windows in milliseconds. If None, the windows are tumbling.
+        threshold (float): Time threshold in milliseconds to consider a pause, by default 100 ms.
+        max_pending (int): Maximum number of windows being computed, and of closed windows waiting to be computed.
+        executor (concurrent.futures.Executor): Executor for the metric computations.
+        allowed_lateness (float): Time in milliseconds the events of a session may lag behind the latest timeStamp of the stream.
+        idle_timeout (float): Wall-clock seconds without events after which a session is closed.
+    Returns:
+        AsyncIterator[dict]: The metrics of every window, see :py:meth:`StreamPipeline.run`.
+    """
+    pipeline = StreamPipeline(metrics=metrics, window=window, step=step, threshold=threshold,
+                              max_pending=max_pending, executor=executor, allowed_lateness=allowed_lateness,
+                              idle_timeout=idle_timeout)
+    return pipeline.run(source)
+
+
+class LocalEventSource:
+    """
+    In-process stand-in for a live event source such as a websocket tracker, for tests and local replays.
+
+    Events are pushed with :py:meth:`send` and consumed with `async for`. The buffer is bounded, so a producer that
+    sends faster than the pipeline consumes is slowed down.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        """
+        Parameters:
+            maxsize (int): Maximum number of buffered events, 0 for unbounded.
+        """
+        self._queue = asyncio.Queue(maxsize)
+        self._closed = object()
+        self._task = None
+
+    async def send(self, record: dict):
+        """
+        Push an event record.
+        """
+        await self._queue.put(record)
+
+    async def close(self):
+        """
+        End the stream once the buffered events are consumed.
+        """
+        await self._queue.put(self._closed)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> dict:
+        record = await self._queue.get()
+        if record is self._closed:
+            raise StopAsyncIteration
+        return record
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame, speed: float = None, maxsize: int = 1024) -> "LocalEventSource":
+        """
+        Replay the events of a DataFrame in timeStamp order. Must be called from a running event loop.
+
+        Parameters:
+            df (pd.DataFrame): The interaction events.
+            speed (float): Replay speed relative to the timeStamps (2 is twice as fast). If None, the events are sent without delays.
+            maxsize (int): Maximum number of buffered events.
+        Returns:
+            LocalEventSource: The source, fed by a task of the running event loop.
+        """
+        source = cls(maxsize)
+        records = df.sort_values(by=ColumnNames.TIME_STAMP, kind='mergesort').to_dict('records')
+
+        async def replay():
+            previous = None
+            for record in records:
+                if speed is not None and previous is not None:
+                    await asyncio.sleep(max(record[ColumnNames.TIME_STAMP] - previous, 0) / 1000.0 / speed)
+                previous = record[ColumnNames.TIME_STAMP]
+                await source.send(record)
+            await source.close()
+
+        source._task = asyncio.ensure_future(replay())
+        return source
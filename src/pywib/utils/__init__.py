@@ -4,11 +4,27 @@ Utility functions for PyWib
 
 from .validation import validate_dataframe, validate_dataframe_keyboard, validate_duplicate_timestamps
 from .segmentation import extract_traces_by_session, extract_mouse_click_traces_by_session, extract_mouse_click_traces_by_session_with_intial_pause
-from .visualization import visualize_trace, video_from_trace, keyboard_heatmap
+from .visualization import (visualize_trace, video_from_trace, keyboard_heatmap, replay_frames, replay_session,
+                            keyboard_counts, keyboard_heatmaps)
 from .utils import compute_space_time_diff, compute_metrics_from_traces
 from .movement import (acceleration_traces, velocity_traces, velocity_df, 
                        acceleration_df, jerkiness_df, jerkiness_traces, _path,
                        auc_ratio_traces)
+from .io import read_interactions, iter_interactions, columns_for_metrics
+from .sketches import KLLSketch
+from .aggregation import (MetricState, PauseState, DeviationState, ClickSlipState, TypingSpeedState,
+                          merge_states, finalize_states)
+from .chunked import chunked_metrics, iter_chunks, ChunkedAggregator
+from .incremental import IncrementalSession
+from .traceset import TraceSet, write_traces
+from .cache import DiskCache
+from .windows import SessionIndex
+from .rolling import rolling_metrics
+from .simplify import rdp_mask, simplify_trace, simplify_traces
+from .rendering import render_traces, render_sessions
+from .heatmaps import DensityHeatmap
+from .downsample import lttb_indices, downsample_trace
+from .similarity import dtw_distance, lb_kim, lb_keogh, dtw_nearest, dtw_matrix
 
 __all__ = [
     'validate_dataframe',
@@ -28,6 +44,43 @@ __all__ = [
     'extract_mouse_click_traces_by_session',
     'extract_mouse_click_traces_by_session_with_intial_pause',
     'video_from_trace',
+    'replay_frames',
+    'replay_session',
     'validate_duplicate_timestamps',
-    'keyboard_heatmap'
+    'keyboard_heatmap',
+    'keyboard_counts',
+    'keyboard_heatmaps',
+    'read_interactions',
+    'iter_interactions',
+    'columns_for_metrics',
+    'chunked_metrics',
+    'iter_chunks',
+    'ChunkedAggregator',
+    'IncrementalSession',
+    'TraceSet',
+    'write_traces',
+    'DiskCache',
+    'SessionIndex',
+    'rolling_metrics',
+    'rdp_mask',
+    'simplify_trace',
+    'simplify_traces',
+    'render_traces',
+    'render_sessions',
+    'DensityHeatmap',
+    'lttb_indices',
+    'downsample_trace',
+    'dtw_distance',
+    'lb_kim',
+    'lb_keogh',
+    'dtw_nearest',
+    'dtw_matrix',
+    'KLLSketch',
+    'MetricState',
+    'PauseState',
+    'DeviationState',
+    'ClickSlipState',
+    'TypingSpeedState',
+    'merge_states',
+    'finalize_states',
 ]
\ No newline at end of file
@@ -0,0 +1,361 @@
+"""
+Mergeable partial aggregates of the session metrics.
+
+Every metric that summarizes a session (e.g. :py:func:`~pywib.velocity_metrics` or :py:func:`~pywib.pauses_metrics`)
+can return one of these states per session instead of the final dictionary. States computed over different shards
+of the data can be combined with `merge()` and turned into the usual result with `finalize()`. Shards must not split
+a trace, as the metrics are computed trace by trace.
+"""
+
+import numpy as np
+
+from ..constants import ColumnNames
+from ..utils.sketches import KLLSketch
+
+
+def _quantile_values(quantiles: tuple | None, sketch: KLLSketch | None) -> dict:
+    if sketch is None:
+        return {q: np.nan for q in quantiles}
+    return dict(zip(quantiles, sketch.quantiles(quantiles).tolist()))
+
+
+def _merge_sketches(state, other):
+    """
+    Merge the sketches of two states. A state without sketch and with values makes the quantiles unavailable.
+    """
+    if state.sketch is not None and other.sketch is not None:
+        return state.sketch.merge(other.sketch)
+    if other.sketch is None and _state_count(other) == 0:
+        return state.sketch
+    if state.sketch is None and _state_count(state) == 0:
+        return other.sketch
+    return None
+
+
+def _state_count(state) -> int:
+    return state.count
+
+
+class MetricState:
+    """
+    Mergeable state of a stream of values: count, sum, sum of squares, min and max, and optionally
+    a :py:class:`~pywib.KLLSketch` to estimate quantiles.
+    """
+    __slots__ = ("count", "sum", "sum_sq", "min", "max", "quantiles", "sketch")
+
+    def __init__(self, count: int = 0, sum: float = 0.0, sum_sq: float = 0.0, min: float = np.inf, max: float = -np.inf,
+                 quantiles: list[float] = None, sketch: KLLSketch = None):
+        """
+        Parameters:
+            quantiles (list[float]): Quantiles (between 0 and 1) to add to the final metrics.
+            sketch (KLLSketch): Sketch of the values. If None and `quantiles` are given, a sketch with the default size is created.
+        """
+        self.count = count
+        self.sum = sum
+        self.sum_sq = sum_sq
+        self.min = min
+        self.max = max
+        self.quantiles = tuple(quantiles) if quantiles is not None else None
+        if sketch is None and quantiles is not None and count == 0:
+            sketch = KLLSketch()
+        self.sketch = sketch
+
+    @classmethod
+    def from_values(cls, values, quantiles: list[float] = None, sketch_size: int = 200) -> "MetricState":
+        """
+        Build the state of the given values.
+
+        Parameters:
+            values (array-like): The values to aggregate.
+            quantiles (list[float]): Quantiles (between 0 and 1) to add to the final metrics.
+            sketch_size (int): Size `k` of the quantile sketch.
+        Returns:
+            MetricState: The state of the values.
+        """
+        state = cls(quantiles=quantiles, sketch=KLLSketch(sketch_size) if quantiles is not None else None)
+        state.update(values)
+        return state
+
+    def update(self, values):
+        """
+        Add values to the state.
+
+        Parameters:
+            values (array-like): The values to aggregate.
+        """
+        values = np.asarray(values, dtype=float)
+        if values.size == 0:
+            return
+        self.count += int(values.size)
+        self.sum += values.sum()
+        self.sum_sq += np.square(values).sum()
+        self.min = np.minimum(self.min, values.min())
+        self.max = np.maximum(self.max, values.max())
+        if self.sketch is not None:
+            self.sketch.update(values)
+
+    def merge(self, other: "MetricState") -> "MetricState":
+        """
+        Combine this state with another one.
+
+        Parameters:
+            other (MetricState): State computed over other values.
+        Returns:
+            MetricState: A new state equivalent to aggregating the values of both states.
+        """
+        return MetricState(
+            self.count + other.count,
+            self.sum + other.sum,
+            self.sum_sq + other.sum_sq,
+            np.minimum(self.min, other.min),
+            np.maximum(self.max, other.max),
+            quantiles=self.quantiles if self.quantiles is not None else other.quantiles,
+            sketch=_merge_sketches(self, other),
+        )
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count > 0 else np.nan
+
+    @property
+    def variance(self) -> float:
+        """
+        Population variance of the values.
+        """
+        if self.count == 0:
+            return np.nan
+        return max(self.sum_sq / self.count - self.mean ** 2, 0.0)
+
+    def finalize(self) -> dict:
+        """
+        Returns:
+            dict: A dictionary with 'mean', 'max' and 'min' of the values, NaN if there are no values.
+                  If quantiles were requested, 'quantiles' maps every quantile to its estimated value.
+        """
+        if self.count == 0:
+            metrics = {'mean': np.nan, 'max': np.nan, 'min': np.nan}
+        else:
+            metrics = {'mean': self.mean, 'max': self.max, 'min': self.min}
+        if self.quantiles is not None:
+            metrics['quantiles'] = _quantile_values(self.quantiles, self.sketch)
+        return metrics
+
+
+class PauseState:
+    """
+    Mergeable state of :py:func:`~pywib.pauses_metrics` for a session.
+
+    The count, sum, max and min of the durations are kept up to date, so the metrics are obtained in constant time and
+    the list of durations is only copied when it is requested.
+    """
+    __slots__ = ("pause_durations", "num_traces", "quantiles", "sketch", "count", "sum", "max", "min")
+
+    def __init__(self, pause_durations: list[float] = None, num_traces: int | None = 0,
+                 quantiles: list[float] = None, sketch: KLLSketch = None):
+        """
+        Parameters:
+            pause_durations (list[float]): Durations of the pauses in milliseconds.
+            num_traces (int | None): Number of traces the pauses were searched in. None when computed without segmentation.
+            quantiles (list[float]): Quantiles (between 0 and 1) of the pause durations to add to the final metrics.
+            sketch (KLLSketch): Sketch of the pause durations. If None and `quantiles` are given, it is built from `pause_durations`.
+        """
+        self.pause_durations = list(pause_durations) if pause_durations is not None else []
+        self.num_traces = num_traces
+        self.count = len(self.pause_durations)
+        self.sum = float(np.sum(self.pause_durations)) if self.count > 0 else 0.0
+        self.max = max(self.pause_durations) if self.count > 0 else None
+        self.min = min(self.pause_durations) if self.count > 0 else None
+        self.quantiles = tuple(quantiles) if quantiles is not None else None
+        if sketch is None and quantiles is not None:
+            sketch = KLLSketch()
+            sketch.update(self.pause_durations)
+        self.sketch = sketch
+
+    def update(self, pause_durations, num_traces: int = 1):
+        """
+        Add the pauses found in some traces to the state.
+
+        Parameters:
+            pause_durations (array-like): Durations of the pauses in milliseconds.
+            num_traces (int): Number of traces the pauses were searched in.
+        """
+        pause_durations = [float(duration) for duration in pause_durations]
+        if pause_durations:
+            self.pause_durations.extend(pause_durations)
+            self.count += len(pause_durations)
+            self.sum += float(np.sum(pause_durations))
+            self.max = max(pause_durations) if self.max is None else max(self.max, max(pause_durations))
+            self.min = min(pause_durations) if self.min is None else min(self.min, min(pause_durations))
+        if self.num_traces is not None:
+            self.num_traces += num_traces
+        if self.sketch is not None:
+            self.sketch.update(pause_durations)
+
+    def merge(self, other: "PauseState") -> "PauseState":
+        num_traces = None if self.num_traces is None or other.num_traces is None else self.num_traces + other.num_traces
+        return PauseState(self.pause_durations + other.pause_durations, num_traces,
+                          quantiles=self.quantiles if self.quantiles is not None else other.quantiles,
+                          sketch=_merge_sketches(self, other))
+
+    def finalize(self, pause_durations: bool = True) -> dict:
+        """
+        Parameters:
+            pause_durations (bool): Whether to add the list of the durations of the pauses, by default True.
+        Returns:
+            dict: The metrics of :py:func:`~pywib.pauses_metrics`.
+        """
+        total_pauses = self.count
+        metrics = {
+            "total_pauses": total_pauses,
+            "mean_pause_duration": self.sum / total_pauses if total_pauses > 0 else 0,
+        }
+        if pause_durations:
+            metrics["pause_durations"] = list(self.pause_durations)
+        if self.num_traces is not None:
+            metrics["mean_pauses_per_trace"] = total_pauses / self.num_traces if total_pauses > 0 else 0
+        metrics["max_pause"] = self.max if total_pauses > 0 else 0
+        metrics["min_pause"] = self.min if total_pauses > 0 else 0
+        if self.quantiles is not None:
+            metrics["pause_quantiles"] = _quantile_values(self.quantiles, self.sketch)
+        return metrics
+
+
+class DeviationState:
+    """
+    Mergeable state of :py:func:`~pywib.deviations` for a session, built from the deviations of every trace.
+    """
+    __slots__ = ("aad", "mad")
+
+    def __init__(self, aad: MetricState = None, mad: MetricState = None):
+        """
+        Parameters:
+            aad (MetricState): State of the average absolute deviation of every trace.
+            mad (MetricState): State of the maximum absolute deviation of every trace.
+        """
+        self.aad = aad if aad is not None else MetricState()
+        self.mad = mad if mad is not None else MetricState()
+
+    def update(self, average_absolute_deviation: float, maximum_absolute_deviation: float):
+        """
+        Add the deviations of a trace to the state.
+        """
+        self.aad.update([average_absolute_deviation])
+        self.mad.update([maximum_absolute_deviation])
+
+    def merge(self, other: "DeviationState") -> "DeviationState":
+        return DeviationState(self.aad.merge(other.aad), self.mad.merge(other.mad))
+
+    def finalize(self) -> dict:
+        return {
+            ColumnNames.AAD: self.aad.mean if self.aad.count > 0 else 0,
+            ColumnNames.MAD_MAX: self.mad.max if self.mad.count > 0 else 0,
+            ColumnNames.MEAN_MAD: self.mad.mean if self.mad.count > 0 else 0,
+            ColumnNames.MIN_MAD: self.mad.min if self.mad.count > 0 else 0,
+        }
+
+
+class ClickSlipState:
+    """
+    Mergeable state of :py:func:`~pywib.click_slip` for a session.
+    """
+    __slots__ = ("distances", "durations")
+
+    def __init__(self, distances: MetricState = None, durations: MetricState = None):
+        """
+        Parameters:
+            distances (MetricState): State of the moved distances of the clicks considered slips.
+            durations (MetricState): State of the durations of all the clicks.
+        """
+        self.distances = distances if distances is not None else MetricState()
+        self.durations = durations if durations is not None else MetricState()
+
+    def merge(self, other: "ClickSlipState") -> "ClickSlipState":
+        return ClickSlipState(self.distances.merge(other.distances), self.durations.merge(other.durations))
+
+    def finalize(self) -> dict:
+        has_slips = self.distances.count > 0
+        has_clicks = self.durations.count > 0
+        return {
+            ColumnNames.CLICK_SLIPS: self.distances.count,
+            ColumnNames.MAX_CLICK_SLIP: self.distances.max if has_slips else 0,
+            ColumnNames.MIN_CLICK_SLIP: self.distances.min if has_slips else 0,
+            ColumnNames.MEAN_CLICK_SLIP: self.distances.mean if has_slips else 0,
+            ColumnNames.MEAN_CLICK_DURATION: self.durations.mean if has_clicks else 0,
+            ColumnNames.MAX_CLICK_DURATION: self.durations.max if has_clicks else 0,
+            ColumnNames.MIN_CLICK_DURATION: self.durations.min if has_clicks else 0,
+        }
+
+
+class TypingSpeedState:
+    """
+    Mergeable state of :py:func:`~pywib.typing_speed_metrics` for a session, built from every keystroke trace.
+    """
+    __slots__ = ("speeds", "total_chars", "total_time", "keydown_to_keyup", "latencies")
+
+    def __init__(self, speeds: MetricState = None, total_chars: int = 0, total_time: float = 0.0,
+                 keydown_to_keyup: MetricState = None, latencies: MetricState = None):
+        """
+        Parameters:
+            speeds (MetricState): State of the typing speed (CPM) of every trace.
+            total_chars (int): Number of characters typed.
+            total_time (float): Time spent typing in seconds.
+            keydown_to_keyup (MetricState): State of the mean keydown to keyup duration of every trace.
+            latencies (MetricState): State of the keydown to keyup duration of every keystroke, used for the quantiles.
+        """
+        self.speeds = speeds if speeds is not None else MetricState()
+        self.total_chars = total_chars
+        self.total_time = total_time
+        self.keydown_to_keyup = keydown_to_keyup if keydown_to_keyup is not None else MetricState()
+        self.latencies = latencies
+
+    def merge(self, other: "TypingSpeedState") -> "TypingSpeedState":
+        if self.latencies is not None and other.latencies is not None:
+            latencies = self.latencies.merge(other.latencies)
+        else:
+            latencies = None
+        return TypingSpeedState(
+            self.speeds.merge(other.speeds),
+            self.total_chars + other.total_chars,
+            self.total_time + other.total_time,
+            self.keydown_to_keyup.merge(other.keydown_to_keyup),
+            latencies,
+        )
+
+    def finalize(self) -> dict:
+        metrics = {
+            "average_typing_speed": self.speeds.mean,
+            ColumnNames.TOTAL_CHARS: self.total_chars,
+            "total_time_seconds": self.total_time,
+            "avg_keydown_to_keyup_duration": self.keydown_to_keyup.mean,
+        }
+        if self.latencies is not None and self.latencies.quantiles is not None:
+            metrics["keydown_to_keyup_quantiles"] = _quantile_values(self.latencies.quantiles, self.latencies.sketch)
+        return metrics
+
+
+def merge_states(*results: dict) -> dict:
+    """
+    Merge the per-session states computed over several shards of the data.
+
+    Parameters:
+        results (dict): Dictionaries with sessionIds as keys and states as values, as returned by the metrics with `as_state=True`.
+    Returns:
+        dict: A dictionary with sessionIds as keys and the merged states as values.
+    """
+    merged = {}
+    for result in results:
+        for session_id, state in result.items():
+            merged[session_id] = merged[session_id].merge(state) if session_id in merged else state
+    return merged
+
+
+def finalize_states(states: dict) -> dict:
+    """
+    Turn the per-session states into the final metrics.
+
+    Parameters:
+        states (dict): A dictionary with sessionIds as keys and states as values.
+    Returns:
+        dict: A dictionary with sessionIds as keys and the metrics of every session as values.
+    """
+    return {session_id: state.finalize() for session_id, state in states.items()}
@@ -0,0 +1,215 @@
+"""
+Persistent memoization of expensive per-trace results.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import time
+
+import numpy as np
+import pandas as pd
+
+from ..constants import ColumnNames
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    last_access REAL NOT NULL
+)
+"""
+
+# Running total of the stored sizes, kept in the file so that every process sees the values stored by the others
+_TOTALS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS totals (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    size INTEGER NOT NULL
+)
+"""
+
+
+def trace_key(name: str, trace: pd.DataFrame, **params) -> str:
+    """
+    Cache key of a per-trace result: a hash of the coordinates of the trace, the function name and its parameters.
+
+    Parameters:
+        name (str): Name of the cached function.
+        trace (pd.DataFrame): The trace, with 'x' and 'y' columns.
+        **params: Parameters of the function that change its result, they must be JSON serializable.
+    Returns:
+        str: The hexadecimal key.
+    """
+    digest = hashlib.sha1()
+    digest.update(json.dumps([name, params], sort_keys=True, default=str).encode("utf-8"))
+    for column in (ColumnNames.X, ColumnNames.Y):
+        digest.update(np.ascontiguousarray(trace[column].to_numpy(dtype=np.float64)).tobytes())
+    return digest.hexdigest()
+
+
+class DiskCache:
+    """
+    Size-bounded persistent cache stored in a single SQLite file.
+
+    Values are pickled. When the stored values exceed `max_size` bytes, the least recently used ones are evicted.
+    The cache can be shared by several processes and survives interpreter restarts. The total size of the values is
+    updated with every change instead of summed over the table, so storing a value does not depend on the number of
+    entries.
+    """
+
+    def __init__(self, path: str, max_size: int = 256 * 1024 ** 2):
+        """
+        Parameters:
+            path (str): File of the cache, created if it does not exist.
+            max_size (int): Maximum total size in bytes of the stored values.
+        """
+        self.path = os.fspath(path)
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._connect()
+
+    def _connect(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(_SCHEMA)
+        self._connection.execute("CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access)")
+        self._connection.execute(_TOTALS_SCHEMA)
+        # Counted once, for the files created before the totals were stored
+        self._connection.execute("INSERT OR IGNORE INTO totals (id, size) SELECT 0, COALESCE(SUM(size), 0) FROM entries")
+
+    def __getstate__(self):
+        # The connection cannot be pickled, worker processes open their own
+        state = self.__dict__.copy()
+        del state["_connection"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._connect()
+
+    def __len__(self) -> int:
+        return self._connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def __contains__(self, key: str) -> bool:
+        return self._connection.execute("SELECT 1 FROM entries WHERE key = ?", (key,)).fetchone() is not None
+
+    def get(self, key: str, default=None):
+        """
+        Obtain a stored value.
+
+        Parameters:
+            key (str): The key of the value.
+            default: Value returned if the key is not stored.
+        Returns:
+            The stored value, or `default`.
+        """
+        row = self._connection.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self._connection.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+        return pickle.loads(row[0])
+
+    def set(self, key: str, value):
+        """
+        Store a value, evicting the least recently used ones if the cache exceeds its size.
+
+        Parameters:
+            key (str): The key of the value.
+            value: Any picklable value.
+        """
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._transaction():
+            row = self._connection.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            self._connection.execute("INSERT OR REPLACE INTO entries (key, value, size, last_access) VALUES (?, ?, ?, ?)",
+                                     (key, sqlite3.Binary(data), len(data), time.time()))
+            size = self._add_size(len(data) - (row[0] if row is not None else 0))
+            if size > self.max_size:
+                self._evict(size)
+
+    def _transaction(self):
+        return _Transaction(self._connection)
+
+    def _add_size(self, delta: int) -> int:
+        self._connection.execute("UPDATE totals SET size = size + ? WHERE id = 0", (delta,))
+        return self._connection.execute("SELECT size FROM totals WHERE id = 0").fetchone()[0]
+
+    def _evict(self, size: int):
+        rows = self._connection.execute("SELECT key, size FROM entries ORDER BY last_access")
+        evicted = []
+        freed = 0
+        for key, entry_size in rows:
+            if size - freed <= self.max_size:
+                break
+            evicted.append((key,))
+            freed += entry_size
+        rows.close()
+        self._connection.executemany("DELETE FROM entries WHERE key = ?", evicted)
+        self._add_size(-freed)
+        self.evictions += len(evicted)
+
+    def clear(self):
+        """
+        Remove all the stored values.
+        """
+        with self._transaction():
+            self._connection.execute("DELETE FROM entries")
+            self._connection.execute("UPDATE totals SET size = 0 WHERE id = 0")
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            dict: 'hits', 'misses' and 'evictions' of this instance, and the number of 'entries' and their total 'size' in bytes.
+        """
+        entries = len(self)
+        size = self._connection.execute("SELECT size FROM totals WHERE id = 0").fetchone()[0]
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": entries,
+            "size": size,
+        }
+
+    def close(self):
+        self._connection.close()
+
+
+class _Transaction:
+    """
+    Write transaction of an autocommit connection, taking the lock at the start so concurrent writers wait.
+    """
+
+    def __init__(self, connection: sqlite3.Connection):
+        self._connection = connection
+
+    def __enter__(self):
+        self._connection.execute("BEGIN IMMEDIATE")
+
+    def __exit__(self, exc_type, exc, tb):
+        self._connection.execute("COMMIT" if exc_type is None else "ROLLBACK")
+        return False
+
+
+def cached_trace_result(cache: DiskCache | None, name: str, trace: pd.DataFrame, fn, **params):
+    """
+    Compute `fn(trace, **params)`, or read it from the cache if it was already computed for the same coordinates.
+    """
+    if cache is None:
+        return fn(trace, **params)
+    key = trace_key(name, trace, **params)
+    missing = object()
+    value = cache.get(key, missing)
+    if value is missing:
+        value = fn(trace, **params)
+        cache.set(key, value)
+    return value
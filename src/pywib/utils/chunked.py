@@ -0,0 +1,467 @@
+import copy
+import os
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+
+from ..constants import ColumnNames, EventTypes
+from ..utils.validation import required_columns, validate_dataframe
+from ..utils.io import iter_interactions
+from ..utils.aggregation import MetricState, PauseState, ClickSlipState, finalize_states
+from ..utils.sketches import KLLSketch
+
+_MOVE_EVENTS = [EventTypes.EVENT_ON_MOUSE_MOVE, EventTypes.EVENT_ON_TOUCH_MOVE]
+_CLICK_EVENTS = [EventTypes.EVENT_ON_MOUSE_DOWN, EventTypes.EVENT_ON_MOUSE_UP, EventTypes.EVENT_ON_MOUSE_MOVE]
+
+# Number of rows of an unfinished trace carried over to the next chunk. Jerkiness of a new point
+# depends on the acceleration of the previous one, which depends on the two velocities before it.
+_CARRY_ROWS = 3
+
+_CARRIED = '_carried'
+_N_BEFORE = '_n_before'
+
+# Rough per-row cost of a chunk while it is being processed: the projected input columns plus
+# the temporary float arrays created by the kinematic kernels, and the sessionId object.
+_WORKING_ARRAYS = 16
+_OBJECT_BYTES = 64
+
+_DEFAULT_CHUNKSIZE = 100_000
+
+CHUNKED_METRICS = (
+    "velocity_metrics",
+    "acceleration_metrics",
+    "jerkiness_metrics",
+    "pauses_metrics",
+    "num_pauses",
+    "movement_time",
+    "execution_time",
+    "number_of_clicks",
+    "click_slip",
+)
+
+
+def _rows_for_budget(memory_budget: int) -> int:
+    bytes_per_row = 8 * (len(required_columns) + _WORKING_ARRAYS) + _OBJECT_BYTES
+    return max(1, int(memory_budget) // bytes_per_row)
+
+
+def iter_chunks(source, chunksize: int = None, memory_budget: int = None, format: str = None) -> Iterator[pd.DataFrame]:
+    """
+    Iterate over an interaction log in chunks of rows.
+
+    Only the columns needed by the movement metrics are read.
+
+    Parameters:
+        source (str | Iterable[pd.DataFrame]): A CSV, Parquet or Arrow IPC file (or a dataset directory), or an
+                                               iterable of already loaded DataFrames.
+        chunksize (int): Number of rows per chunk.
+        memory_budget (int): Approximate memory in bytes that a chunk may use while it is processed.
+                             Only used when `chunksize` is None.
+        format (str): 'csv', 'parquet' or 'ipc'. If None it is inferred from the file extension.
+    Returns:
+        Iterator[pd.DataFrame]: The chunks of the log.
+    """
+    if chunksize is None:
+        chunksize = _rows_for_budget(memory_budget) if memory_budget is not None else _DEFAULT_CHUNKSIZE
+
+    if not isinstance(source, (str, os.PathLike)):
+        yield from source
+        return
+
+    if format is None and os.fspath(source).lower().endswith(".csv"):
+        format = "csv"
+
+    if format == "csv":
+        yield from pd.read_csv(source, chunksize=chunksize, usecols=lambda col: col in required_columns)
+    else:
+        yield from iter_interactions(source, columns=list(required_columns), format=format, batch_size=chunksize)
+
+
+class _SessionAggregate:
+    """
+    Partial aggregates of a single session.
+    """
+    __slots__ = ("velocity", "acceleration", "jerkiness", "pauses",
+                 "movement_time", "clicks", "first_time", "last_time", "click_slip", "mouse_down")
+
+    def __init__(self, quantiles: list[float] = None, sketch_size: int = 200):
+        self.velocity = MetricState.from_values([], quantiles, sketch_size)
+        self.acceleration = MetricState.from_values([], quantiles, sketch_size)
+        self.jerkiness = MetricState.from_values([], quantiles, sketch_size)
+        # Only closed traces are counted, open ones are added when the results are requested
+        self.pauses = PauseState(quantiles=quantiles, sketch=KLLSketch(sketch_size) if quantiles is not None else None)
+        self.movement_time = 0.0
+        self.clicks = 0
+        self.first_time = None
+        self.last_time = None
+        self.click_slip = ClickSlipState()
+        # (down timeStamp, last x, last y, distance moved) of a mouse button still held down
+        self.mouse_down = None
+
+
+class ChunkedAggregator:
+    """
+    Computes the movement and timing metrics of an interaction log chunk by chunk.
+
+    The events of every session must arrive in non decreasing timeStamp order across chunks (as in a log sorted
+    by timeStamp), although sessions may be interleaved. Unfinished traces are carried over to the next chunk so the
+    results are the same as the ones obtained by the in-memory functions over the whole DataFrame.
+    """
+
+    def __init__(self, threshold: float = 100, quantiles: list[float] = None, sketch_size: int = 200,
+                 click_slip_threshold: float = 5.0):
+        """
+        Parameters:
+            threshold (float): Time threshold in milliseconds to consider a pause, by default 100 ms.
+            quantiles (list[float]): Quantiles (between 0 and 1) of the kinematic values and pause durations to estimate.
+            sketch_size (int): Size of the quantile sketches.
+            click_slip_threshold (float): Distance threshold of :py:func:`~pywib.click_slip`.
+        """
+        self.threshold = threshold
+        self.quantiles = quantiles
+        self.sketch_size = sketch_size
+        self.click_slip_threshold = click_slip_threshold
+        self._sessions = {}
+        # Last rows of the trace still open in every session, only the sessions present in a chunk are touched
+        self._carry = {}
+
+    def _session(self, session_id) -> _SessionAggregate:
+        aggregate = self._sessions.get(session_id)
+        if aggregate is None:
+            aggregate = self._sessions[session_id] = _SessionAggregate(self.quantiles, self.sketch_size)
+        return aggregate
+
+    def update(self, chunk: pd.DataFrame):
+        """
+        Add a chunk of events to the aggregates.
+
+        Parameters:
+            chunk (pd.DataFrame): DataFrame containing 'sessionId', 'eventType', 'timeStamp', 'x' and 'y' columns.
+        """
+        validate_dataframe(chunk)
+        if chunk.empty:
+            return
+
+        chunk = chunk[list(required_columns)].copy()
+        chunk[ColumnNames.TIME_STAMP] = pd.to_numeric(chunk[ColumnNames.TIME_STAMP], errors='coerce')
+        chunk[_CARRIED] = False
+        chunk[_N_BEFORE] = 0
+
+        sessions = self._update_sessions(chunk)
+
+        carry = [self._carry.pop(session_id) for session_id in sessions if session_id in self._carry]
+        if carry:
+            chunk = pd.concat(carry + [chunk], ignore_index=True)
+        chunk = chunk.sort_values(by=[ColumnNames.SESSION_ID, ColumnNames.TIME_STAMP], kind='mergesort')
+        self._update_click_slips(chunk[~chunk[_CARRIED].to_numpy(dtype=bool)])
+        carry = self._update_traces(chunk)
+        if carry is not None:
+            for session_id, group in carry.groupby(ColumnNames.SESSION_ID, sort=False):
+                self._carry[session_id] = group
+
+    def _update_sessions(self, chunk: pd.DataFrame) -> list:
+        is_click = chunk[ColumnNames.EVENT_TYPE] == EventTypes.EVENT_ON_CLICK
+        grouped = chunk.assign(_click=is_click).groupby(ColumnNames.SESSION_ID, sort=False)
+        summary = grouped.agg(first=(ColumnNames.TIME_STAMP, 'min'), last=(ColumnNames.TIME_STAMP, 'max'),
+                              clicks=('_click', 'sum'))
+        for session_id, row in summary.iterrows():
+            aggregate = self._session(session_id)
+            if aggregate.last_time is not None and row['first'] < aggregate.last_time:
+                raise ValueError(f"Events of session {session_id} are not ordered by timeStamp across chunks.")
+            if aggregate.first_time is None:
+                aggregate.first_time = row['first']
+            aggregate.last_time = row['last']
+            aggregate.clicks += int(row['clicks'])
+        return list(summary.index)
+
+    def _update_click_slips(self, chunk: pd.DataFrame):
+        event_type = chunk[ColumnNames.EVENT_TYPE].to_numpy()
+        relevant = np.isin(event_type, _CLICK_EVENTS)
+        if not relevant.any():
+            return
+        chunk = chunk[relevant]
+        codes, uniques = pd.factorize(chunk[ColumnNames.SESSION_ID])
+        event_type = event_type[relevant]
+        x = chunk[ColumnNames.X].to_numpy(dtype=float)
+        y = chunk[ColumnNames.Y].to_numpy(dtype=float)
+        t = chunk[ColumnNames.TIME_STAMP].to_numpy(dtype=float)
+        boundaries = np.r_[0, np.flatnonzero(np.diff(codes)) + 1, len(codes)]
+        for start, end in zip(boundaries[:-1], boundaries[1:]):
+            aggregate = self._session(uniques[codes[start]])
+            distances, durations, aggregate.mouse_down = _click_segments(
+                event_type[start:end], x[start:end], y[start:end], t[start:end], aggregate.mouse_down)
+            distances = distances[distances >= self.click_slip_threshold]
+            aggregate.click_slip.distances.update(distances)
+            aggregate.click_slip.durations.update(durations)
+
+    def _update_traces(self, chunk: pd.DataFrame) -> pd.DataFrame | None:
+        codes, uniques = pd.factorize(chunk[ColumnNames.SESSION_ID])
+        is_move = chunk[ColumnNames.EVENT_TYPE].isin(_MOVE_EVENTS).to_numpy()
+        new_session = np.r_[True, codes[1:] != codes[:-1]]
+        trace_id = np.cumsum(~is_move | new_session)
+
+        # Traces still open at the end of the chunk: the last event of the session is a move
+        session_last = np.r_[np.flatnonzero(new_session)[1:] - 1, len(codes) - 1]
+        open_ids = trace_id[session_last][is_move[session_last]]
+
+        moves = chunk[is_move]
+        if moves.empty:
+            return None
+        codes = codes[is_move]
+        trace_id = trace_id[is_move]
+        x = moves[ColumnNames.X].to_numpy(dtype=float)
+        y = moves[ColumnNames.Y].to_numpy(dtype=float)
+        t = moves[ColumnNames.TIME_STAMP].to_numpy(dtype=float)
+        carried = moves[_CARRIED].to_numpy(dtype=bool)
+        n_before = moves[_N_BEFORE].to_numpy()
+
+        first = np.r_[True, trace_id[1:] != trace_id[:-1]]
+        dx = _trace_diff(x, first)
+        dy = _trace_diff(y, first)
+        dt = _trace_diff(t, first)
+        distance = np.sqrt(dx ** 2 + dy ** 2)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            velocity = np.where(dt != 0, distance / dt, 0)
+            acceleration = np.where(dt != 0, _trace_diff(velocity, first) / dt, 0)
+            jerkiness = np.where(dt != 0, _trace_diff(acceleration, first) / dt, 0)
+
+        emit = ~carried
+        self._aggregate(uniques, codes, emit & (velocity > 0), velocity, 'velocity')
+        self._aggregate(uniques, codes, emit & (acceleration != 0), acceleration, 'acceleration')
+        self._aggregate(uniques, codes, emit & (jerkiness != 0), jerkiness, 'jerkiness')
+
+        movement = np.bincount(codes[emit], weights=dt[emit], minlength=len(uniques))
+        for code in np.flatnonzero(movement):
+            self._session(uniques[code]).movement_time += movement[code]
+
+        is_pause = emit & (dt > self.threshold)
+        for code, durations in _group_by_code(codes[is_pause], dt[is_pause]):
+            self._session(uniques[code]).pauses.update(durations, num_traces=0)
+
+        # Closed traces are counted, open ones are carried over to the next chunk
+        starts = np.flatnonzero(first)
+        ends = np.r_[starts[1:], len(trace_id)]
+        lengths = ends - starts + n_before[starts]
+        is_open = np.isin(trace_id[starts], open_ids)
+        closed = ~is_open & (lengths >= 2)
+        for code in codes[starts[closed]]:
+            self._session(uniques[code]).pauses.num_traces += 1
+
+        carry_rows = []
+        carry_before = []
+        for start, end, length in zip(starts[is_open], ends[is_open], lengths[is_open]):
+            carry_start = max(start, end - _CARRY_ROWS)
+            carry_rows.extend(range(carry_start, end))
+            carry_before.extend([length - (end - carry_start)] * (end - carry_start))
+        if not carry_rows:
+            return None
+        carry = moves.iloc[carry_rows].copy()
+        carry[_CARRIED] = True
+        carry[_N_BEFORE] = carry_before
+        return carry
+
+    def _aggregate(self, uniques, codes, mask, values, name):
+        if not mask.any():
+            return
+        values = values[mask]
+        stats = pd.DataFrame({'value': values, 'square': values ** 2}).groupby(codes[mask]).agg(
+            count=('value', 'count'), sum=('value', 'sum'), sum_sq=('square', 'sum'), min=('value', 'min'), max=('value', 'max'))
+        sketches = {}
+        if self.quantiles is not None:
+            for code, group in _group_by_code(codes[mask], values):
+                sketches[code] = KLLSketch(self.sketch_size)
+                sketches[code].update(group)
+        for code, row in stats.iterrows():
+            aggregate = self._session(uniques[code])
+            state = MetricState(int(row['count']), row['sum'], row['sum_sq'], row['min'], row['max'],
+                                quantiles=self.quantiles, sketch=sketches.get(code))
+            setattr(aggregate, name, getattr(aggregate, name).merge(state))
+
+    def _open_traces(self, session_id) -> int:
+        """
+        Number of traces carried over that would be a valid trace if the log ended now.
+        """
+        carry = self._carry.get(session_id)
+        if carry is None:
+            return 0
+        return int(len(carry) + carry[_N_BEFORE].iloc[0] >= 2)
+
+    def _pauses(self, session_id, aggregate: _SessionAggregate, as_state: bool) -> PauseState:
+        num_traces = aggregate.pauses.num_traces + self._open_traces(session_id)
+        if as_state:
+            return PauseState(aggregate.pauses.pause_durations, num_traces,
+                              quantiles=self.quantiles, sketch=aggregate.pauses.sketch)
+        # Only read for the metrics, so it shares the durations of the aggregate instead of copying them
+        pauses = copy.copy(aggregate.pauses)
+        pauses.num_traces = num_traces
+        return pauses
+
+    def _check_metrics(self, metrics: list[str] | None) -> list[str]:
+        if metrics is None:
+            return list(CHUNKED_METRICS)
+        for metric in metrics:
+            if metric not in CHUNKED_METRICS:
+                raise ValueError(f"Metric '{metric}' is not supported in chunked mode.")
+        return metrics
+
+    def _session_result(self, session_id, metrics: list[str], as_state: bool, pause_durations: bool = True) -> dict:
+        aggregate = self._sessions[session_id]
+        pauses = self._pauses(session_id, aggregate, as_state)
+        results = {}
+        for metric in metrics:
+            if metric in ("velocity_metrics", "acceleration_metrics", "jerkiness_metrics"):
+                # Sessions without movement traces are not reported, as in the in-memory functions
+                if pauses.num_traces > 0:
+                    state = getattr(aggregate, metric[:-len("_metrics")])
+                    results[metric] = state if as_state else state.finalize()
+            elif metric == "pauses_metrics":
+                results[metric] = pauses if as_state else pauses.finalize(pause_durations)
+            elif metric == "num_pauses":
+                results[metric] = {
+                    ColumnNames.NUMBER_OF_PAUSES: pauses.count,
+                    ColumnNames.MEAN_PAUSE_PER_TRACE: pauses.count / pauses.num_traces if pauses.num_traces > 0 else 0,
+                }
+            elif metric == "movement_time":
+                results[metric] = aggregate.movement_time
+            elif metric == "execution_time":
+                results[metric] = aggregate.last_time - aggregate.first_time
+            elif metric == "number_of_clicks":
+                results[metric] = aggregate.clicks
+            elif metric == "click_slip":
+                results[metric] = aggregate.click_slip if as_state else aggregate.click_slip.finalize()
+        return results
+
+    def session_result(self, session_id, metrics: list[str] = None, as_state: bool = False,
+                       pause_durations: bool = True) -> dict:
+        """
+        Obtain the metrics of a single session, in time independent of the number of events added so far unless the
+        pause durations or the states are requested.
+
+        Parameters:
+            session_id: The sessionId.
+            metrics (list[str]): Names of the metrics to return, by default all of :py:data:`CHUNKED_METRICS`.
+            as_state (bool): If True, the metrics that have a mergeable state are returned as states.
+            pause_durations (bool): Whether the pauses metrics include the list of the durations of the pauses, by default True.
+        Returns:
+            dict: A dictionary with the metric names as keys and the results of the session as values.
+                  The kinematic metrics are missing while the session has no movement trace.
+        """
+        metrics = self._check_metrics(metrics)
+        if session_id not in self._sessions:
+            raise ValueError(f"Session {session_id} has no events.")
+        return self._session_result(session_id, metrics, as_state, pause_durations)
+
+    def result(self, metrics: list[str] = None, as_state: bool = False) -> dict[str, dict]:
+        """
+        Obtain the metrics of all the events added so far.
+
+        Parameters:
+            metrics (list[str]): Names of the metrics to return, by default all of :py:data:`CHUNKED_METRICS`.
+            as_state (bool): If True, the velocity, acceleration, jerkiness, pauses and click slip metrics are returned as
+                             mergeable states (see :py:class:`~pywib.MetricState` and :py:class:`~pywib.PauseState`).
+        Returns:
+            dict: A dictionary with the metric names as keys and the same results the in-memory functions return as values.
+        """
+        metrics = self._check_metrics(metrics)
+        results = {metric: {} for metric in metrics}
+        for session_id in self._sessions:
+            for metric, value in self._session_result(session_id, metrics, as_state).items():
+                results[metric][session_id] = value
+        return results
+
+
+def _group_by_code(codes: np.ndarray, values: np.ndarray):
+    """
+    Split the values by session code, keeping their order within every session.
+    """
+    order = np.argsort(codes, kind='mergesort')
+    codes = codes[order]
+    values = values[order]
+    boundaries = np.flatnonzero(np.diff(codes)) + 1
+    for group_codes, group_values in zip(np.split(codes, boundaries), np.split(values, boundaries)):
+        if len(group_codes) > 0:
+            yield group_codes[0], group_values
+
+
+def _click_segments(event_type: np.ndarray, x: np.ndarray, y: np.ndarray, t: np.ndarray, mouse_down):
+    """
+    Mouse down/up segments of the mouse down, mouse up and mouse move events of a session, as in :py:func:`~pywib.click_slip`.
+    A segment starts at a mouse down and ends at the first mouse up after it. The events before the first mouse down
+    continue the segment of `mouse_down` if a button was held down at the end of the previous chunk.
+
+    Returns:
+        tuple: The moved distances and the durations of the closed segments, and the state of the segment left open.
+    """
+    is_down = event_type == EventTypes.EVENT_ON_MOUSE_DOWN
+    is_up = event_type == EventTypes.EVENT_ON_MOUSE_UP
+    segment = np.cumsum(is_down)
+    ups_before = np.cumsum(is_up) - is_up
+    segment_start = np.r_[0, np.flatnonzero(is_down)]
+    # Events until the first mouse up of their segment, the first segment only if a button was already held down
+    active = ups_before == ups_before[segment_start[segment]]
+    if mouse_down is None:
+        active &= segment > 0
+
+    distance = np.zeros(len(segment))
+    follows = active[1:] & active[:-1] & (segment[1:] == segment[:-1])
+    distance[1:] = np.where(follows, np.hypot(np.diff(x), np.diff(y)), 0)
+    totals_start = np.zeros(segment[-1] + 1)
+    down_time = np.r_[np.nan, t[is_down]]
+    if mouse_down is not None:
+        down_time[0], last_x, last_y, totals_start[0] = mouse_down
+        if segment[0] == 0:
+            distance[0] = np.hypot(x[0] - last_x, y[0] - last_y)
+    totals = totals_start + np.bincount(segment, weights=distance, minlength=len(totals_start))
+
+    closing = active & is_up
+    closed = segment[closing]
+    last = segment[-1]
+    if active[-1] and not closing[segment == last].any():
+        mouse_down = (down_time[last], x[-1], y[-1], totals[last])
+    else:
+        mouse_down = None
+    return totals[closed], t[closing] - down_time[closed], mouse_down
+
+
+def _trace_diff(values: np.ndarray, first: np.ndarray) -> np.ndarray:
+    """
+    Difference with the previous value of the same trace, 0 for the first point of every trace.
+    """
+    diff = np.diff(values, prepend=values[:1])
+    diff[first] = 0
+    return diff
+
+
+def chunked_metrics(source, metrics: list[str] = None, chunksize: int = None, memory_budget: int = None,
+                    threshold: float = 100, format: str = None, quantiles: list[float] = None,
+                    sketch_size: int = 200, click_slip_threshold: float = 5.0) -> dict[str, dict]:
+    """
+    Compute movement and timing metrics over an interaction log that does not fit in memory.
+
+    The log is read in chunks, unfinished traces are carried over between chunks and per-session partial
+    aggregates are merged at the end, so the results are the same as the in-memory functions
+    (e.g. :py:func:`~pywib.velocity_metrics` or :py:func:`~pywib.pauses_metrics`) would return for the whole log.
+    The events of every session must be ordered by timeStamp across the log.
+
+    Parameters:
+        source (str | Iterable[pd.DataFrame]): A CSV, Parquet or Arrow IPC file (or a dataset directory), or an
+                                               iterable of DataFrames.
+        metrics (list[str]): Names of the metrics to compute, any of :py:data:`CHUNKED_METRICS`. By default all of them.
+        chunksize (int): Number of rows per chunk.
+        memory_budget (int): Approximate memory in bytes that a chunk may use while it is processed.
+                             Only used when `chunksize` is None.
+        threshold (float): Time threshold in milliseconds to consider a pause, by default 100 ms.
+        format (str): 'csv', 'parquet' or 'ipc'. If None it is inferred from the file extension.
+        quantiles (list[float]): Quantiles (between 0 and 1) of the kinematic values and pause durations to estimate
+                                 with mergeable sketches, added as in the in-memory metrics.
+        sketch_size (int): Size of the quantile sketches.
+        click_slip_threshold (float): Distance threshold of :py:func:`~pywib.click_slip`.
+    Returns:
+        dict: A dictionary with the metric names as keys and the per-session results as values.
+    """
+    aggregator = ChunkedAggregator(threshold=threshold, quantiles=quantiles, sketch_size=sketch_size,
+                                   click_slip_threshold=click_slip_threshold)
+    for chunk in iter_chunks(source, chunksize=chunksize, memory_budget=memory_budget, format=format):
+        aggregator.update(chunk)
+    return aggregator.result(metrics)
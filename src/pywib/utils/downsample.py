@@ -0,0 +1,75 @@
+"""
+Largest-Triangle-Three-Buckets downsampling of the traces, to draw long traces with a bounded number of points.
+"""
+
+import numpy as np
+import pandas as pd
+
+from ..constants import ColumnNames
+
+# Traces with more points are downsampled before being plotted
+MAX_PLOT_POINTS = 2000
+# Sessions with more movement events are replayed with their movements downsampled
+MAX_REPLAY_POINTS = 20000
+
+
+def lttb_indices(x, y, num_points: int) -> np.ndarray:
+    """
+    Points kept by the Largest-Triangle-Three-Buckets downsampling of a polyline.
+
+    The points between the first and the last one are split into `num_points - 2` buckets of consecutive points and
+    the point of every bucket that forms the largest triangle with the point kept in the previous bucket and the mean
+    of the next bucket is kept, so the peaks and corners that define the shape of the trace are preserved.
+
+    Parameters:
+        x (array-like): X coordinates of the points, in the order of the trace.
+        y (array-like): Y coordinates of the points.
+        num_points (int): Number of points to keep, at least 3.
+    Returns:
+        np.ndarray: Sorted indices of the kept points, all of them if there are not more than `num_points`.
+    """
+    if num_points < 3:
+        raise ValueError("'num_points' must be at least 3.")
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n <= num_points:
+        return np.arange(n)
+
+    num_buckets = num_points - 2
+    # Bucket b holds the points edges[b]:edges[b + 1], the first and last points are buckets of their own
+    edges = np.r_[(np.arange(num_buckets) * (n - 2) // num_buckets) + 1, n - 1]
+    x_sums = np.r_[0.0, np.cumsum(x)]
+    y_sums = np.r_[0.0, np.cumsum(y)]
+    sizes = np.diff(edges)
+    x_means = np.r_[(x_sums[edges[1:]] - x_sums[edges[:-1]]) / sizes, x[-1]]
+    y_means = np.r_[(y_sums[edges[1:]] - y_sums[edges[:-1]]) / sizes, y[-1]]
+
+    indices = np.empty(num_points, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(num_buckets):
+        lo, hi = edges[bucket], edges[bucket + 1]
+        ax, ay = x[previous], y[previous]
+        # Twice the areas of the triangles, the factor does not change the largest one
+        areas = np.abs((ax - x_means[bucket + 1]) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (y_means[bucket + 1] - ay))
+        previous = lo + int(np.argmax(areas))
+        indices[bucket + 1] = previous
+    return indices
+
+
+def downsample_trace(trace: pd.DataFrame, num_points: int = MAX_PLOT_POINTS) -> pd.DataFrame:
+    """
+    Downsample a trace with the Largest-Triangle-Three-Buckets algorithm.
+
+    Parameters:
+        trace (pd.DataFrame): A trace with 'x' and 'y' columns.
+        num_points (int): Maximum number of points of the result.
+    Returns:
+        pd.DataFrame: The kept rows of the trace, the trace itself if it is not longer than `num_points`.
+    """
+    if len(trace) <= num_points:
+        return trace
+    indices = lttb_indices(trace[ColumnNames.X].to_numpy(dtype=float), trace[ColumnNames.Y].to_numpy(dtype=float),
+                           num_points)
+    return trace.iloc[indices]
@@ -0,0 +1,152 @@
+"""
+Rasterized density heatmaps of the mouse, click and scroll positions.
+"""
+
+import numpy as np
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.colors import LogNorm
+from matplotlib.figure import Figure
+
+from ..constants import ColumnNames, EventTypes
+
+# Event types counted by every kind of heatmap
+DENSITY_EVENTS = {
+    "mouse": [EventTypes.EVENT_ON_MOUSE_MOVE, EventTypes.EVENT_ON_TOUCH_MOVE],
+    "click": [EventTypes.EVENT_ON_CLICK, EventTypes.EVENT_ON_DOUBLE_CLICK],
+    "scroll": [EventTypes.EVENT_ON_WHEEL, EventTypes.EVENT_WINDOW_SCROLL],
+}
+
+
+class DensityHeatmap:
+    """
+    Counts of the positions of the events in a fixed grid of cells, one grid per session, page or cohort.
+
+    The counts are accumulated with :py:meth:`update` one chunk of events at a time, so any amount of data fits in the
+    memory of the grids, and heatmaps computed separately can be combined with :py:meth:`merge`.
+    """
+
+    def __init__(self, kind: str = "mouse", width: int = 1920, height: int = 1080, cell_size: int = 10,
+                 by: str = None):
+        """
+        Parameters:
+            kind (str): Events to count, any of :py:data:`DENSITY_EVENTS` ('mouse', 'click' or 'scroll').
+            width (int): Width in pixels of the screen area, positions outside of it are not counted.
+            height (int): Height in pixels of the screen area.
+            cell_size (int): Side in pixels of the cells of the grid.
+            by (str): Column to keep a grid per value of, e.g. 'sessionId' or a page or cohort column. None for a single grid.
+        """
+        if kind not in DENSITY_EVENTS:
+            raise ValueError(f"Unknown heatmap kind: {kind}, use one of {list(DENSITY_EVENTS)}.")
+        if width <= 0 or height <= 0 or cell_size <= 0:
+            raise ValueError("'width', 'height' and 'cell_size' must be positive.")
+        self.kind = kind
+        self.width = width
+        self.height = height
+        self.cell_size = cell_size
+        self.by = by
+        self.shape = (-(-height // cell_size), -(-width // cell_size))
+        self._grids = {}
+
+    @property
+    def keys(self) -> list:
+        """
+        Values of the `by` column with a grid, [None] for a single grid.
+        """
+        return list(self._grids)
+
+    def update(self, df: pd.DataFrame) -> "DensityHeatmap":
+        """
+        Add the events of a DataFrame to the counts.
+
+        Parameters:
+            df (pd.DataFrame): DataFrame with 'eventType', 'x' and 'y' columns, and the `by` column.
+        Returns:
+            DensityHeatmap: This heatmap.
+        """
+        events = df[df[ColumnNames.EVENT_TYPE].isin(DENSITY_EVENTS[self.kind])]
+        x = pd.to_numeric(events[ColumnNames.X], errors='coerce').to_numpy(dtype=float)
+        y = pd.to_numeric(events[ColumnNames.Y], errors='coerce').to_numpy(dtype=float)
+        inside = (x >= 0) & (x < self.width) & (y >= 0) & (y < self.height)
+        cells = (y[inside] // self.cell_size).astype(np.int64) * self.shape[1] + (x[inside] // self.cell_size).astype(np.int64)
+        num_cells = self.shape[0] * self.shape[1]
+
+        if self.by is None:
+            codes, keys = np.zeros(len(cells), dtype=np.int64), [None]
+        else:
+            codes, keys = pd.factorize(events[self.by].to_numpy()[inside])
+            inside_keys = codes >= 0
+            codes, cells = codes[inside_keys], cells[inside_keys]
+        # A single bincount over the (key, cell) pairs counts the grids of all the keys at once
+        counts = np.bincount(codes * num_cells + cells, minlength=len(keys) * num_cells).reshape(len(keys), *self.shape)
+        for key, grid in zip(keys, counts):
+            if key in self._grids:
+                self._grids[key] += grid
+            else:
+                self._grids[key] = grid
+        return self
+
+    def merge(self, other: "DensityHeatmap") -> "DensityHeatmap":
+        """
+        Combine this heatmap with another one with the same settings.
+
+        Parameters:
+            other (DensityHeatmap): Heatmap computed over other events.
+        Returns:
+            DensityHeatmap: A new heatmap with the counts of both.
+        """
+        settings = (self.kind, self.width, self.height, self.cell_size, self.by)
+        if settings != (other.kind, other.width, other.height, other.cell_size, other.by):
+            raise ValueError("Only heatmaps with the same kind, size, cell size and 'by' column can be merged.")
+        merged = DensityHeatmap(*settings)
+        for heatmap in (self, other):
+            for key, grid in heatmap._grids.items():
+                merged._grids[key] = merged._grids[key] + grid if key in merged._grids else grid.copy()
+        return merged
+
+    def grid(self, key=None) -> np.ndarray:
+        """
+        Counts of the cells, rows are the y axis.
+
+        Parameters:
+            key: Value of the `by` column. None for the sum of all the grids.
+        Returns:
+            np.ndarray: The counts, with :py:attr:`shape`.
+        """
+        if key is None:
+            return sum(self._grids.values(), np.zeros(self.shape, dtype=np.int64))
+        if key not in self._grids:
+            raise KeyError(f"There are no events of {key} in the heatmap.")
+        return self._grids[key]
+
+    def plot(self, key=None, ax=None, outfile: str = None, log: bool = True, cmap: str = "hot", dpi: int = 100) -> Figure:
+        """
+        Draw a grid with a single imshow.
+
+        Parameters:
+            key: Value of the `by` column. None for the sum of all the grids.
+            ax (matplotlib.axes.Axes): Axes to draw on. By default a new headless figure is created.
+            outfile (str): If provided, saves the figure to this file path.
+            log (bool): Whether to use a logarithmic color scale, so the sparse cells remain visible.
+            cmap (str): Matplotlib colormap.
+            dpi (int): Resolution of the saved image.
+        Returns:
+            Figure: The figure of the heatmap.
+        """
+        grid = self.grid(key)
+        if ax is None:
+            figure = Figure(figsize=(10, 10 * self.height / self.width))
+            FigureCanvasAgg(figure)
+            ax = figure.add_subplot()
+        else:
+            figure = ax.figure
+        norm = LogNorm(vmin=1, vmax=max(int(grid.max()), 1)) if log else None
+        image = ax.imshow(np.ma.masked_equal(grid, 0) if log else grid, cmap=cmap, norm=norm, interpolation='nearest',
+                          extent=(0, self.shape[1] * self.cell_size, self.shape[0] * self.cell_size, 0))
+        figure.colorbar(image, ax=ax, label=f"{self.kind} events")
+        ax.set_title(f"{self.kind.capitalize()} density" + ("" if key is None else f" - {key}"))
+        ax.set_xlabel('X (px)')
+        ax.set_ylabel('Y (px)')
+        if outfile:
+            figure.savefig(outfile, bbox_inches='tight', dpi=dpi)
+        return figure
@@ -0,0 +1,64 @@
+import pandas as pd
+
+from ..constants import ColumnNames
+from ..utils.chunked import ChunkedAggregator
+
+
+class IncrementalSession:
+    """
+    Metrics of a single session kept up to date as new events are appended to it.
+
+    Every update only processes the new events: the state of the open movement trace (its last points, velocity and
+    acceleration), the mouse button held down for :py:func:`~pywib.click_slip`, the pause counters and the running
+    aggregates are carried between updates. The results are the same as recomputing the metrics over all the events
+    of the session with the in-memory functions, and reading them does not depend on the number of events unless the
+    list of pause durations is requested.
+    """
+
+    def __init__(self, session_id=None, threshold: float = 100, click_slip_threshold: float = 5.0,
+                 quantiles: list[float] = None, sketch_size: int = 200):
+        """
+        Parameters:
+            session_id: The sessionId of the events. If None, it is taken from the first update.
+            threshold (float): Time threshold in milliseconds to consider a pause, by default 100 ms.
+            click_slip_threshold (float): Distance threshold of :py:func:`~pywib.click_slip`.
+            quantiles (list[float]): Quantiles (between 0 and 1) of the kinematic values and pause durations to estimate.
+            sketch_size (int): Size of the quantile sketches.
+        """
+        self.session_id = session_id
+        self._aggregator = ChunkedAggregator(threshold=threshold, quantiles=quantiles, sketch_size=sketch_size,
+                                             click_slip_threshold=click_slip_threshold)
+
+    def update(self, events: pd.DataFrame):
+        """
+        Append new events to the session.
+
+        Parameters:
+            events (pd.DataFrame): DataFrame containing 'sessionId', 'eventType', 'timeStamp', 'x' and 'y' columns.
+                                   The events must not be older than the ones already added.
+        """
+        if events.empty:
+            return
+        sessions = events[ColumnNames.SESSION_ID].unique()
+        if self.session_id is None and len(sessions) == 1:
+            self.session_id = sessions[0]
+        if len(sessions) != 1 or sessions[0] != self.session_id:
+            raise ValueError(f"All the events must belong to session {self.session_id}.")
+        self._aggregator.update(events)
+
+    def result(self, metrics: list[str] = None, as_state: bool = False, pause_durations: bool = False) -> dict:
+        """
+        Obtain the metrics of the events added so far.
+
+        Parameters:
+            metrics (list[str]): Names of the metrics to return, any of :py:data:`CHUNKED_METRICS`. By default all of them.
+            as_state (bool): If True, the metrics that have a mergeable state are returned as states.
+            pause_durations (bool): Whether the pauses metrics include the list of the durations of all the pauses of the
+                                    session, by default False.
+        Returns:
+            dict: A dictionary with the metric names as keys and the results of the session as values.
+                  The kinematic metrics are missing while the session has no movement trace.
+        """
+        if self.session_id is None:
+            raise ValueError("The session has no events.")
+        return self._aggregator.session_result(self.session_id, metrics, as_state, pause_durations)
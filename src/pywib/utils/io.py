@@ -0,0 +1,201 @@
+import os
+from typing import Iterator
+
+import pandas as pd
+
+from ..constants import ColumnNames
+from ..utils.validation import required_columns, keyboard_columns, validate_dataframe, validate_dataframe_keyboard
+from ..utils.segmentation import extract_traces_by_session, extract_keystroke_traces_by_session
+
+# Columns needed by each public metric. Every metric validates the base interaction
+# columns, keyboard metrics additionally need the key columns.
+_KEYBOARD_METRICS = {
+    "typing_speed",
+    "typing_speed_metrics",
+    "backspace_usage",
+    "typing_durations",
+    "keyboard_heatmap",
+}
+
+_MOUSE_METRICS = {
+    "velocity",
+    "acceleration",
+    "jerkiness",
+    "velocity_metrics",
+    "acceleration_metrics",
+    "jerkiness_metrics",
+    "path",
+    "auc",
+    "deviations",
+    "execution_time",
+    "movement_time",
+    "num_pauses",
+    "pauses_metrics",
+    "number_of_clicks",
+    "click_slip",
+}
+
+_FORMATS = {
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".arrow": "ipc",
+    ".ipc": "ipc",
+    ".feather": "ipc",
+}
+
+
+def columns_for_metrics(metrics: list[str] | None = None) -> list[str]:
+    """
+    Obtain the minimal set of input columns needed to compute the given metrics.
+
+    Parameters:
+        metrics (list[str]): Names of the pywib metric functions (e.g. 'velocity_metrics', 'typing_speed').
+                             If None, only the base interaction columns are returned.
+    Returns:
+        list[str]: The column names to project when reading the interaction logs.
+    """
+    columns = list(required_columns)
+    if metrics is None:
+        return columns
+
+    for metric in metrics:
+        if metric in _KEYBOARD_METRICS:
+            for col in keyboard_columns:
+                if col not in columns:
+                    columns.append(col)
+        elif metric not in _MOUSE_METRICS:
+            raise ValueError(f"Unknown metric: {metric}")
+    return columns
+
+
+def _import_pyarrow_dataset():
+    try:
+        import pyarrow.dataset as ds
+    except ImportError as e:
+        raise ImportError(
+            "Reading Parquet or Arrow IPC files requires 'pyarrow'. Install it with 'pip install pywib[arrow]'."
+        ) from e
+    return ds
+
+
+def _infer_format(source) -> str:
+    path = source[0] if isinstance(source, (list, tuple)) else source
+    path = os.fspath(path)
+    if os.path.isdir(path):
+        return "parquet"
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in _FORMATS:
+        raise ValueError(f"Could not infer the file format of '{path}', use the 'format' parameter ('parquet' or 'ipc').")
+    return _FORMATS[extension]
+
+
+def _build_filter(ds, sessions, start, end):
+    expression = None
+
+    def _and(current, new):
+        return new if current is None else current & new
+
+    if sessions is not None:
+        expression = _and(expression, ds.field(ColumnNames.SESSION_ID).isin(list(sessions)))
+    if start is not None:
+        expression = _and(expression, ds.field(ColumnNames.TIME_STAMP) >= start)
+    if end is not None:
+        expression = _and(expression, ds.field(ColumnNames.TIME_STAMP) < end)
+    return expression
+
+
+def _open_dataset(source, format):
+    ds = _import_pyarrow_dataset()
+    if format is None:
+        format = _infer_format(source)
+    if isinstance(source, (list, tuple)):
+        source = [os.fspath(s) for s in source]
+    else:
+        source = os.fspath(source)
+    return ds, ds.dataset(source, format=format)
+
+
+def _projection(dataset, metrics, columns) -> list[str]:
+    if columns is None:
+        columns = columns_for_metrics(metrics)
+    available = set(dataset.schema.names)
+    # Missing columns are left to the validation step so the error is the usual one
+    return [col for col in columns if col in available]
+
+
+def _validate(df: pd.DataFrame, metrics):
+    if metrics is not None and any(metric in _KEYBOARD_METRICS for metric in metrics):
+        validate_dataframe_keyboard(df)
+    else:
+        validate_dataframe(df)
+
+
+def iter_interactions(source, metrics: list[str] = None, columns: list[str] = None, sessions: list = None,
+                      start: float = None, end: float = None, format: str = None,
+                      batch_size: int = 131072) -> Iterator[pd.DataFrame]:
+    """
+    Iterate over the interaction events stored in Parquet or Arrow IPC files in record batches.
+
+    Only the columns needed by `metrics` (or the given `columns`) are read, and the session and
+    time filters are pushed down to the reader so row groups that cannot match are skipped.
+
+    Parameters:
+        source (str | list[str]): File, list of files or directory of a (possibly partitioned) dataset.
+        metrics (list[str]): Names of the metrics that will be computed, used to project the columns.
+        columns (list[str]): Explicit list of columns to read, overrides `metrics` for the projection.
+        sessions (list): Only read the events of these sessionIds.
+        start (float): Only read events with a timeStamp greater or equal than this value.
+        end (float): Only read events with a timeStamp lower than this value.
+        format (str): 'parquet' or 'ipc'. If None it is inferred from the file extension.
+        batch_size (int): Maximum number of rows per yielded DataFrame.
+    Returns:
+        Iterator[pd.DataFrame]: Validated DataFrames, one per record batch.
+    """
+    ds, dataset = _open_dataset(source, format)
+    projection = _projection(dataset, metrics, columns)
+    expression = _build_filter(ds, sessions, start, end)
+    for batch in dataset.to_batches(columns=projection, filter=expression, batch_size=batch_size):
+        if batch.num_rows == 0:
+            continue
+        df = batch.to_pandas()
+        _validate(df, metrics)
+        yield df
+
+
+def read_interactions(source, metrics: list[str] = None, columns: list[str] = None, sessions: list = None,
+                      start: float = None, end: float = None, format: str = None,
+                      as_traces: str = None) -> pd.DataFrame | dict[str, list[pd.DataFrame]]:
+    """
+    Read interaction events from Parquet or Arrow IPC files.
+
+    Only the columns needed by `metrics` (or the given `columns`) are read, and the session and
+    time filters are pushed down to the reader so row groups that cannot match are skipped.
+
+    Parameters:
+        source (str | list[str]): File, list of files or directory of a (possibly partitioned) dataset.
+        metrics (list[str]): Names of the metrics that will be computed, used to project the columns.
+        columns (list[str]): Explicit list of columns to read, overrides `metrics` for the projection.
+        sessions (list): Only read the events of these sessionIds.
+        start (float): Only read events with a timeStamp greater or equal than this value.
+        end (float): Only read events with a timeStamp lower than this value.
+        format (str): 'parquet' or 'ipc'. If None it is inferred from the file extension.
+        as_traces (str): If 'mouse', returns the movement traces by session (see :py:func:`~pywib.extract_traces_by_session`).
+                         If 'keyboard', returns the keystroke traces by session. If None, returns the DataFrame.
+    Returns:
+        pd.DataFrame | dict[str, list[pd.DataFrame]]: The validated DataFrame or the traces by session.
+    """
+    if as_traces not in (None, "mouse", "keyboard"):
+        raise ValueError("'as_traces' must be None, 'mouse' or 'keyboard'.")
+
+    ds, dataset = _open_dataset(source, format)
+    projection = _projection(dataset, metrics, columns)
+    expression = _build_filter(ds, sessions, start, end)
+    df = dataset.to_table(columns=projection, filter=expression).to_pandas()
+    _validate(df, metrics)
+
+    if as_traces == "mouse":
+        return extract_traces_by_session(df)
+    if as_traces == "keyboard":
+        validate_dataframe_keyboard(df)
+        return extract_keystroke_traces_by_session(df)
+    return df
@@ -3,6 +3,7 @@ import numpy as np
 from pywib.constants import ColumnNames
 from pywib.utils import compute_space_time_diff, validate_dataframe
 from pywib.utils.utils import deprecated
+from pywib.utils.cache import DiskCache, cached_trace_result
 from joblib import Parallel, delayed
 
 def velocity_df(df: pd.DataFrame) -> pd.DataFrame:
@@ -229,27 +230,30 @@ def _auc_optimal(df: pd.DataFrame) -> float:
 
     return area_optimal
 
-def auc_df(df: pd.DataFrame) -> dict:
+def auc_df(df: pd.DataFrame, n_points: int = 100) -> dict:
     """
     Calculate AUC and AUC ratio for a single DataFrame, returning them as a dictionary.
     
     Parameters:
         df (pd.DataFrame): DataFrame containing 'x' and 'y' columns.
+        n_points (int): Number of points of the optimal path used by the geometric deviation.
     Returns:
         tuple: A tuple (Geometric Auc, Execution Auc) as values.
     """
     validate_dataframe(df)
     
 
-    return (_auc_geometric_deviation(df), _auc_execution_deviation(df)
+    return (_auc_geometric_deviation(df, n_points), _auc_execution_deviation(df)
     )
 
-def auc_traces(traces: dict[str, list[pd.DataFrame]]) -> dict[str, list[tuple]]:
+def auc_traces(traces: dict[str, list[pd.DataFrame]], cache: DiskCache = None, n_points: int = 100) -> dict[str, list[tuple]]:
     """
     Calculate AUC and AUC ratio for a single DataFrame, returning them as a dictionary.
     
     Parameters:
         traces (pd.dict[str,list[pd.DataFrame]]): The traces with tthe sessionId as the key and the traces as values.
+        cache (DiskCache): Optional persistent cache of the results of every trace.
+        n_points (int): Number of points of the optimal path used by the geometric deviation.
     Returns:
         dict: Dictionary sessionId as keys and a list with a tuple (Geometric Auc, Execution Auc) as values.
     """
@@ -259,12 +263,12 @@ def auc_traces(traces: dict[str, list[pd.DataFrame]]) -> dict[str, list[tuple]]:
         auc_per_trace = []
         for i, df in enumerate(session_traces):
             validate_dataframe(df)
-            auc_per_trace.append(auc_df(df))
+            auc_per_trace.append(cached_trace_result(cache, "auc", df, auc_df, n_points=n_points))
         auc_sessions[session_id] = auc_per_trace
     return auc_sessions
 
-def _auc_geometric_deviation(df):
-    df_opt = compute_optimal_path(df)
+def _auc_geometric_deviation(df, n_points: int = 100):
+    df_opt = compute_optimal_path(df, n_points)
     # Prepare arrays
     user_x, user_y = df[ColumnNames.X].values, df[ColumnNames.Y].values
     opt_x, opt_y = df_opt[ColumnNames.X].values, df_opt[ColumnNames.Y].values
@@ -335,6 +339,35 @@ def _auc_execution_deviation(df):
 
     return auc
 
+def _execution_auc_batch(x: np.ndarray, y: np.ndarray, offsets: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    :py:func:`_auc_execution_deviation` of many traces at once, trace `i` being the points `offsets[i]:offsets[i + 1]`
+    of `x` and `y`. Every trace must have at least two points.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The execution AUC and the straight-line distance of every trace.
+    """
+    num_traces = len(offsets) - 1
+    first, last = offsets[:-1], offsets[1:] - 1
+    trace = np.repeat(np.arange(num_traces), np.diff(offsets))
+
+    x0, y0, x1, y1 = x[first], y[first], x[last], y[last]
+    a = y1 - y0
+    b = x0 - x1
+    c = x1 * y0 - x0 * y1
+    straight_dist = np.sqrt(a * a + b * b)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Perpendicular distances to the optimal line, NaN for traces that end where they start
+        d = np.abs(a[trace] * x + b[trace] * y + c[trace]) / straight_dist[trace]
+
+        # Trapezoids along the arc length, skipping the segments between two traces
+        same_trace = trace[1:] == trace[:-1]
+        ds = np.sqrt(np.diff(x) ** 2 + np.diff(y) ** 2)
+        areas = (d[1:] + d[:-1]) / 2 * ds
+        auc = np.bincount(trace[1:][same_trace], weights=areas[same_trace], minlength=num_traces)
+        auc = np.where(straight_dist > 0, auc / straight_dist, auc)
+    return auc, straight_dist
+
 def compute_optimal_path(df: pd.DataFrame, n_points: int = 100) -> pd.DataFrame:
     """
     Compute an "optimal" trajectory as a straight line between start and end points
@@ -0,0 +1,125 @@
+"""
+Headless batch rendering of trace plots and session replays across a process pool.
+"""
+
+import os
+import sys
+import time
+
+import pandas as pd
+from joblib import Parallel, delayed
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from ..constants import ColumnNames
+from .downsample import MAX_PLOT_POINTS, MAX_REPLAY_POINTS
+from .visualization import _draw_trace, _file_name, replay_session
+
+_TRACE_COLUMNS = [ColumnNames.X, ColumnNames.Y, ColumnNames.TIME_STAMP]
+
+
+def _render_traces_batch(items: list[tuple], directory: str, fmt: str, dpi: int, show_info: bool,
+                         show_optimal_line: bool, max_points: int) -> int:
+    for name, stroke_id, trace in items:
+        # An object-oriented Figure on the Agg canvas keeps no global pyplot state and is freed with the figure
+        figure = Figure(figsize=(10, 8))
+        FigureCanvasAgg(figure)
+        _draw_trace(figure.add_subplot(), trace, stroke_id, show_info, show_optimal_line, max_points)
+        figure.savefig(os.path.join(directory, f"{name}.{fmt}"), bbox_inches='tight', dpi=dpi)
+    return len(items)
+
+
+def _render_sessions_batch(items: list[tuple], directory: str, width: int, height: int, fps: int, speed: float,
+                           colored: bool, max_points: int) -> int:
+    for session_id, events in items:
+        replay_session(events, session_id, os.path.join(directory, f"{_file_name(session_id)}.mp4"),
+                       width=width, height=height, fps=fps, speed=speed, colored=colored, max_points=max_points)
+    return len(items)
+
+
+def _batches(items, batch_size: int):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _run(function, batches, n_jobs: int, quiet: bool, label: str, **kwargs) -> dict:
+    """
+    Render the batches in parallel, reporting the throughput. Only a few batches are dispatched ahead of the workers,
+    so the memory is bounded by the batch size whatever the number of items.
+    """
+    start = time.perf_counter()
+    rendered = 0
+    tasks = (delayed(function)(batch, **kwargs) for batch in batches)
+    for count in Parallel(n_jobs=n_jobs, return_as="generator_unordered", pre_dispatch="2*n_jobs")(tasks):
+        rendered += count
+        if not quiet:
+            elapsed = time.perf_counter() - start
+            print(f"{rendered} {label} rendered, {rendered / elapsed:.1f}/s", file=sys.stderr, flush=True)
+    elapsed = time.perf_counter() - start
+    return {"rendered": rendered, "seconds": elapsed, "per_second": rendered / elapsed if elapsed > 0 else 0.0}
+
+
+def render_traces(traces: dict[str, list[pd.DataFrame]], directory: str, n_jobs: int = -1, batch_size: int = 32,
+                  fmt: str = "png", dpi: int = 100, show_info: bool = False, show_optimal_line: bool = False,
+                  max_points: int = MAX_PLOT_POINTS, quiet: bool = True) -> dict:
+    """
+    Render the plot of every trace, as :py:func:`~pywib.visualize_trace` does, to image files in parallel.
+
+    Parameters:
+        traces (dict[str, list[pd.DataFrame]]): Traces by session, e.g. from :py:func:`~pywib.extract_traces_by_session`.
+        directory (str): Output directory, created if it does not exist. Files are named '<sessionId>_<trace>.<fmt>'.
+        n_jobs (int): Number of worker processes, -1 for all the CPUs.
+        batch_size (int): Number of traces per task sent to a worker.
+        fmt (str): Image format supported by matplotlib, e.g. 'png', 'svg' or 'pdf'.
+        dpi (int): Resolution of the images.
+        show_info (bool): Whether to draw the axes, title and legend.
+        show_optimal_line (bool): Whether to draw the straight line between the start and end points.
+        max_points (int): Traces with more points are drawn downsampled to this many points. None to draw every point.
+        quiet (bool): If False, the progress and throughput are reported on the standard error.
+    Returns:
+        dict: Number of 'rendered' images, elapsed 'seconds' and images 'per_second'.
+    """
+    os.makedirs(directory, exist_ok=True)
+    items = ((_file_name(session_id, i), f"{session_id}-{i}", trace[_TRACE_COLUMNS])
+             for session_id, session_traces in traces.items() for i, trace in enumerate(session_traces))
+    return _run(_render_traces_batch, _batches(items, batch_size), n_jobs, quiet, "traces", directory=directory,
+                fmt=fmt, dpi=dpi, show_info=show_info, show_optimal_line=show_optimal_line,
+                max_points=max_points)
+
+
+def render_sessions(df: pd.DataFrame, directory: str, sessions: list = None, n_jobs: int = -1, batch_size: int = 4,
+                    width: int = 640, height: int = 480, fps: int = 30, speed: float = 1.0, colored: bool = False,
+                    max_points: int = MAX_REPLAY_POINTS, quiet: bool = True) -> dict:
+    """
+    Render the replay video of every session, as :py:func:`~pywib.replay_session` does, in parallel.
+
+    Parameters:
+        df (pd.DataFrame): DataFrame containing the interaction data with 'x', 'y', 'eventType', 'timeStamp' and 'sessionId' columns.
+        directory (str): Output directory, created if it does not exist. Files are named '<sessionId>.mp4'.
+        sessions (list): Only render these sessionIds. By default all of them.
+        n_jobs (int): Number of worker processes, -1 for all the CPUs.
+        batch_size (int): Number of sessions per task sent to a worker.
+        width (int): Width of the videos.
+        height (int): Height of the videos.
+        fps (int): Frames per second of the videos.
+        speed (float): Speed-up factor of the replays.
+        colored (bool): If True, applies a temperature gradient (green to red) to the trajectory lines.
+        max_points (int): Sessions with more movement events are replayed with their movements downsampled to this
+                          many points. None to draw every movement.
+        quiet (bool): If False, the progress and throughput are reported on the standard error.
+    Returns:
+        dict: Number of 'rendered' videos, elapsed 'seconds' and videos 'per_second'.
+    """
+    os.makedirs(directory, exist_ok=True)
+    columns = [ColumnNames.SESSION_ID, ColumnNames.EVENT_TYPE, ColumnNames.TIME_STAMP, ColumnNames.X, ColumnNames.Y]
+    if sessions is not None:
+        df = df[df[ColumnNames.SESSION_ID].isin(list(sessions))]
+    items = ((session_id, events) for session_id, events in df[columns].groupby(ColumnNames.SESSION_ID, sort=False))
+    return _run(_render_sessions_batch, _batches(items, batch_size), n_jobs, quiet, "sessions", directory=directory,
+                width=width, height=height, fps=fps, speed=speed, colored=colored, max_points=max_points)
@@ -0,0 +1,158 @@
+"""
+Kinematic and pause metrics over sliding time windows within every session.
+"""
+
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from ..constants import ColumnNames
+from .chunked import _MOVE_EVENTS, _trace_diff
+from .validation import validate_dataframe
+
+ROLLING_METRICS = ("velocity", "acceleration", "jerkiness", "pauses")
+
+WINDOW_START = "window_start"
+WINDOW_END = "window_end"
+
+
+def _sliding_extremum(values: np.ndarray, lo: np.ndarray, hi: np.ndarray, maximum: bool, empty: float) -> np.ndarray:
+    """
+    Maximum (or minimum) of `values[lo[i]:hi[i]]` for every window with a monotonic deque.
+    Both bounds must be non-decreasing, so every value enters and leaves the deque once.
+    """
+    result = np.full(len(lo), empty, dtype=float)
+    candidates = deque()
+    position = 0
+    for i in range(len(lo)):
+        while position < hi[i]:
+            value = values[position]
+            while candidates and (values[candidates[-1]] <= value if maximum else values[candidates[-1]] >= value):
+                candidates.pop()
+            candidates.append(position)
+            position += 1
+        while candidates and candidates[0] < lo[i]:
+            candidates.popleft()
+        if candidates:
+            result[i] = values[candidates[0]]
+    return result
+
+
+def _window_statistics(time_stamp: np.ndarray, values: np.ndarray, starts: np.ndarray, ends: np.ndarray,
+                       empty: float) -> dict:
+    """
+    Count, sum, max and min of the values whose timeStamp is in every window `[start, end)`.
+    """
+    lo = np.searchsorted(time_stamp, starts, side='left')
+    hi = np.searchsorted(time_stamp, ends, side='left')
+    cumulative = np.r_[0.0, np.cumsum(values)]
+    return {
+        "count": hi - lo,
+        "sum": cumulative[hi] - cumulative[lo],
+        "max": _sliding_extremum(values, lo, hi, True, empty),
+        "min": _sliding_extremum(values, lo, hi, False, empty),
+    }
+
+
+def _trace_points(df: pd.DataFrame):
+    """
+    Session code, timeStamp and kinematics of every point of the movement traces, sorted by session and timeStamp.
+    """
+    time_stamp = pd.to_numeric(df[ColumnNames.TIME_STAMP], errors='coerce').to_numpy(dtype=float)
+    codes, sessions = pd.factorize(df[ColumnNames.SESSION_ID], sort=True)
+    order = np.lexsort((time_stamp, codes))
+    order = order[codes[order] >= 0]
+    codes = codes[order]
+    time_stamp = time_stamp[order]
+    is_move = df[ColumnNames.EVENT_TYPE].isin(_MOVE_EVENTS).to_numpy()[order]
+
+    new_session = np.r_[True, codes[1:] != codes[:-1]]
+    trace_id = np.cumsum(~is_move | new_session)[is_move]
+    _, inverse, lengths = np.unique(trace_id, return_inverse=True, return_counts=True)
+    points = np.flatnonzero(is_move)[lengths[inverse] >= 2]
+    trace_id = trace_id[lengths[inverse] >= 2]
+
+    first = np.r_[True, trace_id[1:] != trace_id[:-1]]
+    x = df[ColumnNames.X].to_numpy(dtype=float)[order][points]
+    y = df[ColumnNames.Y].to_numpy(dtype=float)[order][points]
+    t = time_stamp[points]
+    dt = _trace_diff(t, first)
+    distance = np.sqrt(_trace_diff(x, first) ** 2 + _trace_diff(y, first) ** 2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        velocity = np.where(dt != 0, distance / dt, 0)
+        acceleration = np.where(dt != 0, _trace_diff(velocity, first) / dt, 0)
+        jerkiness = np.where(dt != 0, _trace_diff(acceleration, first) / dt, 0)
+
+    kinematics = {"velocity": velocity, "acceleration": acceleration, "jerkiness": jerkiness, "dt": dt}
+    session_offsets = np.searchsorted(codes, np.arange(len(sessions) + 1))
+    return sessions, codes[points], t, kinematics, time_stamp, session_offsets
+
+
+def rolling_metrics(df: pd.DataFrame, window: float = 5000, step: float = 1000, threshold: float = 100,
+                    metrics: list[str] = None) -> pd.DataFrame:
+    """
+    Velocity, acceleration, jerkiness and pause metrics over sliding time windows within every session.
+
+    The kinematics are computed once per trace, as in :py:func:`~pywib.velocity_metrics`, and every point is assigned
+    to the windows that contain its timeStamp. Window counts and sums come from cumulative sums, their bounds from
+    binary searches and their max and min from monotonic deques, so the cost is linear in the events of every session.
+
+    Parameters:
+        df (pd.DataFrame): DataFrame containing the interaction events of one or more sessions.
+        window (float): Duration of every window in milliseconds.
+        step (float): Time between the starts of consecutive windows in milliseconds. The first window of every
+                      session starts at its first event.
+        threshold (float): Time threshold in milliseconds to consider a pause, by default 100 ms.
+        metrics (list[str]): Metrics to compute, any of :py:data:`ROLLING_METRICS`. By default all of them.
+    Returns:
+        pd.DataFrame: One row per session window with 'sessionId', 'window_start' and 'window_end' columns, the 'count',
+                      'mean', 'max' and 'min' of every kinematic metric (e.g. 'velocity.mean') and the 'total_pauses',
+                      'mean_pause_duration', 'max_pause' and 'min_pause' of the pauses.
+    """
+    validate_dataframe(df)
+    metrics = list(ROLLING_METRICS) if metrics is None else list(metrics)
+    for metric in metrics:
+        if metric not in ROLLING_METRICS:
+            raise ValueError(f"Unknown metric: {metric}")
+    if window <= 0 or step <= 0:
+        raise ValueError("'window' and 'step' must be positive.")
+
+    sessions, point_codes, point_time, kinematics, time_stamp, session_offsets = _trace_points(df)
+    # Same values as the session metrics: positive velocities, non zero accelerations and jerkiness, long pauses
+    selected = {
+        "velocity": kinematics["velocity"] > 0,
+        "acceleration": kinematics["acceleration"] != 0,
+        "jerkiness": kinematics["jerkiness"] != 0,
+        "pauses": kinematics["dt"] > threshold,
+    }
+    point_offsets = np.searchsorted(point_codes, np.arange(len(sessions) + 1))
+
+    parts = []
+    for code, session_id in enumerate(sessions):
+        first_event = time_stamp[session_offsets[code]]
+        last_event = time_stamp[session_offsets[code + 1] - 1]
+        starts = first_event + step * np.arange(int((last_event - first_event) // step) + 1)
+        ends = starts + window
+        columns = {ColumnNames.SESSION_ID: session_id, WINDOW_START: starts, WINDOW_END: ends}
+
+        points = slice(point_offsets[code], point_offsets[code + 1])
+        for metric in metrics:
+            keep = selected[metric][points]
+            values = kinematics["dt" if metric == "pauses" else metric][points][keep]
+            stats = _window_statistics(point_time[points][keep], values, starts, ends,
+                                       empty=0.0 if metric == "pauses" else np.nan)
+            count = stats["count"]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                mean = np.where(count > 0, stats["sum"] / count, 0.0 if metric == "pauses" else np.nan)
+            if metric == "pauses":
+                columns.update({"pauses.total_pauses": count, "pauses.mean_pause_duration": mean,
+                                "pauses.max_pause": stats["max"], "pauses.min_pause": stats["min"]})
+            else:
+                columns.update({f"{metric}.count": count, f"{metric}.mean": mean,
+                                f"{metric}.max": stats["max"], f"{metric}.min": stats["min"]})
+        parts.append(pd.DataFrame(columns))
+
+    if not parts:
+        return pd.DataFrame(columns=[ColumnNames.SESSION_ID, WINDOW_START, WINDOW_END])
+    return pd.concat(parts, ignore_index=True)
@@ -1,5 +1,6 @@
 from typing import List
 
+import numpy as np
 import pandas as pd
 from ..constants import EventTypes, ColumnNames
 from ..utils.validation import validate_dataframe, validate_dataframe_keyboard
@@ -129,6 +130,140 @@ def extract_mouse_click_traces_by_session_with_intial_pause(dt: pd.DataFrame, pa
     return click_traces_by_session
 
 
+def _move_runs(dt: pd.DataFrame) -> dict:
+    """
+    Runs of consecutive moves of every session as flat arrays, the traces of :py:func:`extract_traces_by_session`
+    being the runs of two or more points.
+
+    Returns:
+        dict: The sorted 'sessions', the session 'codes', 'time_stamp' and 'event_type' of the events sorted by session
+              and timeStamp with their 'order' in dt, the positions of the 'moves' in them, whether every move is the
+              'first' of its run, and the 'starts' (in the moves), 'start_rows', 'end_rows' and 'lengths' of the runs.
+    """
+    time_stamp = pd.to_numeric(dt[ColumnNames.TIME_STAMP], errors='coerce').to_numpy(dtype=float)
+    codes, sessions = pd.factorize(dt[ColumnNames.SESSION_ID], sort=True)
+    order = np.lexsort((time_stamp, codes))
+    order = order[codes[order] >= 0]
+    codes = codes[order]
+    time_stamp = time_stamp[order]
+    event_type = dt[ColumnNames.EVENT_TYPE].to_numpy()[order]
+
+    is_move = np.isin(event_type, [EventTypes.EVENT_ON_MOUSE_MOVE, EventTypes.EVENT_ON_TOUCH_MOVE])
+    new_session = np.r_[True, codes[1:] != codes[:-1]]
+    moves = np.flatnonzero(is_move)
+    run_id = np.cumsum(~is_move | new_session)[moves]
+    # Without moves there are no runs, and no first move to mark
+    first = np.r_[True, run_id[1:] != run_id[:-1]] if len(moves) else np.zeros(0, dtype=bool)
+    starts = np.flatnonzero(first)
+    lengths = np.diff(np.r_[starts, len(moves)])
+    start_rows = moves[starts]
+    return {
+        "sessions": sessions, "codes": codes, "time_stamp": time_stamp, "event_type": event_type, "order": order,
+        "moves": moves, "first": first, "starts": starts, "start_rows": start_rows,
+        "end_rows": start_rows + lengths - 1, "lengths": lengths,
+    }
+
+
+def _ends_in_click(runs: dict) -> np.ndarray:
+    """
+    Whether every run of moves is followed by a click, mouse down or mouse up of the same session.
+    """
+    codes, end_rows = runs["codes"], runs["end_rows"]
+    next_rows = np.minimum(end_rows + 1, len(codes) - 1)
+    return ((end_rows + 1 < len(codes)) & (codes[next_rows] == codes[end_rows])
+            & np.isin(runs["event_type"][next_rows], [EventTypes.EVENT_ON_CLICK, EventTypes.EVENT_ON_MOUSE_DOWN,
+                                                      EventTypes.EVENT_ON_MOUSE_UP]))
+
+
+def _run_points(dt: pd.DataFrame, runs: dict, selected: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    The 'x' and 'y' of the points of the selected runs and the offsets of every run in them.
+    """
+    lengths = runs["lengths"][selected]
+    offsets = np.r_[0, np.cumsum(lengths)].astype(np.int64)
+    rows = runs["order"][np.repeat(runs["start_rows"][selected] - offsets[:-1], lengths) + np.arange(offsets[-1])]
+    return dt[ColumnNames.X].to_numpy(dtype=float)[rows], dt[ColumnNames.Y].to_numpy(dtype=float)[rows], offsets
+
+
+def _move_trace_points(dt: pd.DataFrame) -> dict:
+    """
+    Flat arrays of the traces of :py:func:`extract_traces_by_session`, in the layout of :py:func:`_flatten_traces`.
+    """
+    runs = _move_runs(dt)
+    selected = runs["lengths"] > 1
+    x, y, offsets = _run_points(dt, runs, selected)
+    codes = runs["codes"][runs["start_rows"][selected]]
+    rows = np.repeat(runs["start_rows"][selected] - offsets[:-1], runs["lengths"][selected]) + np.arange(offsets[-1])
+    return {
+        "sessions": runs["sessions"],
+        "codes": codes,
+        "trace_ids": np.arange(len(codes)) - np.searchsorted(codes, codes, side='left'),
+        "x": x,
+        "y": y,
+        "time_stamp": runs["time_stamp"][rows],
+        "offsets": offsets,
+    }
+
+
+def _flatten_traces(traces: dict[str, list[pd.DataFrame]]) -> dict:
+    """
+    Flat arrays of already extracted traces: the 'sessions', the session 'codes' and 'trace_ids' (position in the list
+    of the session) of the traces of two or more points, the 'x', 'y' and 'time_stamp' of their points and the
+    'offsets' of every trace in them.
+    """
+    sessions = list(traces)
+    session_traces = [(code, i, trace) for code, session_id in enumerate(sessions)
+                      for i, trace in enumerate(traces[session_id]) if len(trace) > 1]
+
+    def column(name):
+        return np.concatenate([pd.to_numeric(trace[name], errors='coerce').to_numpy(dtype=float)
+                               for _, _, trace in session_traces] or [np.zeros(0)])
+
+    return {
+        "sessions": sessions,
+        "codes": np.array([code for code, _, _ in session_traces], dtype=np.int64),
+        "trace_ids": np.array([i for _, i, _ in session_traces], dtype=np.int64),
+        "x": column(ColumnNames.X),
+        "y": column(ColumnNames.Y),
+        "time_stamp": column(ColumnNames.TIME_STAMP),
+        "offsets": np.r_[0, np.cumsum([len(trace) for _, _, trace in session_traces])].astype(np.int64),
+    }
+
+
+def _click_trace_points(dt: pd.DataFrame, pause_threshold: float = 200) -> dict:
+    """
+    Flat arrays of the traces of :py:func:`extract_mouse_click_traces_by_session_with_intial_pause`, found with array
+    operations over all the sessions at once instead of a DataFrame per trace.
+
+    Returns:
+        dict: The sorted 'sessions', the session 'codes' of every trace, the 'trace_ids' (position of every trace in the
+              list of its session), the 'x' and 'y' of all the points and the 'offsets' of every trace in them.
+    """
+    runs = _move_runs(dt)
+    moves, first, starts, lengths = runs["moves"], runs["first"], runs["starts"], runs["lengths"]
+    time_stamp = runs["time_stamp"]
+
+    # The trace must be followed by a click, mouse down or mouse up of the same session
+    ends_in_click = _ends_in_click(runs)
+    # And have a single pause, between its first and second points
+    dt_moves = np.where(first, 0, np.diff(np.r_[time_stamp[moves[:1]], time_stamp[moves]]))
+    is_pause = dt_moves > pause_threshold
+    num_pauses = np.add.reduceat(is_pause.astype(np.int64), starts) if len(starts) else np.zeros(0, dtype=np.int64)
+    initial_pause = is_pause[np.minimum(starts + 1, len(moves) - 1)] & (lengths > 1)
+    selected = (lengths > 1) & ends_in_click & initial_pause & (num_pauses == 1)
+
+    trace_codes = runs["codes"][runs["start_rows"][selected]]
+    trace_ids = np.arange(len(trace_codes)) - np.searchsorted(trace_codes, trace_codes, side='left')
+    x, y, offsets = _run_points(dt, runs, selected)
+    return {
+        "sessions": runs["sessions"],
+        "codes": trace_codes,
+        "trace_ids": trace_ids,
+        "x": x,
+        "y": y,
+        "offsets": offsets,
+    }
+
 def _extract_move_trace(dt: pd.DataFrame) -> list[pd.DataFrame]:
     """
     Helper function to extract consecutive movement traces for segmentations.
@@ -0,0 +1,255 @@
+"""
+Dynamic time warping distances between traces, with lower bounds to prune nearest-neighbor searches.
+"""
+
+import hashlib
+import heapq
+import json
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+
+from ..constants import ColumnNames
+from .cache import DiskCache
+from .rolling import _sliding_extremum
+
+
+def _points(trace) -> np.ndarray:
+    """
+    Coordinates of a trace as a (n, 2) float array, from a DataFrame with 'x' and 'y' columns or an array.
+    """
+    if isinstance(trace, pd.DataFrame):
+        points = trace[[ColumnNames.X, ColumnNames.Y]].to_numpy(dtype=float)
+    else:
+        points = np.asarray(trace, dtype=float)
+    if points.ndim != 2 or points.shape[1] != 2:
+        raise ValueError("Traces must be DataFrames with 'x' and 'y' columns or arrays of (x, y) points.")
+    if len(points) == 0:
+        raise ValueError("Traces must have at least one point.")
+    return points
+
+
+def _band(n: int, m: int, window: int | None) -> int:
+    """
+    Width of the Sakoe-Chiba band, widened to the difference of lengths so that the end can be reached.
+    """
+    if window is None:
+        return max(n, m)
+    if window < 0:
+        raise ValueError("'window' must not be negative.")
+    return max(int(window), abs(n - m))
+
+
+def _diagonal(values: np.ndarray, lo: int, rows: np.ndarray) -> np.ndarray:
+    """
+    Values of a stored anti-diagonal at the given rows, inf outside of it.
+    """
+    if len(values) == 0:
+        return np.full(len(rows), np.inf)
+    positions = rows - lo
+    inside = (positions >= 0) & (positions < len(values))
+    return np.where(inside, values[np.clip(positions, 0, len(values) - 1)], np.inf)
+
+
+def dtw_distance(a, b, window: int = None, max_distance: float = np.inf) -> float:
+    """
+    Dynamic time warping distance between two traces, the minimum sum of the Euclidean distances of the matched points.
+
+    Only the cells of the Sakoe-Chiba band `|i - j| <= window` are computed, one anti-diagonal at a time with array
+    operations, so the cost is O((n + m) * window) instead of O(n * m).
+
+    Parameters:
+        a: First trace, a DataFrame with 'x' and 'y' columns or an array of (x, y) points.
+        b: Second trace.
+        window (int): Width of the band in points, widened to the difference of lengths. None for no band.
+        max_distance (float): Stop and return inf as soon as the distance is known to exceed it (early abandoning).
+    Returns:
+        float: The distance, inf if it exceeds `max_distance`.
+    """
+    a, b = _points(a), _points(b)
+    n, m = len(a), len(b)
+    w = _band(n, m, window)
+
+    # Every cell (i, j) is on the anti-diagonal k = i + j, which only depends on the two previous ones
+    previous, previous_lo = np.zeros(0), 0
+    current, current_lo = np.array([np.hypot(*(a[0] - b[0]))]), 0
+    for k in range(1, n + m - 1):
+        lo = max(0, k - m + 1, -((w - k) // 2))
+        hi = min(n - 1, k, (k + w) // 2)
+        rows = np.arange(lo, hi + 1)
+        cols = k - rows
+        cost = np.hypot(a[rows, 0] - b[cols, 0], a[rows, 1] - b[cols, 1])
+        best = np.minimum(np.minimum(_diagonal(current, current_lo, rows - 1), _diagonal(current, current_lo, rows)),
+                          _diagonal(previous, previous_lo, rows - 1))
+        previous, previous_lo = current, current_lo
+        current, current_lo = cost + best, lo
+        # Warping paths cross every pair of consecutive anti-diagonals
+        if min(current.min(initial=np.inf), previous.min(initial=np.inf)) > max_distance:
+            return np.inf
+    distance = float(current[-1])
+    return distance if distance <= max_distance else np.inf
+
+
+def lb_kim(a, b) -> float:
+    """
+    LB_Kim lower bound of the DTW distance: the distances between the first points and between the last points,
+    which every warping path matches.
+
+    Parameters:
+        a: First trace, a DataFrame with 'x' and 'y' columns or an array of (x, y) points.
+        b: Second trace.
+    Returns:
+        float: The lower bound.
+    """
+    a, b = _points(a), _points(b)
+    first = np.hypot(*(a[0] - b[0]))
+    if len(a) == 1 and len(b) == 1:
+        return float(first)
+    return float(first + np.hypot(*(a[-1] - b[-1])))
+
+
+def lb_keogh(a, b, window: int = None) -> float:
+    """
+    LB_Keogh lower bound of the banded DTW distance: the distance of every point of `a` to the bounding box of the
+    points of `b` it can be matched with.
+
+    Parameters:
+        a: Query trace, a DataFrame with 'x' and 'y' columns or an array of (x, y) points.
+        b: Candidate trace.
+        window (int): Width of the band in points, as in :py:func:`dtw_distance`.
+    Returns:
+        float: The lower bound.
+    """
+    a, b = _points(a), _points(b)
+    n, m = len(a), len(b)
+    w = _band(n, m, window)
+    rows = np.arange(n)
+    lo = np.clip(rows - w, 0, m)
+    hi = np.clip(rows + w + 1, 0, m)
+    excess = []
+    for dimension in range(2):
+        upper = _sliding_extremum(b[:, dimension], lo, hi, True, np.inf)
+        lower = _sliding_extremum(b[:, dimension], lo, hi, False, -np.inf)
+        excess.append(np.maximum(a[:, dimension] - upper, 0) + np.maximum(lower - a[:, dimension], 0))
+    return float(np.hypot(*excess).sum())
+
+
+def dtw_nearest(query, candidates: list, window: int = None, k: int = 1) -> tuple[np.ndarray, np.ndarray]:
+    """
+    The `k` candidates nearest to a query trace by DTW distance.
+
+    Candidates are visited by increasing LB_Kim and skipped when LB_Kim or LB_Keogh already exceed the k-th best
+    distance, the DTW of the others is abandoned as soon as it exceeds it.
+
+    Parameters:
+        query: Query trace, a DataFrame with 'x' and 'y' columns or an array of (x, y) points.
+        candidates (list): Candidate traces.
+        window (int): Width of the Sakoe-Chiba band in points. None for no band.
+        k (int): Number of neighbors.
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Positions of the neighbors in `candidates` and their distances, nearest first.
+    """
+    if k < 1:
+        raise ValueError("'k' must be at least 1.")
+    query = _points(query)
+    candidates = [_points(candidate) for candidate in candidates]
+    bounds = np.array([lb_kim(query, candidate) for candidate in candidates])
+
+    # Max-heap of the k best (distance, position) so far
+    best = []
+    for position in np.argsort(bounds, kind='stable'):
+        threshold = -best[0][0] if len(best) == k else np.inf
+        if bounds[position] >= threshold:
+            break
+        candidate = candidates[position]
+        if lb_keogh(query, candidate, window) >= threshold:
+            continue
+        distance = dtw_distance(query, candidate, window, max_distance=threshold)
+        if distance < threshold:
+            heapq.heappush(best, (-distance, -int(position)))
+            if len(best) > k:
+                heapq.heappop(best)
+
+    ordered = sorted((-distance, -position) for distance, position in best)
+    return (np.array([position for _, position in ordered], dtype=np.int64),
+            np.array([distance for distance, _ in ordered], dtype=float))
+
+
+def _digest(points: np.ndarray) -> str:
+    return hashlib.sha1(np.ascontiguousarray(points).tobytes() + str(points.shape).encode()).hexdigest()
+
+
+def _dtw_block(block: tuple[int, int], rows: list[np.ndarray], cols: list[np.ndarray],
+               window: int | None) -> tuple[tuple[int, int], np.ndarray]:
+    diagonal = block[0] == block[1]
+    values = np.zeros((len(rows), len(cols)))
+    for i, a in enumerate(rows):
+        for j, b in enumerate(cols):
+            if diagonal and j <= i:
+                continue
+            values[i, j] = dtw_distance(a, b, window)
+    if diagonal:
+        values = values + values.T
+    return block, values
+
+
+def dtw_matrix(traces: list | dict[str, list[pd.DataFrame]], window: int = None, n_jobs: int = -1,
+               block_size: int = 64, cache: DiskCache = None) -> pd.DataFrame:
+    """
+    Matrix of the DTW distances between every pair of traces.
+
+    The upper triangle of the matrix is split into square blocks that are computed in parallel, and every block is
+    stored in the cache under a hash of the coordinates of its traces, so an interrupted or repeated computation over
+    the same traces only computes the missing blocks.
+
+    Parameters:
+        traces (list | dict): Traces as a list, or by session as returned by :py:func:`~pywib.extract_traces_by_session`.
+        window (int): Width of the Sakoe-Chiba band in points. None for no band.
+        n_jobs (int): Number of worker processes, -1 for all the CPUs.
+        block_size (int): Number of traces of the side of a block.
+        cache (DiskCache): Optional persistent cache of the blocks.
+    Returns:
+        pd.DataFrame: The symmetric matrix, indexed by the position of the traces in the list, or by (sessionId, trace)
+                      for traces by session.
+    """
+    if block_size < 1:
+        raise ValueError("'block_size' must be at least 1.")
+    if isinstance(traces, dict):
+        labels = pd.MultiIndex.from_tuples([(session_id, i) for session_id, session_traces in traces.items()
+                                            for i in range(len(session_traces))],
+                                           names=[ColumnNames.SESSION_ID, "trace"])
+        points = [_points(trace) for session_traces in traces.values() for trace in session_traces]
+    else:
+        points = [_points(trace) for trace in traces]
+        labels = pd.RangeIndex(len(points))
+
+    starts = list(range(0, len(points), block_size))
+    blocks = [(row, col) for row in starts for col in starts if col >= row]
+    digests = [_digest(trace) for trace in points] if cache is not None else None
+
+    def block_key(row, col):
+        names = [digests[i] for i in range(row, min(row + block_size, len(points)))]
+        names += [digests[j] for j in range(col, min(col + block_size, len(points)))]
+        return hashlib.sha1(json.dumps(["dtw_matrix", window, row == col, names]).encode("utf-8")).hexdigest()
+
+    results = {}
+    if cache is not None:
+        for row, col in blocks:
+            value = cache.get(block_key(row, col))
+            if value is not None:
+                results[(row, col)] = value
+    missing = [block for block in blocks if block not in results]
+    tasks = (delayed(_dtw_block)((row, col), points[row:row + block_size], points[col:col + block_size], window)
+             for row, col in missing)
+    # Every block is cached as soon as it is computed, so an interrupted run keeps the finished ones
+    for block, values in Parallel(n_jobs=n_jobs, return_as="generator_unordered")(tasks):
+        results[block] = values
+        if cache is not None:
+            cache.set(block_key(*block), values)
+
+    matrix = np.zeros((len(points), len(points)))
+    for (row, col), values in results.items():
+        matrix[row:row + values.shape[0], col:col + values.shape[1]] = values
+        matrix[col:col + values.shape[1], row:row + values.shape[0]] = values.T
+    return pd.DataFrame(matrix, index=labels, columns=labels)
@@ -0,0 +1,88 @@
+"""
+Ramer-Douglas-Peucker simplification of the trajectories, to drop nearly collinear points before the geometric metrics.
+"""
+
+import numpy as np
+import pandas as pd
+
+from ..constants import ColumnNames
+
+
+def _segment_distances(x: np.ndarray, y: np.ndarray, x0: float, y0: float, x1: float, y1: float) -> np.ndarray:
+    """
+    Distances of the points to the segment (x0, y0)-(x1, y1).
+    """
+    dx, dy = x1 - x0, y1 - y0
+    length_sq = dx * dx + dy * dy
+    if length_sq == 0:
+        return np.hypot(x - x0, y - y0)
+    t = np.clip(((x - x0) * dx + (y - y0) * dy) / length_sq, 0.0, 1.0)
+    return np.hypot(x - (x0 + t * dx), y - (y0 + t * dy))
+
+
+def rdp_mask(x, y, tolerance: float) -> np.ndarray:
+    """
+    Points kept by the Ramer-Douglas-Peucker simplification of a polyline.
+
+    The simplification is iterative (no recursion limit) and the distances of every range are computed at once.
+    The first and last points are always kept.
+
+    Parameters:
+        x (array-like): X coordinates of the points.
+        y (array-like): Y coordinates of the points.
+        tolerance (float): Maximum distance in pixels between a dropped point and the simplified polyline.
+    Returns:
+        np.ndarray: Boolean mask of the kept points.
+    """
+    if tolerance < 0:
+        raise ValueError("'tolerance' must not be negative.")
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    keep = np.zeros(len(x), dtype=bool)
+    if len(x) <= 2:
+        keep[:] = True
+        return keep
+
+    keep[0] = keep[-1] = True
+    ranges = [(0, len(x) - 1)]
+    while ranges:
+        first, last = ranges.pop()
+        if last - first < 2:
+            continue
+        distances = _segment_distances(x[first + 1:last], y[first + 1:last], x[first], y[first], x[last], y[last])
+        farthest = int(np.argmax(distances))
+        if distances[farthest] > tolerance:
+            split = first + 1 + farthest
+            keep[split] = True
+            ranges.append((first, split))
+            ranges.append((split, last))
+    return keep
+
+
+def simplify_trace(trace: pd.DataFrame, tolerance: float) -> pd.DataFrame:
+    """
+    Simplify a trace with the Ramer-Douglas-Peucker algorithm.
+
+    Parameters:
+        trace (pd.DataFrame): A trace with 'x' and 'y' columns.
+        tolerance (float): Maximum distance in pixels between a dropped point and the simplified trace.
+    Returns:
+        pd.DataFrame: The kept rows of the trace.
+    """
+    keep = rdp_mask(trace[ColumnNames.X].to_numpy(dtype=float), trace[ColumnNames.Y].to_numpy(dtype=float), tolerance)
+    return trace[keep]
+
+
+def simplify_traces(traces: dict[str, list[pd.DataFrame]], tolerance: float) -> dict[str, list[pd.DataFrame]]:
+    """
+    Simplify every trace of every session with the Ramer-Douglas-Peucker algorithm.
+
+    Parameters:
+        traces (dict[str, list[pd.DataFrame]]): Traces by session.
+        tolerance (float): Maximum distance in pixels between a dropped point and the simplified trace.
+    Returns:
+        dict[str, list[pd.DataFrame]]: The simplified traces, in the same structure.
+    """
+    return {session_id: [simplify_trace(trace, tolerance) for trace in session_traces]
+            for session_id, session_traces in traces.items()}
+
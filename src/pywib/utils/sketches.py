@@ -0,0 +1,134 @@
+"""
+Mergeable quantile sketches for the distribution of the session metrics.
+"""
+
+import numpy as np
+
+# Each level of the sketch keeps this fraction of the capacity of the level above it
+_LEVEL_DECAY = 2.0 / 3.0
+_MIN_LEVEL_CAPACITY = 2
+
+
+class KLLSketch:
+    """
+    Mergeable streaming quantile sketch, following the KLL sketch from
+    'Optimal Quantile Approximation in Streams' (Karnin, Lang & Liberty, 2016).
+
+    The sketch keeps at most about `3 * k` values whatever the number of values added, and estimates any quantile
+    with a rank error of roughly `1.7 / k` (around 1% with the default `k=200`). While fewer than `k` values have
+    been added the quantiles are exact.
+    """
+    __slots__ = ("k", "count", "_levels", "_rng")
+
+    def __init__(self, k: int = 200, seed: int | None = None):
+        """
+        Parameters:
+            k (int): Size of the sketch, larger values give more accurate quantiles at the cost of memory.
+            seed (int | None): Seed of the random generator used when compacting the sketch.
+        """
+        if k < _MIN_LEVEL_CAPACITY:
+            raise ValueError(f"The sketch size 'k' must be at least {_MIN_LEVEL_CAPACITY}.")
+        self.k = k
+        self.count = 0
+        self._levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def size(self) -> int:
+        """
+        Number of values retained by the sketch.
+        """
+        return sum(len(level) for level in self._levels)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self._levels) - level - 1
+        return max(_MIN_LEVEL_CAPACITY, int(np.ceil(self.k * _LEVEL_DECAY ** depth)))
+
+    def update(self, values):
+        """
+        Add values to the sketch.
+
+        Parameters:
+            values (array-like): The values to add, NaN values are ignored.
+        """
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return
+        self.count += int(values.size)
+        self._levels[0] = np.concatenate((self._levels[0], values))
+        self._compress()
+
+    def _compress(self):
+        level = 0
+        while level < len(self._levels):
+            items = self._levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self._levels):
+                    self._levels.append(np.empty(0))
+                items = np.sort(items)
+                # An odd item stays in this level, the rest are halved and promoted with double weight
+                keep = items[:1] if len(items) % 2 else items[:0]
+                items = items[len(keep):]
+                promoted = items[self._rng.integers(2)::2]
+                self._levels[level] = keep
+                self._levels[level + 1] = np.concatenate((self._levels[level + 1], promoted))
+            level += 1
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        """
+        Combine this sketch with another one.
+
+        Parameters:
+            other (KLLSketch): Sketch of other values.
+        Returns:
+            KLLSketch: A new sketch of the values of both sketches, with the size of this one.
+        """
+        merged = KLLSketch(self.k)
+        merged._rng = self._rng
+        merged.count = self.count + other.count
+        depth = max(len(self._levels), len(other._levels))
+        merged._levels = [
+            np.concatenate([levels[h] for levels in (self._levels, other._levels) if h < len(levels)])
+            for h in range(depth)
+        ]
+        merged._compress()
+        return merged
+
+    def quantiles(self, qs) -> np.ndarray:
+        """
+        Estimate several quantiles of the values added to the sketch.
+
+        Parameters:
+            qs (array-like): Quantiles to estimate, between 0 and 1.
+        Returns:
+            np.ndarray: The estimated quantiles, NaN if the sketch is empty.
+        """
+        qs = np.asarray(qs, dtype=float)
+        if np.any((qs < 0) | (qs > 1)):
+            raise ValueError("Quantiles must be between 0 and 1.")
+        if self.count == 0:
+            return np.full(qs.shape, np.nan)
+
+        items = np.concatenate(self._levels)
+        weights = np.concatenate([np.full(len(level), 2 ** h) for h, level in enumerate(self._levels)])
+        order = np.argsort(items, kind='mergesort')
+        items = items[order]
+        cumulative = np.cumsum(weights[order])
+        ranks = np.maximum(qs * cumulative[-1], 1)
+        positions = np.searchsorted(cumulative, ranks, side='left')
+        return items[np.minimum(positions, len(items) - 1)]
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate a quantile of the values added to the sketch.
+
+        Parameters:
+            q (float): Quantile to estimate, between 0 and 1.
+        Returns:
+            float: The estimated quantile, NaN if the sketch is empty.
+        """
+        return float(self.quantiles([q])[0])
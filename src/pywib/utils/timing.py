@@ -3,6 +3,8 @@ import pandas as pd
 from pywib.constants import ColumnNames
 from pywib.utils.utils import compute_space_time_diff
 from pywib.utils.validation import validate_dataframe
+from pywib.utils.aggregation import PauseState, finalize_states
+from pywib.utils.sketches import KLLSketch
 
 def num_pauses_df(df: pd.DataFrame, threshold: float = 100) -> dict[str, dict]:
         """
@@ -47,66 +49,39 @@ def _num_pauses_trace(df: pd.DataFrame, threshold: float) -> pd.DataFrame:
     pauses = df[df[ColumnNames.DT] > threshold]
     return pauses
 
-def pauses_metrics_df(df: pd.DataFrame, threshold: float = 100):
-    pause_metrics_per_session = {}
+def _sketch(quantiles: list[float] | None, sketch_size: int) -> KLLSketch | None:
+    return KLLSketch(sketch_size) if quantiles is not None else None
+
+def pauses_metrics_df(df: pd.DataFrame, threshold: float = 100, as_state: bool = False,
+                      quantiles: list[float] = None, sketch_size: int = 200):
+    states = {}
     for session_id in  df[ColumnNames.SESSION_ID].unique():
-        total_pause_duration = 0.0
-        total_pauses = 0
-        pause_durations = []
         trace = df.loc[df[ColumnNames.SESSION_ID] == session_id]
         
         trace = compute_space_time_diff(trace)  
         pauses = trace[trace[ColumnNames.DT] > threshold]
-        total_pause_duration += pauses[ColumnNames.DT].sum()
-        total_pauses += pauses.shape[0]
-        pause_durations.extend(pauses[ColumnNames.DT].tolist())
-
-        # Compute pause metrics for the session
-        if total_pauses > 0:
-            mean_pause_duration = total_pause_duration / total_pauses
-        else:
-            mean_pause_duration = 0
 
-        pause_metrics_per_session[session_id] = {
-            "total_pauses": total_pauses,
-            "mean_pause_duration": mean_pause_duration,
-            "pause_durations": pause_durations,
-            "max_pause": max(pause_durations) if pause_durations else 0,
-            "min_pause": min(pause_durations) if pause_durations else 0,
-        }
+        # Without segmentation there are no traces to average over
+        state = PauseState(num_traces=None, quantiles=quantiles, sketch=_sketch(quantiles, sketch_size))
+        state.update(pauses[ColumnNames.DT].tolist())
+        states[session_id] = state
 
-    return pause_metrics_per_session
+    if as_state:
+        return states
+    return finalize_states(states)
 
-def pauses_metrics_per_trace(traces: dict[str, list[pd.DataFrame]], threshold: float = 100):
-    pause_metrics_per_session = {}
+def pauses_metrics_per_trace(traces: dict[str, list[pd.DataFrame]], threshold: float = 100, as_state: bool = False,
+                             quantiles: list[float] = None, sketch_size: int = 200):
+    states = {}
     for session_id, session_traces in traces.items():
-        total_pause_duration = 0.0
-        total_pauses = 0
-        pause_durations = []
-
+        state = PauseState(quantiles=quantiles, sketch=_sketch(quantiles, sketch_size))
         for trace in session_traces:
             validate_dataframe(trace)
             trace = compute_space_time_diff(trace)  
             pauses = trace[trace[ColumnNames.DT] > threshold]
-            total_pause_duration += pauses[ColumnNames.DT].sum()
-            total_pauses += pauses.shape[0]
-            pause_durations.extend(pauses[ColumnNames.DT].tolist())
-
-        # Compute pause metrics for the session
-        if total_pauses > 0:
-            mean_pause_duration = total_pause_duration / total_pauses
-            mean_pauses_per_trace = total_pauses / len(session_traces)
-        else:
-            mean_pause_duration = 0
-            mean_pauses_per_trace = 0
-
-        pause_metrics_per_session[session_id] = {
-            "total_pauses": total_pauses,
-            "mean_pause_duration": mean_pause_duration,
-            "pause_durations": pause_durations,
-            "mean_pauses_per_trace": mean_pauses_per_trace,
-            "max_pause": max(pause_durations) if pause_durations else 0,
-            "min_pause": min(pause_durations) if pause_durations else 0,
-        }
+            state.update(pauses[ColumnNames.DT].tolist())
+        states[session_id] = state
 
-    return pause_metrics_per_session
\ No newline at end of file
+    if as_state:
+        return states
+    return finalize_states(states)
@@ -0,0 +1,226 @@
+"""
+Binary on-disk format for segmented traces, loaded with memory mapping.
+
+A trace set is a directory with one flat .npy file per column (the points of all the traces one after the other),
+the offsets of every trace in those columns, the offsets of the traces of every session, and a JSON header.
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+
+from ..constants import ColumnNames
+from .simplify import rdp_mask
+
+_FORMAT = "pywib-traces"
+_VERSION = 1
+_HEADER_FILE = "metadata.json"
+_TRACE_OFFSETS = "trace_offsets"
+_SESSION_OFFSETS = "session_offsets"
+
+# Columns stored for every point and their on-disk types
+_COLUMNS = {
+    ColumnNames.X: np.float64,
+    ColumnNames.Y: np.float64,
+    ColumnNames.TIME_STAMP: np.float64,
+    ColumnNames.EVENT_TYPE: np.int32,
+}
+
+
+def _array_path(path: str, name: str) -> str:
+    return os.path.join(path, f"{name}.npy")
+
+
+def write_traces(traces: dict[str, list[pd.DataFrame]], path: str) -> "TraceSet":
+    """
+    Store segmented traces in the memory-mappable trace set format.
+
+    Parameters:
+        traces (dict[str, list[pd.DataFrame]]): Traces by session, e.g. from :py:func:`~pywib.extract_traces_by_session`.
+        path (str): Directory of the trace set, created if it does not exist. Existing files are overwritten.
+    Returns:
+        TraceSet: The stored trace set, memory mapped.
+    """
+    path = os.fspath(path)
+    os.makedirs(path, exist_ok=True)
+
+    sessions = list(traces.keys())
+    lengths = np.array([len(trace) for session_id in sessions for trace in traces[session_id]], dtype=np.int64)
+    trace_offsets = np.r_[0, np.cumsum(lengths)].astype(np.int64)
+    session_offsets = np.r_[0, np.cumsum([len(traces[session_id]) for session_id in sessions])].astype(np.int64)
+    num_points = int(trace_offsets[-1])
+
+    # Columns are filled trace by trace in memory-mapped files, so the points are never copied twice in memory
+    for column, dtype in _COLUMNS.items():
+        values = np.lib.format.open_memmap(_array_path(path, column), mode='w+', dtype=dtype, shape=(num_points,))
+        position = 0
+        for session_id in sessions:
+            for trace in traces[session_id]:
+                values[position:position + len(trace)] = pd.to_numeric(trace[column], errors='coerce').to_numpy(dtype=dtype)
+                position += len(trace)
+        values.flush()
+        del values
+    np.save(_array_path(path, _TRACE_OFFSETS), trace_offsets)
+    np.save(_array_path(path, _SESSION_OFFSETS), session_offsets)
+
+    header = {
+        "format": _FORMAT,
+        "version": _VERSION,
+        "sessions": [session_id.item() if isinstance(session_id, np.generic) else session_id for session_id in sessions],
+        "num_traces": int(len(lengths)),
+        "num_points": num_points,
+        "columns": {column: np.dtype(dtype).str for column, dtype in _COLUMNS.items()},
+    }
+    with open(os.path.join(path, _HEADER_FILE), "w", encoding="utf-8") as fh:
+        json.dump(header, fh)
+    return TraceSet(path)
+
+
+class TraceSet:
+    """
+    Segmented traces stored with :py:func:`~pywib.write_traces`, loaded with `np.load(mmap_mode='r')`.
+
+    Only the pages of the traces that are accessed are read from disk, and processes that open the same trace set share
+    them through the page cache. The traces are returned with the same columns as the segmentation functions, so any
+    metric that accepts `traces` can run over them.
+    """
+
+    def __init__(self, path: str, mmap: bool = True):
+        """
+        Parameters:
+            path (str): Directory of the trace set.
+            mmap (bool): If True, the columns are memory mapped. Otherwise they are read into memory.
+        """
+        self.path = os.fspath(path)
+        with open(os.path.join(self.path, _HEADER_FILE), "r", encoding="utf-8") as fh:
+            header = json.load(fh)
+        if header.get("format") != _FORMAT or header.get("version") != _VERSION:
+            raise ValueError(f"'{self.path}' is not a pywib trace set of version {_VERSION}.")
+
+        mmap_mode = 'r' if mmap else None
+        self.sessions = header["sessions"]
+        self.num_traces = header["num_traces"]
+        self.num_points = header["num_points"]
+        self._columns = {column: np.load(_array_path(self.path, column), mmap_mode=mmap_mode) for column in header["columns"]}
+        self._trace_offsets = np.load(_array_path(self.path, _TRACE_OFFSETS))
+        self._session_offsets = np.load(_array_path(self.path, _SESSION_OFFSETS))
+        self._positions = {session_id: position for position, session_id in enumerate(self.sessions)}
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+    def __contains__(self, session_id) -> bool:
+        return session_id in self._positions
+
+    def _trace_range(self, session_id) -> tuple[int, int]:
+        if session_id not in self._positions:
+            raise KeyError(f"Session {session_id} is not in the trace set.")
+        position = self._positions[session_id]
+        return int(self._session_offsets[position]), int(self._session_offsets[position + 1])
+
+    def arrays(self, session_id) -> dict[str, np.ndarray]:
+        """
+        Read-only views of the points of a session, for vectorized kernels.
+
+        Parameters:
+            session_id: The sessionId.
+        Returns:
+            dict[str, np.ndarray]: The 'x', 'y', 'timeStamp' and 'eventType' of all the points of the session, and the
+                                   'offsets' of its traces in them (trace `i` spans `offsets[i]:offsets[i + 1]`).
+        """
+        first, last = self._trace_range(session_id)
+        offsets = self._trace_offsets[first:last + 1]
+        start, end = int(offsets[0]), int(offsets[-1])
+        views = {column: values[start:end] for column, values in self._columns.items()}
+        views["offsets"] = offsets - start
+        return views
+
+    def session_traces(self, session_id) -> list[pd.DataFrame]:
+        """
+        Traces of a session.
+
+        Parameters:
+            session_id: The sessionId.
+        Returns:
+            list[pd.DataFrame]: One DataFrame per trace with 'sessionId', 'eventType', 'timeStamp', 'x' and 'y' columns.
+        """
+        arrays = self.arrays(session_id)
+        offsets = arrays.pop("offsets")
+        traces = []
+        for start, end in zip(offsets[:-1], offsets[1:]):
+            trace = pd.DataFrame({column: values[start:end] for column, values in arrays.items()})
+            trace[ColumnNames.SESSION_ID] = session_id
+            traces.append(trace)
+        return traces
+
+    def to_traces(self, sessions: list = None) -> dict[str, list[pd.DataFrame]]:
+        """
+        Traces by session, in the format of :py:func:`~pywib.extract_traces_by_session`.
+
+        Parameters:
+            sessions (list): Only load these sessionIds. By default all of them.
+        Returns:
+            dict[str, list[pd.DataFrame]]: The traces by session.
+        """
+        if sessions is None:
+            sessions = self.sessions
+        return {session_id: self.session_traces(session_id) for session_id in sessions}
+
+    def simplify(self, tolerance: float, sessions: list = None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Simplify the traces with the Ramer-Douglas-Peucker algorithm, see :py:func:`~pywib.simplify_traces`.
+
+        Parameters:
+            tolerance (float): Maximum distance in pixels between a dropped point and the simplified trace.
+            sessions (list): Only simplify the traces of these sessionIds. By default all of them.
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The positions of the kept points in the columns of the trace set, and the
+                                           offsets of every simplified trace in those positions (trace `i` spans
+                                           `offsets[i]:offsets[i + 1]`).
+        """
+        if sessions is None:
+            sessions = self.sessions
+        x = self._columns[ColumnNames.X]
+        y = self._columns[ColumnNames.Y]
+        indices = []
+        lengths = []
+        for session_id in sessions:
+            first, last = self._trace_range(session_id)
+            for start, end in zip(self._trace_offsets[first:last], self._trace_offsets[first + 1:last + 1]):
+                keep = start + np.flatnonzero(rdp_mask(x[start:end], y[start:end], tolerance))
+                indices.append(keep)
+                lengths.append(len(keep))
+        indices = np.concatenate(indices).astype(np.int64) if indices else np.empty(0, dtype=np.int64)
+        return indices, np.r_[0, np.cumsum(lengths)].astype(np.int64)
+
+    def map(self, fn, sessions: list = None, n_jobs: int = 1, batch_size: int = 64) -> dict:
+        """
+        Run a metric over the traces, a batch of sessions at a time.
+
+        Parameters:
+            fn (Callable): Function called as `fn(traces)` with the traces of a batch of sessions, returning a dictionary
+                           by sessionId, e.g. `lambda traces: pauses_metrics(None, traces=traces)`.
+            sessions (list): Only process these sessionIds. By default all of them.
+            n_jobs (int): Number of parallel workers. Every worker maps the trace set itself, so they share its pages.
+            batch_size (int): Number of sessions per call to `fn`.
+        Returns:
+            dict: The merged results of all the batches.
+        """
+        if sessions is None:
+            sessions = self.sessions
+        batches = [sessions[i:i + batch_size] for i in range(0, len(sessions), batch_size)]
+        if n_jobs == 1:
+            outputs = (fn(self.to_traces(batch)) for batch in batches)
+        else:
+            outputs = Parallel(n_jobs=n_jobs)(delayed(_map_batch)(self.path, fn, batch) for batch in batches)
+        results = {}
+        for output in outputs:
+            results.update(output)
+        return results
+
+
+def _map_batch(path: str, fn, sessions: list) -> dict:
+    return fn(TraceSet(path).to_traces(sessions))
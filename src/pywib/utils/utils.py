@@ -4,6 +4,7 @@ import warnings
 import pandas as pd
 from ..constants import ColumnNames
 from ..utils.validation import validate_dataframe
+from ..utils.aggregation import MetricState, finalize_states
 
 def compute_space_time_diff(df: pd.DataFrame) -> pd.DataFrame:
     """
@@ -35,6 +36,9 @@ def compute_metrics_from_traces(
     column_name: str,
     compute_traces_fn,
     preprocess_fn=None,
+    as_state: bool = False,
+    quantiles: list[float] | None = None,
+    sketch_size: int = 200,
 ) -> dict:
     """
     Compute basic statistical metrics (mean, max, min) for a specific column across sessions.
@@ -61,21 +65,28 @@ def compute_metrics_from_traces(
             A function that, given a DataFrame, computes and returns the corresponding traces dictionary.
 
         preprocess_fn (Callable | None): 
-            Optional function applied to the concatenated column values before computing statistics. 
+            Optional function applied to the column values of every trace before computing statistics. 
             Typically used to filter out zero or invalid values.
 
+        as_state (bool):
+            If True, returns a mergeable :py:class:`~pywib.MetricState` per session instead of the final metrics.
+
+        quantiles (list[float] | None):
+            Optional quantiles (between 0 and 1) to estimate with a :py:class:`~pywib.KLLSketch` of size `sketch_size`.
+
     Returns:
         dict:
             A dictionary where keys are sessionIds and values are dictionaries containing:
             - 'mean': Mean value.
             - 'max': Maximum value.
             - 'min': Minimum value.
+            - 'quantiles': Estimated value of every requested quantile, only if `quantiles` is given.
     """
     if (traces is None):
         validate_dataframe(df)
         traces = compute_traces_fn(df, per_traces=True)
 
-    metrics = {}
+    states = {}
     for session_id, session_traces in traces.items():
         if(len(session_traces) > 0):
             for trace_index, trace in enumerate(session_traces):
@@ -84,16 +95,17 @@ def compute_metrics_from_traces(
                         f"Missing required column '{column_name}' in "
                         f"session '{session_id}', trace index {trace_index}."
                     )
-            values = pd.concat([trace[column_name] for trace in session_traces])
-            if preprocess_fn:
-                values = preprocess_fn(values)
-            metrics[session_id] = {
-                'mean': values.mean(),
-                'max': values.max(),
-                'min': values.min()
-            }
-
-    return metrics
+            state = MetricState.from_values([], quantiles=quantiles, sketch_size=sketch_size)
+            for trace in session_traces:
+                values = trace[column_name]
+                if preprocess_fn:
+                    values = preprocess_fn(values)
+                state.update(values)
+            states[session_id] = state
+
+    if as_state:
+        return states
+    return finalize_states(states)
 
 rT = TypeVar('rT') # return type
 pT = ParamSpec('pT') # parameters type
@@ -1,13 +1,50 @@
+import os
+import re
+
 import matplotlib.pyplot as plt
 import numpy as np
+import pandas as pd
 import cv2
 import seaborn as sns
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 
 from pywib.constants import EventTypes
 from pywib.constants import ColumnNames
 from pywib.utils.validation import validate_dataframe_keyboard
+from pywib.utils.downsample import MAX_PLOT_POINTS, MAX_REPLAY_POINTS, downsample_trace, lttb_indices
 
-def visualize_trace(df, stroke_indices, stroke_id, plot_name: str = None, plot: bool = True, show_info: bool = False, show_optimal_line: bool = False):
+def _draw_trace(ax, stroke_data, stroke_id, show_info: bool = False, show_optimal_line: bool = False,
+                max_points: int = MAX_PLOT_POINTS):
+    """
+    Draw a trace on a matplotlib Axes, shared by :py:func:`visualize_trace` and the batch renderers.
+    Traces longer than `max_points` are drawn downsampled, the title still reports all their points.
+    """
+    points = stroke_data if max_points is None else downsample_trace(stroke_data, max_points)
+    ax.plot(points[ColumnNames.X], points[ColumnNames.Y], 'b-o', linewidth=2, markersize=4, label='Real trace')
+
+    x_start, y_start = stroke_data[ColumnNames.X].iloc[0], stroke_data[ColumnNames.Y].iloc[0]
+    x_end, y_end = stroke_data[ColumnNames.X].iloc[-1], stroke_data[ColumnNames.Y].iloc[-1]
+
+    if(show_optimal_line):
+        ax.plot([x_start, x_end], [y_start, y_end], 'r--', linewidth=2, label='Optimal trace')
+
+        ax.plot(x_start, y_start, 'go', markersize=8, label='Start')
+        ax.plot(x_end, y_end, 'ro', markersize=8, label='End')
+
+    if(show_info):
+        duration = stroke_data[ColumnNames.TIME_STAMP].iloc[-1] - stroke_data[ColumnNames.TIME_STAMP].iloc[0]
+        ax.set_xlabel('X (px)')
+        ax.set_ylabel('Y (px)')
+        ax.set_title(f'Trace {stroke_id} - Duration: {duration:.0f}ms - Points: {len(stroke_data)}')
+        ax.legend()
+        ax.grid(True, alpha=0.3)
+        ax.invert_yaxis()
+    else:
+        ax.axis('off')
+
+def visualize_trace(df, stroke_indices, stroke_id, plot_name: str = None, plot: bool = True, show_info: bool = False, show_optimal_line: bool = False,
+                    max_points: int = MAX_PLOT_POINTS):
     """
     Generates (and optionally saves) a plot visualizing the trace of a stroke.
 
@@ -17,31 +54,12 @@ def visualize_trace(df, stroke_indices, stroke_id, plot_name: str = None, plot:
         stroke_id (str): Identifier for the stroke to be displayed in the title.
         plot_name (str, optional): If provided, saves the plot to this file path.
         plot (bool): Whether to display the plot.
+        max_points (int): Traces with more points are downsampled to this many points with
+                          :py:func:`~pywib.lttb_indices` before being drawn. None to draw every point.
     """
     stroke_data = df.loc[stroke_indices]
     plt.figure(figsize=(10, 8))
-    plt.plot(stroke_data[ColumnNames.X], stroke_data[ColumnNames.Y], 'b-o', linewidth=2, markersize=4, label='Real trace')
-
-    x_start, y_start = stroke_data[ColumnNames.X].iloc[0], stroke_data[ColumnNames.Y].iloc[0]
-    x_end, y_end = stroke_data[ColumnNames.X].iloc[-1], stroke_data[ColumnNames.Y].iloc[-1]
-    
-    if(show_optimal_line):
-        plt.plot([x_start, x_end], [y_start, y_end], 'r--', linewidth=2, label='Optimal trace')
-
-        plt.plot(x_start, y_start, 'go', markersize=8, label='Start')
-        plt.plot(x_end, y_end, 'ro', markersize=8, label='End')
-
-  
-    if(show_info):
-        duration = stroke_data[ColumnNames.TIME_STAMP].iloc[-1] - stroke_data[ColumnNames.TIME_STAMP].iloc[0]
-        plt.xlabel('X (px)')
-        plt.ylabel('Y (px)')
-        plt.title(f'Trace {stroke_id} - Duration: {duration:.0f}ms - Points: {len(stroke_data)}')
-        plt.legend()
-        plt.grid(True, alpha=0.3)
-        plt.gca().invert_yaxis()
-    else:
-        plt.axis('off')
+    _draw_trace(plt.gca(), stroke_data, stroke_id, show_info, show_optimal_line, max_points)
 
     if plot_name:
         plt.savefig(plot_name, bbox_inches='tight', dpi=300)
@@ -124,88 +142,271 @@ def video_from_trace(df, user_id, outfile: str, width=640, height=480, fps=30, c
     video.release()
     print(f"Video generated for user {user_id}: {outfile}")
 
-def keyboard_heatmap(df, session_id=None):
+def _last_valid(valid: np.ndarray) -> np.ndarray:
+    """
+    Index of the last valid point up to every point, 0 (the first point) if there is none.
+    """
+    return np.maximum.accumulate(np.where(valid, np.arange(len(valid)), 0))
 
-    validate_dataframe_keyboard(df)
+def replay_frames(df, session_id, width=640, height=480, fps=30, speed=1.0, colored=False,
+                  max_points: int = MAX_REPLAY_POINTS):
+    """
+    Frames of the replay of a session in real time, see :py:func:`replay_session`.
 
-    if session_id is not None:
-        df = df[df[ColumnNames.SESSION_ID] == session_id]
+    Parameters:
+        df (pd.DataFrame): DataFrame containing the interaction data with 'x', 'y', 'eventType', 'timeStamp' and 'sessionId' columns.
+        session_id (str/int): Identifier of the session to replay.
+        width (int): Width of the frames.
+        height (int): Height of the frames.
+        fps (int): Frames per second of the replay.
+        speed (float): Speed-up factor, 2 replays the session twice as fast.
+        colored (bool): If True, applies a temperature gradient (green to red) to the trajectory line.
+        max_points (int): Sessions with more movement events are replayed with their movements downsampled to this
+                          many points with :py:func:`~pywib.lttb_indices`. None to draw every movement.
+    Yields:
+        np.ndarray: The BGR frames. The same array is yielded again while nothing happens, copy it to keep a frame.
+    """
+    if fps <= 0 or speed <= 0:
+        raise ValueError("'fps' and 'speed' must be positive.")
+    session = df[df[ColumnNames.SESSION_ID] == session_id].sort_values(ColumnNames.TIME_STAMP, kind='stable')
+    if session.empty:
+        raise ValueError(f"Session {session_id} has no events.")
+    xs = session[ColumnNames.X].to_numpy().astype(np.int32)
+    ys = session[ColumnNames.Y].to_numpy().astype(np.int32)
+    event_type = session[ColumnNames.EVENT_TYPE].to_numpy()
+    time_stamp = session[ColumnNames.TIME_STAMP].to_numpy(dtype=float)
 
-    # Only count keydown events
-    df = df[df[ColumnNames.EVENT_TYPE] == EventTypes.EVENT_KEY_DOWN]
+    previous_type = np.r_[-1, event_type[:-1]]
+    is_click = (event_type == EventTypes.EVENT_ON_CLICK) | ((previous_type == EventTypes.EVENT_ON_MOUSE_DOWN) & (event_type == EventTypes.EVENT_ON_MOUSE_UP))
+    is_key = (event_type == EventTypes.EVENT_KEY_DOWN) | (event_type == EventTypes.EVENT_KEY_UP)
+    is_scroll = event_type == EventTypes.EVENT_WINDOW_SCROLL
+    is_click[0] = is_key[0] = is_scroll[0] = False
 
-    # ---- Convert ASCII to character ----
-    df = df.copy()
+    is_move = (event_type == EventTypes.EVENT_ON_MOUSE_MOVE) | (event_type == EventTypes.EVENT_ON_TOUCH_MOVE)
+    moves = np.flatnonzero(is_move)
+    if max_points is not None and len(moves) > max_points:
+        # Every other event is kept, the markers are found before dropping movements so no click appears or vanishes
+        keep = ~is_move
+        keep[moves[lttb_indices(xs[moves], ys[moves], max_points)]] = True
+        xs, ys, time_stamp = xs[keep], ys[keep], time_stamp[keep]
+        is_click, is_key, is_scroll = is_click[keep], is_key[keep], is_scroll[keep]
+    n = len(xs)
 
-    # Drop null / invalid ascii
-    df = df[df[ColumnNames.KEY_CODE_EVENT].notna()]
+    # Frame of every event, from its time since the start of the session
+    frame_of_event = np.floor((time_stamp - time_stamp[0]) * fps / (1000.0 * speed)).astype(np.int64)
+    num_frames = int(frame_of_event[-1]) + 1
+    bounds = np.searchsorted(frame_of_event, np.arange(num_frames + 1), side='left')
 
-    if df.empty:
-        # TODO warn?
-        return
+    # Same drawing rules as video_from_trace: lines between points inside the screen, from the last valid point
+    valid = (xs > 0) & (ys > 0) & (xs <= width) & (ys <= height)
+    last_valid = _last_valid(valid)
+    start = np.r_[0, last_valid[:-1]]
+    draw_line = valid & (xs[start] > 0) & (ys[start] > 0)
+    draw_line[0] = False
 
-    # Convert ASCII integer → character
-    df["char"] = df[ColumnNames.KEY_CODE_EVENT].astype(int).apply(chr)
+    frame = np.ones((height, width, 3), dtype=np.uint8) * 255  # white background
+    for index in range(num_frames):
+        first, last = bounds[index], bounds[index + 1]
+        if last > first:
+            if colored:
+                progress = (last - 1) / (n - 1) if n > 1 else 1.0
+                line_color = (0, int(255 * (1 - progress)), int(255 * progress))  # BGR format
+            else:
+                line_color = (0, 0, 255)
+            # All the segments of the frame are drawn in a single call
+            lines = np.flatnonzero(draw_line[first:last]) + first
+            if len(lines) > 0:
+                segments = np.stack([np.stack([xs[start[lines]], ys[start[lines]]], axis=1),
+                                     np.stack([xs[lines], ys[lines]], axis=1)], axis=1)
+                cv2.polylines(frame, list(segments), False, line_color, 2)
+            for i in np.flatnonzero(is_click[first:last] | is_key[first:last] | is_scroll[first:last]) + first:
+                px, py = int(xs[last_valid[i]]), int(ys[last_valid[i]])
+                if is_click[i]:
+                    cv2.circle(frame, (px, py), radius=5, color=(0, 0, 255), thickness=-1)
+                elif is_key[i]:
+                    cv2.rectangle(frame, (px - 5, py - 5), (px + 5, py + 5), color=(255, 0, 0), thickness=-1)
+                else:
+                    pts = np.array([(px, py - 5), (px - 5, py + 5), (px + 5, py + 5)], np.int32)
+                    cv2.polylines(frame, [pts], True, (255, 0, 0), 2)
+        yield frame
 
-    # Normalize to lowercase (so A and a merge)
-    df["char"] = df["char"].apply(str.lower)
+def replay_session(df, session_id, outfile: str, width=640, height=480, fps=30, speed=1.0, colored=False,
+                   max_points: int = MAX_REPLAY_POINTS) -> int:
+    """
+    Generates a video replaying the interactions of a session at their real timing.
 
-    key_counts = df["char"].value_counts()
+    Every event is placed in the frame of its timeStamp and all the events of a frame are drawn at once, so the video
+    lasts the duration of the session divided by `speed` and the cost depends on that duration and `fps` instead of
+    the number of events.
 
-    # ---- FULL STANDARD QWERTY LAYOUT (ANSI) ----
-    layout = [
-        ["`", "1", "2", "3", "4", "5", "6", "7", "8", "9", "0", "-", "="],
-        ["q", "w", "e", "r", "t", "y", "u", "i", "o", "p", "[", "]"],
-        ["a", "s", "d", "f", "g", "h", "j", "k", "l", ";", "'"],
-        ["z", "x", "c", "v", "b", "n", "m", ",", ".", "/"],
-        ["space"]
-    ]
+    Parameters:
+        df (pd.DataFrame): DataFrame containing the interaction data with 'x', 'y', 'eventType', 'timeStamp' and 'sessionId' columns.
+        session_id (str/int): Identifier of the session to replay.
+        outfile (str): Path to save the output video file.
+        width (int): Width of the video frame.
+        height (int): Height of the video frame.
+        fps (int): Frames per second for the video.
+        speed (float): Speed-up factor, 2 replays the session twice as fast.
+        colored (bool): If True, applies a temperature gradient (green to red) to the trajectory line.
+        max_points (int): Sessions with more movement events are replayed with their movements downsampled to this
+                          many points. None to draw every movement.
+    Returns:
+        int: Number of frames written.
+    """
+    fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+    video = cv2.VideoWriter(outfile, fourcc, fps, (width, height))
+    num_frames = 0
+    try:
+        for frame in replay_frames(df, session_id, width, height, fps, speed, colored, max_points):
+            video.write(frame)
+            num_frames += 1
+    finally:
+        video.release()
+    return num_frames
 
-    # Determine max width for consistent matrix
-    max_cols = max(len(row) for row in layout)
+# Full standard QWERTY layout (ANSI)
+KEYBOARD_LAYOUT = [
+    ["`", "1", "2", "3", "4", "5", "6", "7", "8", "9", "0", "-", "="],
+    ["q", "w", "e", "r", "t", "y", "u", "i", "o", "p", "[", "]"],
+    ["a", "s", "d", "f", "g", "h", "j", "k", "l", ";", "'"],
+    ["z", "x", "c", "v", "b", "n", "m", ",", ".", "/"],
+    ["space"]
+]
 
-    heatmap_data = []
-    annotations = []
+_KEYBOARD_SHAPE = (len(KEYBOARD_LAYOUT), max(len(row) for row in KEYBOARD_LAYOUT))
 
-    
-    for row in layout:
-        data_row = []
-        label_row = []
-
-        for key in row:
-            if key == "space":
-                count = key_counts.get(" ", 0)
-                label = "Space"
-            else:
-                count = key_counts.get(key, 0)
-                label = key.upper()
-            print(f"Count: {count}, Label: {label}, key: {key}")
-            data_row.append(count)
-            label_row.append(f"{label}\n{count}")
+def _key_cells() -> np.ndarray:
+    """
+    Cell of the layout (row * columns + column) of every ASCII key code, -1 for the codes without a key.
+    Upper and lower case letters share their key.
+    """
+    cells = np.full(128, -1, dtype=np.int64)
+    for row, keys in enumerate(KEYBOARD_LAYOUT):
+        for column, key in enumerate(keys):
+            char = " " if key == "space" else key
+            cell = row * _KEYBOARD_SHAPE[1] + column
+            cells[ord(char)] = cell
+            cells[ord(char.upper())] = cell
+    return cells
 
-        while len(data_row) < max_cols:
-            data_row.append(np.nan)
-            label_row.append("")
+_KEY_CELLS = _key_cells()
 
-        heatmap_data.append(data_row)
-        annotations.append(label_row)
+# Cells past the end of the shorter rows are not keys
+_IS_KEY = np.isin(np.arange(_KEYBOARD_SHAPE[0] * _KEYBOARD_SHAPE[1]), _KEY_CELLS).reshape(_KEYBOARD_SHAPE)
 
-    heatmap_data = np.array(heatmap_data)
+def _file_name(*parts) -> str:
+    """
+    File name made of the given parts, without characters that are not safe in paths.
+    """
+    return re.sub(r"[^A-Za-z0-9._-]", "_", "_".join(str(part) for part in parts))
 
-    plt.figure(figsize=(18, 6))
+def keyboard_counts(df, sessions: list = None) -> dict:
+    """
+    Count the key down events of every key of the QWERTY layout, for many sessions at once.
+
+    Parameters:
+        df (pd.DataFrame): DataFrame containing keyboard data with 'sessionId', 'eventType' and 'keyCodeEvent' columns.
+        sessions (list): Only count these sessionIds. By default all the sessions with key down events.
+    Returns:
+        dict: A dictionary with sessionIds as keys and the counts as values, with the shape of :py:data:`KEYBOARD_LAYOUT`
+              (NaN where a row has no key).
+    """
+    validate_dataframe_keyboard(df)
+    df = df[df[ColumnNames.EVENT_TYPE] == EventTypes.EVENT_KEY_DOWN]
+    if sessions is not None:
+        df = df[df[ColumnNames.SESSION_ID].isin(list(sessions))]
+    codes = pd.to_numeric(df[ColumnNames.KEY_CODE_EVENT], errors='coerce').to_numpy(dtype=float)
+    session_codes, session_ids = pd.factorize(df[ColumnNames.SESSION_ID])
+    known = np.isfinite(codes) & (codes >= 0) & (codes < len(_KEY_CELLS)) & (session_codes >= 0)
+    cells = np.full(len(codes), -1, dtype=np.int64)
+    cells[known] = _KEY_CELLS[codes[known].astype(np.int64)]
+    known &= cells >= 0
+
+    num_cells = _KEYBOARD_SHAPE[0] * _KEYBOARD_SHAPE[1]
+    counts = np.bincount(session_codes[known] * num_cells + cells[known], minlength=len(session_ids) * num_cells)
+    counts = counts.reshape(len(session_ids), *_KEYBOARD_SHAPE).astype(float)
+    counts[:, ~_IS_KEY] = np.nan
+    return dict(zip(session_ids, counts))
+
+def _draw_keyboard(ax, counts: np.ndarray, title: str):
+    annotations = np.full(_KEYBOARD_SHAPE, "", dtype=object)
+    for row, keys in enumerate(KEYBOARD_LAYOUT):
+        for column, key in enumerate(keys):
+            label = "Space" if key == "space" else key.upper()
+            annotations[row, column] = f"{label}\n{int(counts[row, column])}"
     sns.heatmap(
-        heatmap_data,
-        annot=np.array(annotations),
+        counts,
+        annot=annotations,
         fmt="",
         cmap="Reds",
         linewidths=0.5,
         vmin=0,
         linecolor="gray",
-        cbar=True
+        cbar=True,
+        ax=ax
     )
-    
-    plt.title("Keyboard Usage Heatmap (ASCII / keyCodeEvent)")
-    plt.xticks([])
-    plt.yticks([])
-    plt.show()
-        
\ No newline at end of file
+    ax.set_title(title)
+    ax.set_xticks([])
+    ax.set_yticks([])
+
+def keyboard_heatmap(df, session_id=None, ax=None, outfile: str = None, show: bool = True):
+    """
+    Draws the number of key down events of every key of the QWERTY layout.
+
+    Parameters:
+        df (pd.DataFrame): DataFrame containing keyboard data with 'sessionId', 'eventType' and 'keyCodeEvent' columns.
+        session_id (str/int): Only count the keys of this session. By default all the sessions.
+        ax (matplotlib.axes.Axes): Axes to draw on. By default a new figure is created.
+        outfile (str): If provided, saves the figure to this file path.
+        show (bool): Whether to display the figure with pyplot. If False, it is drawn headlessly.
+    Returns:
+        Figure | None: The figure of the heatmap, None if there are no key down events.
+    """
+    validate_dataframe_keyboard(df)
+
+    if session_id is not None:
+        df = df[df[ColumnNames.SESSION_ID] == session_id]
+    counts = keyboard_counts(df.assign(**{ColumnNames.SESSION_ID: 0}))
+    if not counts:
+        return None
+
+    if ax is not None:
+        figure = ax.figure
+    elif show:
+        figure = plt.figure(figsize=(18, 6))
+        ax = figure.add_subplot()
+    else:
+        figure = Figure(figsize=(18, 6))
+        FigureCanvasAgg(figure)
+        ax = figure.add_subplot()
+    _draw_keyboard(ax, counts[0], "Keyboard Usage Heatmap (ASCII / keyCodeEvent)")
+
+    if outfile:
+        figure.savefig(outfile, bbox_inches='tight')
+    if show:
+        plt.show()
+    return figure
+
+def keyboard_heatmaps(df, directory: str, sessions: list = None, fmt: str = "png", dpi: int = 100) -> list[str]:
+    """
+    Save the keyboard heatmap of every session headlessly, without pyplot.
+
+    Parameters:
+        df (pd.DataFrame): DataFrame containing keyboard data with 'sessionId', 'eventType' and 'keyCodeEvent' columns.
+        directory (str): Output directory, created if it does not exist. Files are named '<sessionId>.<fmt>'.
+        sessions (list): Only draw these sessionIds. By default all the sessions with key down events.
+        fmt (str): Image format supported by matplotlib.
+        dpi (int): Resolution of the images.
+    Returns:
+        list[str]: The paths of the saved images.
+    """
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for session_id, counts in keyboard_counts(df, sessions).items():
+        figure = Figure(figsize=(18, 6))
+        FigureCanvasAgg(figure)
+        _draw_keyboard(figure.add_subplot(), counts, f"Keyboard Usage Heatmap - {session_id}")
+        path = os.path.join(directory, f"{_file_name(session_id)}.{fmt}")
+        figure.savefig(path, bbox_inches='tight', dpi=dpi)
+        paths.append(path)
+    return paths
@@ -0,0 +1,141 @@
+"""
+Time windows within sessions, sliced from an index built once per dataset.
+"""
+
+import functools
+import inspect
+
+import numpy as np
+import pandas as pd
+
+from ..constants import ColumnNames
+from .validation import validate_dataframe
+
+
+class SessionIndex:
+    """
+    Events sorted by sessionId and timeStamp, with the offsets of every session in them.
+
+    Slicing a time window of a session is two binary searches over the timestamps of that session, instead of a
+    boolean mask over the whole DataFrame per window.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        """
+        Parameters:
+            df (pd.DataFrame): DataFrame containing the interaction events of one or more sessions.
+        """
+        validate_dataframe(df)
+        time_stamp = pd.to_numeric(df[ColumnNames.TIME_STAMP], errors='coerce').to_numpy(dtype=float)
+        codes, sessions = pd.factorize(df[ColumnNames.SESSION_ID], sort=True)
+        # lexsort is stable, events with the same timeStamp keep the order of the log
+        order = np.lexsort((time_stamp, codes))
+        order = order[codes[order] >= 0]
+
+        self.frame = df.iloc[order].reset_index(drop=True)
+        self.frame[ColumnNames.TIME_STAMP] = time_stamp[order]
+        self._time_stamp = time_stamp[order]
+        offsets = np.searchsorted(codes[order], np.arange(len(sessions) + 1))
+        self._offsets = {session_id: (int(offsets[i]), int(offsets[i + 1])) for i, session_id in enumerate(sessions)}
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def __contains__(self, session_id) -> bool:
+        return session_id in self._offsets
+
+    @property
+    def sessions(self) -> list:
+        return list(self._offsets)
+
+    def bounds(self, session_id, t_start: float = None, t_end: float = None) -> tuple[int, int]:
+        """
+        Rows of the events of a session in the window `t_start <= timeStamp < t_end`.
+
+        Parameters:
+            session_id: The sessionId.
+            t_start (float): Start of the window, included. None for the start of the session.
+            t_end (float): End of the window, excluded. None for the end of the session.
+        Returns:
+            tuple[int, int]: The first and past-the-end rows in :py:attr:`frame`.
+        """
+        if session_id not in self._offsets:
+            raise KeyError(f"Session {session_id} is not in the index.")
+        start, end = self._offsets[session_id]
+        time_stamp = self._time_stamp[start:end]
+        first = start + (0 if t_start is None else int(np.searchsorted(time_stamp, t_start, side='left')))
+        last = start + (len(time_stamp) if t_end is None else int(np.searchsorted(time_stamp, t_end, side='left')))
+        return first, max(first, last)
+
+    def slice(self, session_id, t_start: float = None, t_end: float = None) -> pd.DataFrame:
+        """
+        Events of a session in the window `t_start <= timeStamp < t_end`.
+
+        Parameters:
+            session_id: The sessionId.
+            t_start (float): Start of the window, included. None for the start of the session.
+            t_end (float): End of the window, excluded. None for the end of the session.
+        Returns:
+            pd.DataFrame: The events of the window, sorted by timeStamp.
+        """
+        first, last = self.bounds(session_id, t_start, t_end)
+        return self.frame.iloc[first:last]
+
+    def iter_windows(self, windows: list[tuple]):
+        """
+        Events of several windows.
+
+        Parameters:
+            windows (list[tuple]): Windows as (sessionId, t_start, t_end) tuples.
+        Yields:
+            tuple: The window and a DataFrame with its events.
+        """
+        for window in windows:
+            window = tuple(window)
+            if len(window) != 3:
+                raise ValueError(f"Windows must be (sessionId, t_start, t_end) tuples, got {window}.")
+            yield window, self.slice(*window)
+
+
+def windowed(metric):
+    """
+    Add a `windows` keyword argument to a metric that takes the events as its first argument.
+
+    When `windows` are given as a list of (sessionId, t_start, t_end) tuples, the metric is computed over the events of
+    every window and a dictionary from window to the result of its session is returned. The events can be passed as a
+    :py:class:`SessionIndex` to slice the windows of several metrics from the same index.
+    """
+    signature = inspect.signature(metric)
+
+    def precomputed(df, args, kwargs) -> list[str]:
+        # Pre-extracted traces and precomputed results (computed_*) cover the whole sessions, not the windows. They
+        # can be passed by keyword or by position, as in path(df, traces, windows=...)
+        try:
+            arguments = signature.bind_partial(df, *args, **kwargs).arguments
+        except TypeError:
+            arguments = kwargs
+        return [name for name, value in arguments.items()
+                if (name == "traces" or name.startswith("computed_")) and value is not None]
+
+    @functools.wraps(metric)
+    def wrapper(df=None, *args, windows: list[tuple] = None, **kwargs):
+        if windows is None:
+            if isinstance(df, SessionIndex):
+                df = df.frame
+            return metric(df, *args, **kwargs)
+        if df is None:
+            raise ValueError("Windows are sliced from the events, 'df' must be provided.")
+        names = precomputed(df, args, kwargs)
+        if names:
+            raise ValueError(f"Windows cannot be combined with pre-extracted traces or precomputed results: {', '.join(names)}.")
+
+        index = df if isinstance(df, SessionIndex) else SessionIndex(df)
+        results = {}
+        for window, events in index.iter_windows(windows):
+            if events.empty:
+                results[window] = None
+                continue
+            result = metric(events, *args, **kwargs)
+            results[window] = result.get(window[0]) if isinstance(result, dict) else result
+        return results
+    return wrapper
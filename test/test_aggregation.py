@@ -0,0 +1,92 @@
+import unittest
+import sys
+import os
+import numpy as np
+sys.path.insert(0, os.path.dirname(__file__))
+from utils import process_csv, import_pyModule
+
+import_pyModule()
+
+from pywib import (MetricState, merge_states, finalize_states, extract_traces_by_session, velocity,
+                   velocity_metrics, pauses_metrics, deviations, click_slip, typing_speed_metrics, ColumnNames)
+from pywib.utils.segmentation import extract_keystroke_traces_by_session
+
+DEBUG = True
+
+class TestData:
+    if(DEBUG):
+        dataFile = 'test/test_data/test_window_resize_error.csv'
+        mouseFile = 'test/test_data/test_mouse.csv'
+        keyboardFile = 'test/test_data/test_mouse_keyboard.csv'
+    else:
+        dataFile = 'pywib/test/test_data/test_window_resize_error.csv'
+        mouseFile = 'pywib/test/test_data/test_mouse.csv'
+        keyboardFile = 'pywib/test/test_data/test_mouse_keyboard.csv'
+
+
+def _split_traces(traces):
+    """Splits the traces of every session in two shards."""
+    first, second = {}, {}
+    for session_id, session_traces in traces.items():
+        half = len(session_traces) // 2
+        first[session_id] = session_traces[:half]
+        second[session_id] = session_traces[half:]
+    return first, second
+
+
+class TestAggregation(unittest.TestCase):
+
+    def setUp(self):
+        self.test_data = process_csv(TestData.dataFile)
+        self.test_mouse = process_csv(TestData.mouseFile)
+        self.test_keyboard = process_csv(TestData.keyboardFile)
+
+    def assert_metrics_equal(self, expected, result):
+        self.assertEqual(set(expected.keys()), set(result.keys()))
+        for session_id, metrics in expected.items():
+            self.assertEqual(set(metrics.keys()), set(result[session_id].keys()))
+            for name, value in metrics.items():
+                np.testing.assert_allclose(np.asarray(result[session_id][name], dtype=float),
+                                           np.asarray(value, dtype=float), rtol=1e-12)
+
+    def test_metric_state_merge(self):
+        values = np.array([3.0, 1.0, 4.0, 1.0, 5.0, 9.0])
+        state = MetricState.from_values(values[:2]).merge(MetricState.from_values(values[2:]))
+        self.assertEqual(state.count, 6)
+        self.assertAlmostEqual(state.mean, values.mean())
+        self.assertAlmostEqual(state.variance, values.var())
+        self.assertEqual(state.finalize(), {'mean': values.mean(), 'max': 9.0, 'min': 1.0})
+
+    def test_empty_metric_state(self):
+        self.assertTrue(np.isnan(MetricState().finalize()['mean']))
+
+    def test_velocity_metrics_shards(self):
+        traces = velocity(self.test_data.copy(), per_traces=True)
+        first, second = _split_traces(traces)
+        merged = merge_states(velocity_metrics(None, first, as_state=True), velocity_metrics(None, second, as_state=True))
+        self.assert_metrics_equal(velocity_metrics(None, traces), finalize_states(merged))
+
+    def test_pauses_and_deviations_shards(self):
+        traces = extract_traces_by_session(self.test_data.copy())
+        first, second = _split_traces(traces)
+        merged = merge_states(pauses_metrics(None, traces=first, as_state=True), pauses_metrics(None, traces=second, as_state=True))
+        self.assert_metrics_equal(pauses_metrics(None, traces=traces), finalize_states(merged))
+        merged = merge_states(deviations(None, first, as_state=True), deviations(None, second, as_state=True))
+        self.assert_metrics_equal(deviations(None, traces), finalize_states(merged))
+
+    def test_click_slip_shards(self):
+        # Split between the two clicks of every session
+        split = self.test_mouse[self.test_mouse[ColumnNames.EVENT_TYPE] == 1][ColumnNames.TIME_STAMP].min()
+        first = self.test_mouse[self.test_mouse[ColumnNames.TIME_STAMP] <= split]
+        second = self.test_mouse[self.test_mouse[ColumnNames.TIME_STAMP] > split]
+        merged = merge_states(click_slip(first, as_state=True), click_slip(second, as_state=True))
+        self.assert_metrics_equal(click_slip(self.test_mouse), finalize_states(merged))
+
+    def test_typing_speed_metrics_shards(self):
+        traces = extract_keystroke_traces_by_session(self.test_keyboard)
+        first, second = _split_traces(traces)
+        merged = merge_states(typing_speed_metrics(None, first, as_state=True), typing_speed_metrics(None, second, as_state=True))
+        self.assert_metrics_equal(typing_speed_metrics(None, traces), finalize_states(merged))
+
+if __name__ == '__main__':
+    unittest.main()
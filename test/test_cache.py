@@ -0,0 +1,87 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+sys.path.insert(0, os.path.dirname(__file__))
+from utils import process_csv, import_pyModule
+
+import_pyModule()
+
+from pywib import DiskCache, auc, deviations, extract_traces_by_session
+
+DEBUG = True
+
+class TestData:
+    if(DEBUG):
+        dataFile = 'test/test_data/test_auc.csv'
+    else:
+        dataFile = 'pywib/test/test_data/test_auc.csv'
+
+
+class TestDiskCache(unittest.TestCase):
+
+    def setUp(self):
+        self.test_data = process_csv(TestData.dataFile)
+        self.num_traces = sum(len(traces) for traces in extract_traces_by_session(self.test_data).values())
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'cache.sqlite')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_auc_is_memoized(self):
+        cache = DiskCache(self.path)
+        expected = auc(self.test_data.copy())
+        self.assertEqual(auc(self.test_data.copy(), cache=cache), expected)
+        self.assertEqual(cache.stats()['misses'], self.num_traces)
+        self.assertEqual(auc(self.test_data.copy(), cache=cache), expected)
+        self.assertEqual(cache.stats()['hits'], self.num_traces)
+
+        # Other parameters are other entries
+        auc(self.test_data.copy(), cache=cache, n_points=50)
+        self.assertEqual(cache.stats()['entries'], 2 * self.num_traces)
+
+    def test_persistence(self):
+        cache = DiskCache(self.path)
+        expected = deviations(self.test_data.copy(), cache=cache)
+        cache.close()
+        reopened = DiskCache(self.path)
+        self.assertEqual(deviations(self.test_data.copy(), cache=reopened), expected)
+        self.assertEqual(reopened.stats()['misses'], 0)
+
+    def test_size_bounded_eviction(self):
+        cache = DiskCache(self.path, max_size=300)
+        for i in range(10):
+            cache.set(str(i), b'0' * 100)
+        stats = cache.stats()
+        self.assertLessEqual(stats['size'], 300)
+        self.assertGreater(stats['evictions'], 0)
+        self.assertIn('9', cache)
+        self.assertNotIn('0', cache)
+
+    def test_running_size(self):
+        cache = DiskCache(self.path, max_size=1000)
+        stored_size = lambda: cache._connection.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        for i in range(5):
+            cache.set(str(i), b'0' * 100)
+        # Replacing a value counts only its new size
+        cache.set('0', b'0' * 10)
+        self.assertEqual(cache.stats()['size'], stored_size())
+        cache.clear()
+        self.assertEqual(cache.stats()['size'], 0)
+
+        # Values stored by another process count towards the limit
+        other = DiskCache(self.path, max_size=1000)
+        for i in range(8):
+            other.set(f'other{i}', b'0' * 100)
+        for i in range(3):
+            cache.set(str(i), b'0' * 100)
+        self.assertLessEqual(stored_size(), 1000)
+        self.assertEqual(cache.stats()['size'], stored_size())
+        self.assertIn('2', cache)
+        self.assertNotIn('other0', cache)
+
+
+if __name__ == '__main__':
+    unittest.main()
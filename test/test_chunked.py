@@ -0,0 +1,69 @@
+import unittest
+import sys
+import os
+import numpy as np
+sys.path.insert(0, os.path.dirname(__file__))
+from utils import process_csv, import_pyModule
+
+import_pyModule()
+
+from pywib import (chunked_metrics, ChunkedAggregator, velocity_metrics, acceleration_metrics, jerkiness_metrics,
+                   pauses_metrics, movement_time, execution_time, number_of_clicks, click_slip)
+
+DEBUG = True
+
+class TestData:
+    if(DEBUG):
+        dataFile = 'test/test_data/test_window_resize_error.csv'
+        pausesFile = 'test/test_data/pauses.csv'
+    else:
+        dataFile = 'pywib/test/test_data/test_window_resize_error.csv'
+        pausesFile = 'pywib/test/test_data/pauses.csv'
+
+
+def _chunks(df, size):
+    return [df.iloc[i:i + size] for i in range(0, len(df), size)]
+
+
+class TestChunked(unittest.TestCase):
+
+    def setUp(self):
+        self.test_data = process_csv(TestData.dataFile)
+        self.test_pauses = process_csv(TestData.pausesFile)
+
+    def assert_metrics_equal(self, expected, result):
+        self.assertEqual(set(expected.keys()), set(result.keys()))
+        for session_id, metrics in expected.items():
+            for name, value in metrics.items():
+                np.testing.assert_allclose(np.asarray(result[session_id][name], dtype=float),
+                                           np.asarray(value, dtype=float), rtol=1e-9)
+
+    def test_kinematic_metrics_match_in_memory(self):
+        for size in (1, 3, 7, len(self.test_data)):
+            result = chunked_metrics(_chunks(self.test_data, size))
+            self.assert_metrics_equal(velocity_metrics(self.test_data.copy()), result['velocity_metrics'])
+            self.assert_metrics_equal(acceleration_metrics(self.test_data.copy()), result['acceleration_metrics'])
+            self.assert_metrics_equal(jerkiness_metrics(self.test_data.copy()), result['jerkiness_metrics'])
+
+    def test_timing_metrics_match_in_memory(self):
+        for df in (self.test_data, self.test_pauses):
+            result = chunked_metrics(_chunks(df, 4))
+            self.assert_metrics_equal(pauses_metrics(df.copy()), result['pauses_metrics'])
+            self.assertEqual(movement_time(df.copy()), result['movement_time'])
+            self.assertEqual(execution_time(df.copy()), result['execution_time'])
+            self.assertEqual(number_of_clicks(df.copy()), result['number_of_clicks'])
+            self.assert_metrics_equal(click_slip(df.copy()), result['click_slip'])
+
+    def test_csv_source_with_memory_budget(self):
+        result = chunked_metrics(TestData.dataFile, metrics=['velocity_metrics'], memory_budget=2048)
+        self.assert_metrics_equal(velocity_metrics(self.test_data.copy()), result['velocity_metrics'])
+
+    def test_unordered_chunks_raise(self):
+        chunks = _chunks(self.test_data, 10)
+        aggregator = ChunkedAggregator()
+        aggregator.update(chunks[1])
+        with self.assertRaises(ValueError):
+            aggregator.update(chunks[0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+from unittest import mock
+import pandas as pd
+sys.path.insert(0, os.path.dirname(__file__))
+from utils import process_csv, import_pyModule
+
+import_pyModule()
+
+from pywib import cli
+from pywib.features import session_features
+
+DEBUG = True
+
+class TestData:
+    if(DEBUG):
+        dataFile = 'test/test_data/test_window_resize_error.csv'
+    else:
+        dataFile = 'pywib/test/test_data/test_window_resize_error.csv'
+
+    metrics = ['velocity_metrics', 'pauses_metrics', 'number_of_clicks']
+
+
+class TestCli(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.input = os.path.join(self.directory, 'logs', 'day_1.csv')
+        os.makedirs(os.path.dirname(self.input))
+        shutil.copy(TestData.dataFile, self.input)
+        self.expected = session_features(process_csv(TestData.dataFile), TestData.metrics)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def run_cli(self, output, *args):
+        pattern = os.path.join(self.directory, 'logs', '*.csv')
+        return cli.main([pattern, '-o', output, '-q', '-m', *TestData.metrics, *args])
+
+    def test_feature_table(self):
+        output = os.path.join(self.directory, 'features.csv')
+        self.assertEqual(self.run_cli(output, '--shards', '2', '-j', '2'), 0)
+        features = pd.read_csv(output, index_col='sessionId')
+        pd.testing.assert_frame_equal(features, self.expected, check_dtype=False)
+
+    def test_resume_from_checkpoint(self):
+        checkpoint = os.path.join(self.directory, 'checkpoint')
+        first = os.path.join(self.directory, 'first.parquet')
+        self.assertEqual(self.run_cli(first, '--shards', '2', '--checkpoint-dir', checkpoint), 0)
+        self.assertEqual(len(os.listdir(checkpoint)), 2)
+
+        # Every unit is restored, so nothing is computed again
+        second = os.path.join(self.directory, 'second.parquet')
+        with mock.patch.object(cli, '_process_unit', side_effect=AssertionError):
+            self.assertEqual(self.run_cli(second, '--shards', '2', '--checkpoint-dir', checkpoint), 0)
+        pd.testing.assert_frame_equal(pd.read_parquet(second), pd.read_parquet(first))
+
+    def test_sessions_in_several_files(self):
+        # The same sessions are split in two days of logs
+        events = pd.read_csv(TestData.dataFile)
+        half = len(events) // 2
+        os.remove(self.input)
+        events.iloc[:half].to_csv(os.path.join(self.directory, 'logs', 'day_1.csv'), index=False)
+        events.iloc[half:].to_csv(os.path.join(self.directory, 'logs', 'day_2.csv'), index=False)
+        self.assertTrue(set(events.iloc[:half]['sessionId']) & set(events.iloc[half:]['sessionId']))
+
+        output = os.path.join(self.directory, 'features.csv')
+        checkpoint = os.path.join(self.directory, 'checkpoint')
+        self.assertEqual(self.run_cli(output, '--shards', '2', '-j', '2', '--checkpoint-dir', checkpoint), 0)
+        features = pd.read_csv(output, index_col='sessionId')
+        self.assertFalse(features.index.has_duplicates)
+        pd.testing.assert_frame_equal(features, self.expected, check_dtype=False)
+
+        # The sessions found in several files are checkpointed units too
+        with mock.patch.object(cli, '_process_unit', side_effect=AssertionError), \
+                mock.patch.object(cli, '_process_sessions', side_effect=AssertionError):
+            self.assertEqual(self.run_cli(output, '--shards', '2', '--checkpoint-dir', checkpoint), 0)
+        pd.testing.assert_frame_equal(pd.read_csv(output, index_col='sessionId'), features)
+
+    def test_read_sessions_by_chunks(self):
+        sessions = [process_csv(TestData.dataFile)['sessionId'].iloc[0]]
+        with mock.patch.object(cli, '_CSV_CHUNK_ROWS', 7):
+            events = cli.read_events(self.input, TestData.metrics, sessions=sessions)
+        expected = cli.read_events(self.input, TestData.metrics)
+        expected = expected[expected['sessionId'].isin(sessions)].reset_index(drop=True)
+        pd.testing.assert_frame_equal(events, expected)
+
+    def test_no_inputs(self):
+        self.assertEqual(cli.main([os.path.join(self.directory, '*.parquet'), '-o', 'out.csv', '-q']), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+import sys
+import os
+import numpy as np
+import pandas as pd
+import cv2
+sys.path.insert(0, os.path.dirname(__file__))
+from utils import import_pyModule
+
+import_pyModule()
+
+from pywib import lttb_indices, downsample_trace, replay_frames
+from pywib.utils.visualization import _draw_trace
+from matplotlib.figure import Figure
+
+def _reference_lttb(x, y, num_points):
+    """
+    Textbook Largest-Triangle-Three-Buckets with floating bucket bounds.
+    """
+    n = len(x)
+    every = (n - 2) / (num_points - 2)
+    indices = [0]
+    previous = 0
+    for bucket in range(num_points - 2):
+        lo, hi = int(bucket * every) + 1, int((bucket + 1) * every) + 1
+        next_lo, next_hi = hi, min(int((bucket + 2) * every) + 1, n)
+        if bucket == num_points - 3:
+            next_lo, next_hi = n - 1, n
+        cx, cy = np.mean(x[next_lo:next_hi]), np.mean(y[next_lo:next_hi])
+        best, best_area = lo, -1.0
+        for i in range(lo, hi):
+            area = abs((x[previous] - cx) * (y[i] - y[previous]) - (x[previous] - x[i]) * (cy - y[previous]))
+            if area > best_area:
+                best, best_area = i, area
+        indices.append(best)
+        previous = best
+    indices.append(n - 1)
+    return np.array(indices)
+
+
+class TestDownsample(unittest.TestCase):
+
+    def test_same_as_reference(self):
+        rng = np.random.default_rng(3)
+        for n, num_points in ((1000, 50), (1234, 101), (500, 3)):
+            x = np.cumsum(rng.normal(0, 5, n))
+            y = np.cumsum(rng.normal(0, 5, n))
+            np.testing.assert_array_equal(lttb_indices(x, y, num_points), _reference_lttb(x, y, num_points))
+
+    def test_keeps_shape(self):
+        x = np.arange(10000, dtype=float)
+        y = np.zeros(10000)
+        y[4321] = 500
+        indices = lttb_indices(x, y, 100)
+        self.assertEqual(len(indices), 100)
+        self.assertEqual((indices[0], indices[-1]), (0, 9999))
+        self.assertIn(4321, indices)
+        np.testing.assert_array_equal(lttb_indices(x[:50], y[:50], 100), np.arange(50))
+        with self.assertRaises(ValueError):
+            lttb_indices(x, y, 2)
+
+    def test_downsample_trace(self):
+        trace = pd.DataFrame({'x': np.arange(5000.0), 'y': np.sin(np.arange(5000) / 100), 'timeStamp': np.arange(5000)})
+        self.assertIs(downsample_trace(trace, 5000), trace)
+        reduced = downsample_trace(trace, 300)
+        self.assertEqual(len(reduced), 300)
+        self.assertTrue(reduced.index.is_monotonic_increasing)
+
+        figure = Figure()
+        ax = figure.add_subplot()
+        _draw_trace(ax, trace, 'long', show_info=True, max_points=300)
+        self.assertEqual(len(ax.lines[0].get_xdata()), 300)
+        self.assertIn('Points: 5000', ax.get_title())
+
+    def test_replay_downsampled(self):
+        n = 5000
+        t = np.arange(n)
+        df = pd.DataFrame({'sessionId': 'S', 'eventType': 0, 'timeStamp': t * 2,
+                           'x': (20 + t * 0.1).astype(int), 'y': (240 + 200 * np.sin(t / 300)).astype(int)})
+        df.loc[2500, 'eventType'] = 1
+        full = [frame.copy() for frame in replay_frames(df, 'S', max_points=None)]
+        reduced = [frame.copy() for frame in replay_frames(df, 'S', max_points=200)]
+        self.assertEqual(len(full), len(reduced))
+        # Every drawn pixel is within 2 pixels of the drawing of all the points, and the other way around
+        full_mask = (full[-1] != 255).any(axis=2).astype(np.uint8)
+        reduced_mask = (reduced[-1] != 255).any(axis=2).astype(np.uint8)
+        kernel = np.ones((5, 5), np.uint8)
+        self.assertFalse((reduced_mask & ~cv2.dilate(full_mask, kernel).astype(bool)).any())
+        self.assertFalse((full_mask & ~cv2.dilate(reduced_mask, kernel).astype(bool)).any())
+        # The click is still drawn at its position
+        x, y = df.loc[2499, ['x', 'y']]
+        np.testing.assert_array_equal(reduced[-1][y, x], [0, 0, 255])
+
+if __name__ == '__main__':
+    unittest.main()
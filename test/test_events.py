@@ -0,0 +1,55 @@
+import unittest
+import sys
+import os
+import pandas as pd
+sys.path.insert(0, os.path.dirname(__file__))
+from utils import process_csv, import_pyModule
+
+import_pyModule()
+
+from pywib import event_counts, number_of_clicks, EventTypes
+
+DEBUG = True
+
+class TestData:
+    if(DEBUG):
+        dataFile = 'test/test_data/test_window_resize_error.csv'
+    else:
+        dataFile = 'pywib/test/test_data/test_window_resize_error.csv'
+
+
+class TestEventCounts(unittest.TestCase):
+
+    def setUp(self):
+        self.test_data = process_csv(TestData.dataFile)
+
+    def test_matches_groupby(self):
+        counts = event_counts(self.test_data)
+        expected = self.test_data.groupby(['sessionId', 'eventType']).size()
+        for (session_id, event_type), count in expected.items():
+            self.assertEqual(counts.loc[session_id, event_type], count)
+        self.assertEqual(counts.to_numpy().sum(), len(self.test_data))
+
+    def test_selected_event_types(self):
+        counts = event_counts(self.test_data, [EventTypes.EVENT_ON_WHEEL, EventTypes.EVENT_ON_CLICK])
+        self.assertEqual(list(counts.columns), [EventTypes.EVENT_ON_WHEEL, EventTypes.EVENT_ON_CLICK])
+        self.assertEqual(counts.loc['SESSION_A', EventTypes.EVENT_ON_WHEEL], 3)
+        self.assertEqual(counts.loc['SESSION_B', EventTypes.EVENT_ON_WHEEL], 0)
+        with self.assertRaises(ValueError):
+            event_counts(self.test_data, [EventTypes.EVENT_ON_CLICK, EventTypes.EVENT_ON_CLICK])
+
+    def test_number_of_clicks(self):
+        expected = {session_id: int((group['eventType'] == EventTypes.EVENT_ON_CLICK).sum())
+                    for session_id, group in self.test_data.groupby('sessionId')}
+        self.assertEqual(number_of_clicks(self.test_data), expected)
+
+    def test_unknown_event_types_are_ignored(self):
+        df = pd.DataFrame({'sessionId': ['a', 'a', 'b'], 'eventType': [1, 99, 1],
+                           'timeStamp': [0, 1, 2], 'x': [0, 0, 0], 'y': [0, 0, 0]})
+        counts = event_counts(df)
+        self.assertEqual(counts[EventTypes.EVENT_ON_CLICK].to_dict(), {'a': 1, 'b': 1})
+        self.assertEqual(counts.to_numpy().sum(), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import unittest
+import sys
+import os
+import numpy as np
+import pandas as pd
+sys.path.insert(0, os.path.dirname(__file__))
+from utils import process_csv, import_pyModule
+
+import_pyModule()
+
+from pywib import fitts_traces, fitts_metrics
+from pywib.utils import extract_mouse_click_traces_by_session
+
+DEBUG = True
+
+class TestData:
+    if(DEBUG):
+        dataFile = 'test/test_data/test_mouse.csv'
+    else:
+        dataFile = 'pywib/test/test_data/test_mouse.csv'
+
+
+def _pointing_task(num_sessions=3, num_clicks=60, seed=0):
+    """
+    Sessions of movements from random points to one of four targets, with noisy endpoints, each followed by a click.
+    """
+    rng = np.random.default_rng(seed)
+    rows = []
+    for session in range(num_sessions):
+        t = session * 10 ** 6
+        for _ in range(num_clicks):
+            element = int(rng.integers(0, 4))
+            target_x, target_y = 200 + 150 * element, 300
+            start_x, start_y = rng.integers(0, 900), rng.integers(0, 600)
+            for step in range(6):
+                fraction = step / 5
+                x = start_x + (target_x - start_x) * fraction + (rng.normal(0, 5) if step == 5 else 0)
+                rows.append((f'S{session}', 0, t, int(x), int(start_y + (target_y - start_y) * fraction), -1))
+                t += 20
+            rows.append((f'S{session}', 1, t, rows[-1][3], rows[-1][4], f'e{element}'))
+            t += 500
+    return pd.DataFrame(rows, columns=['sessionId', 'eventType', 'timeStamp', 'x', 'y', 'elementId'])
+
+
+class TestFitts(unittest.TestCase):
+
+    def setUp(self):
+        self.df = _pointing_task()
+        self.widths = {'e0': 40, 'e1': 60, 'e2': 80}
+
+    def test_same_as_per_trace(self):
+        result = fitts_traces(self.df, self.widths)
+        rows = []
+        for session_id, session_traces in extract_mouse_click_traces_by_session(self.df).items():
+            for trace in session_traces:
+                click = self.df.loc[trace.index[-1] + 1]
+                rows.append((session_id, click['elementId'], trace['x'].iloc[0], trace['y'].iloc[0], trace['x'].iloc[-1],
+                             trace['y'].iloc[-1], trace['timeStamp'].iloc[-1] - trace['timeStamp'].iloc[0]))
+        expected = pd.DataFrame(rows, columns=['sessionId', 'elementId', 'sx', 'sy', 'ex', 'ey', 'mt'])
+        self.assertEqual(list(result['elementId']), list(expected['elementId']))
+        np.testing.assert_allclose(result['movement_time'], expected['mt'])
+
+        for (session_id, element), group in expected.groupby(['sessionId', 'elementId']):
+            center_x, center_y = group['ex'].mean(), group['ey'].mean()
+            ax, ay = center_x - group['sx'], center_y - group['sy']
+            deviation = ((group['ex'] - center_x) * ax + (group['ey'] - center_y) * ay) / np.hypot(ax, ay)
+            selected = result[(result['sessionId'] == session_id) & (result['elementId'] == element)]
+            np.testing.assert_allclose(selected['effective_width'], 4.133 * deviation.std(ddof=1))
+            distance = np.hypot(group['ex'] - group['sx'], group['ey'] - group['sy']).to_numpy()
+            width = self.widths.get(element, np.nan)
+            np.testing.assert_allclose(selected['index_of_difficulty'], np.log2(distance / width + 1))
+            np.testing.assert_allclose(selected['throughput'],
+                                       selected['effective_index_of_difficulty'] / (group['mt'].to_numpy() / 1000))
+
+    def test_width_tables(self):
+        table = pd.DataFrame({'elementId': list(self.widths), 'width': list(self.widths.values())})
+        pd.testing.assert_frame_equal(fitts_traces(self.df, table), fitts_traces(self.df, pd.Series(self.widths)))
+        with self.assertRaises(ValueError):
+            fitts_traces(self.df, pd.DataFrame({'elementId': ['e0'], 'size': [10]}))
+        with self.assertRaises(ValueError):
+            fitts_traces(process_csv(TestData.dataFile))
+
+    def test_pooled_spread(self):
+        pooled = fitts_traces(self.df, by_session=False)
+        for element, group in pooled.groupby('elementId'):
+            self.assertEqual(group['effective_width'].nunique(), 1)
+        self.assertTrue(pooled['index_of_difficulty'].isna().all())
+
+    def test_session_metrics(self):
+        result = fitts_traces(self.df, self.widths)
+        metrics = fitts_metrics(self.df, self.widths)
+        self.assertEqual(metrics, fitts_metrics(computed_fitts=result))
+        for session_id, session_metrics in metrics.items():
+            session = result[result['sessionId'] == session_id]
+            self.assertEqual(session_metrics['traces'], len(session))
+            self.assertAlmostEqual(session_metrics['throughput'], session['throughput'].mean())
+            self.assertAlmostEqual(session_metrics['index_of_difficulty'], session['index_of_difficulty'].mean())
+
+
+    def test_without_moves(self):
+        clicks = self.df[self.df['eventType'] != 0].reset_index(drop=True)
+        self.assertTrue(fitts_traces(clicks).empty)
+        self.assertEqual(fitts_metrics(clicks), {})
+
+
+    def test_window_without_moves(self):
+        # The first click of S0 comes after six moves 20 ms apart
+        clicks, session = ('S0', 120, 121), ('S0', None, None)
+        results = fitts_metrics(self.df, self.widths, windows=[clicks, session])
+        self.assertIsNone(results[clicks])
+        self.assertEqual(results[session], fitts_metrics(self.df, self.widths)['S0'])
+
+    def test_windows_with_precomputed_fitts(self):
+        # The precomputed table covers the whole sessions, not the windows
+        with self.assertRaises(ValueError):
+            fitts_metrics(self.df, windows=[('S0', 0, 5000)], computed_fitts=fitts_traces(self.df, self.widths))
+
+
+if __name__ == '__main__':
+    unittest.main()
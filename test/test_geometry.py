@@ -0,0 +1,120 @@
+import unittest
+import sys
+import os
+import numpy as np
+import pandas as pd
+sys.path.insert(0, os.path.dirname(__file__))
+from utils import process_csv, import_pyModule
+
+import_pyModule()
+
+from pywib import trajectory_geometry, geometry_metrics, extract_traces_by_session
+
+DEBUG = True
+
+class TestData:
+    if(DEBUG):
+        dataFile = 'test/test_data/test_mouse.csv'
+    else:
+        dataFile = 'pywib/test/test_data/test_mouse.csv'
+
+
+def _reference(trace, angle_threshold=np.pi / 4):
+    """
+    Geometry of a single trace with np.unwrap.
+    """
+    x, y = trace['x'].to_numpy(dtype=float), trace['y'].to_numpy(dtype=float)
+    t = trace['timeStamp'].to_numpy(dtype=float)
+    dx, dy, dt = np.diff(x), np.diff(y), np.diff(t)
+    ds = np.hypot(dx, dy)
+    keep = ds > 0
+    turn = np.abs(np.diff(np.unwrap(np.arctan2(dy[keep], dx[keep]))))
+    turn_dt = dt[keep][1:]
+    curvature = turn / ((ds[keep][:-1] + ds[keep][1:]) / 2)
+    angular_velocity = turn[turn_dt > 0] / turn_dt[turn_dt > 0]
+    return {
+        'total_turn': turn.sum(),
+        'direction_changes': (turn > angle_threshold).sum(),
+        'mean_curvature': curvature.mean() if len(curvature) else 0.0,
+        'max_angular_velocity': angular_velocity.max() if len(angular_velocity) else 0.0,
+        'straightness': np.hypot(x[-1] - x[0], y[-1] - y[0]) / ds.sum() if ds.sum() > 0 else np.nan,
+    }
+
+
+def _random_walks(num_sessions=5, num_events=400, seed=2):
+    rng = np.random.default_rng(seed)
+    n = num_sessions * num_events
+    return pd.DataFrame({
+        'sessionId': np.repeat([f'S{i}' for i in range(num_sessions)], num_events),
+        'eventType': rng.choice([0, 0, 0, 0, 0, 0, 1], n),
+        'timeStamp': np.cumsum(rng.choice([0, 10, 20], n)),
+        'x': np.cumsum(rng.integers(-5, 6, n)) + 500,
+        'y': np.cumsum(rng.integers(-5, 6, n)) + 500,
+    })
+
+
+class TestGeometry(unittest.TestCase):
+
+    def test_same_as_per_trace(self):
+        df = _random_walks()
+        # Integer steps turn by exact multiples of 45 degrees, the threshold is away from them
+        geometry = trajectory_geometry(df, angle_threshold=1.0)
+        traces = extract_traces_by_session(df)
+        self.assertEqual(len(geometry), sum(len(session_traces) for session_traces in traces.values()))
+        for row in geometry.itertuples():
+            expected = _reference(traces[row.sessionId][row.trace_id], angle_threshold=1.0)
+            for feature, value in expected.items():
+                np.testing.assert_allclose(getattr(row, feature), value, atol=1e-9, err_msg=feature)
+        pd.testing.assert_frame_equal(trajectory_geometry(traces=traces, angle_threshold=1.0), geometry)
+
+    def test_square(self):
+        df = pd.DataFrame({'sessionId': 'S', 'eventType': [0, 0, 0, 0, 0, 1],
+                           'timeStamp': [0, 10, 20, 30, 40, 50],
+                           'x': [0, 100, 100, 0, 0, 0], 'y': [0, 0, 100, 100, 50, 50]})
+        row = trajectory_geometry(df).iloc[0]
+        self.assertEqual(row['direction_changes'], 3)
+        self.assertAlmostEqual(row['total_turn'], 3 * np.pi / 2)
+        self.assertAlmostEqual(row['max_angular_velocity'], np.pi / 20)
+        self.assertAlmostEqual(row['straightness'], 50 / 350)
+        self.assertAlmostEqual(row['heading'], np.pi / 2)
+
+    def test_session_metrics(self):
+        df = process_csv(TestData.dataFile)
+        geometry = trajectory_geometry(df)
+        metrics = geometry_metrics(df)
+        self.assertEqual(set(metrics), set(geometry['sessionId']))
+        for session_id, session_metrics in metrics.items():
+            straightness = geometry.loc[geometry['sessionId'] == session_id, 'straightness']
+            self.assertAlmostEqual(session_metrics['straightness']['mean'], straightness.mean())
+            self.assertAlmostEqual(session_metrics['straightness']['min'], straightness.min())
+        self.assertEqual(geometry_metrics(computed_geometry=geometry), metrics)
+        with self.assertRaises(ValueError):
+            trajectory_geometry()
+
+
+    def test_without_moves(self):
+        df = process_csv(TestData.dataFile)
+        clicks = df[df['eventType'] != 0].reset_index(drop=True)
+        self.assertTrue(trajectory_geometry(clicks).empty)
+        self.assertEqual(geometry_metrics(clicks), {})
+
+
+    def test_window_without_moves(self):
+        df = process_csv(TestData.dataFile)
+        # Only the mouse down, mouse up and click after the first trace of SESSION_A
+        clicks, session = ('SESSION_A', 1750792662350, 1750792662401), ('SESSION_A', None, None)
+        results = geometry_metrics(df, windows=[clicks, session])
+        self.assertIsNone(results[clicks])
+        self.assertEqual(results[session], geometry_metrics(df)['SESSION_A'])
+
+    def test_windows_with_precomputed_geometry(self):
+        df = process_csv(TestData.dataFile)
+        # The precomputed table covers the whole sessions, not the windows
+        with self.assertRaises(ValueError):
+            geometry_metrics(df, windows=[('SESSION_A', None, None)], computed_geometry=trajectory_geometry(df))
+        with self.assertRaises(ValueError):
+            geometry_metrics(df, None, np.pi / 4, trajectory_geometry(df), windows=[('SESSION_A', None, None)])
+
+
+if __name__ == '__main__':
+    unittest.main()
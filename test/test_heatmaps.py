@@ -0,0 +1,73 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+sys.path.insert(0, os.path.dirname(__file__))
+from utils import process_csv, import_pyModule
+
+import_pyModule()
+
+from pywib import DensityHeatmap
+
+DEBUG = True
+
+class TestData:
+    if(DEBUG):
+        dataFile = 'test/test_data/test_window_resize_error.csv'
+    else:
+        dataFile = 'pywib/test/test_data/test_window_resize_error.csv'
+
+
+def _random_moves(n=10000, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({'sessionId': rng.choice(['a', 'b', 'c'], n), 'eventType': rng.choice([0, 1, 5], n),
+                         'timeStamp': np.arange(n), 'x': rng.integers(-50, 900, n), 'y': rng.integers(-50, 700, n)})
+
+
+class TestDensityHeatmap(unittest.TestCase):
+
+    def test_matches_histogram2d(self):
+        df = _random_moves()
+        heatmap = DensityHeatmap('mouse', width=800, height=600, cell_size=20).update(df)
+        moves = df[(df['eventType'] == 0) & (df['x'] < 800) & (df['y'] < 600)]
+        expected, _, _ = np.histogram2d(moves['y'], moves['x'], bins=(30, 40), range=((0, 600), (0, 800)))
+        np.testing.assert_array_equal(heatmap.grid(), expected)
+
+    def test_accumulates_chunks_and_keys(self):
+        df = _random_moves()
+        whole = DensityHeatmap('click', width=800, height=600, by='sessionId').update(df)
+        first = DensityHeatmap('click', width=800, height=600, by='sessionId').update(df.iloc[:3000])
+        second = DensityHeatmap('click', width=800, height=600, by='sessionId').update(df.iloc[3000:])
+        merged = first.merge(second)
+        chunked = DensityHeatmap('click', width=800, height=600, by='sessionId')
+        for start in range(0, len(df), 1000):
+            chunked.update(df.iloc[start:start + 1000])
+        self.assertEqual(sorted(whole.keys), ['a', 'b', 'c'])
+        for key in whole.keys:
+            np.testing.assert_array_equal(merged.grid(key), whole.grid(key))
+            np.testing.assert_array_equal(chunked.grid(key), whole.grid(key))
+        np.testing.assert_array_equal(whole.grid(), sum(whole.grid(key) for key in whole.keys))
+        with self.assertRaises(ValueError):
+            whole.merge(DensityHeatmap('mouse', width=800, height=600, by='sessionId'))
+
+    def test_plot(self):
+        directory = tempfile.mkdtemp()
+        try:
+            heatmap = DensityHeatmap('mouse', by='sessionId').update(process_csv(TestData.dataFile))
+            outfile = os.path.join(directory, 'heatmap.png')
+            figure = heatmap.plot('SESSION_A', outfile=outfile)
+            self.assertTrue(os.path.exists(outfile))
+            self.assertEqual(len(figure.axes[0].images), 1)
+        finally:
+            shutil.rmtree(directory)
+
+    def test_invalid_kind(self):
+        with self.assertRaises(ValueError):
+            DensityHeatmap('keyboard')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+import sys
+import os
+import numpy as np
+sys.path.insert(0, os.path.dirname(__file__))
+from utils import process_csv, import_pyModule
+
+import_pyModule()
+
+from pywib import (IncrementalSession, ChunkedAggregator, velocity_metrics, jerkiness_metrics, pauses_metrics,
+                   click_slip, movement_time)
+
+DEBUG = True
+
+class TestData:
+    if(DEBUG):
+        dataFile = 'test/test_data/test_window_resize_error.csv'
+        pausesFile = 'test/test_data/pauses.csv'
+    else:
+        dataFile = 'pywib/test/test_data/test_window_resize_error.csv'
+        pausesFile = 'pywib/test/test_data/pauses.csv'
+
+
+class TestIncremental(unittest.TestCase):
+
+    def setUp(self):
+        self.test_data = process_csv(TestData.dataFile)
+        self.test_pauses = process_csv(TestData.pausesFile)
+
+    def assert_metrics_equal(self, expected, result):
+        for name, value in expected.items():
+            np.testing.assert_allclose(np.asarray(result[name], dtype=float), np.asarray(value, dtype=float), rtol=1e-9)
+
+    def test_matches_batch_after_every_event(self):
+        for df in (self.test_data, self.test_pauses):
+            session_id = df['sessionId'].iloc[0]
+            df = df[df['sessionId'] == session_id].sort_values('timeStamp', kind='mergesort')
+            session = IncrementalSession()
+            for i in range(len(df)):
+                session.update(df.iloc[i:i + 1])
+                result = session.result(pause_durations=True)
+                prefix = df.iloc[:i + 1]
+                expected = velocity_metrics(prefix.copy())
+                if session_id in expected:
+                    self.assert_metrics_equal(expected[session_id], result['velocity_metrics'])
+                    self.assert_metrics_equal(jerkiness_metrics(prefix.copy())[session_id], result['jerkiness_metrics'])
+                else:
+                    self.assertNotIn('velocity_metrics', result)
+                self.assert_metrics_equal(pauses_metrics(prefix.copy())[session_id], result['pauses_metrics'])
+                self.assert_metrics_equal(click_slip(prefix.copy())[session_id], result['click_slip'])
+                self.assertAlmostEqual(movement_time(prefix.copy())[session_id], result['movement_time'])
+
+    def test_pause_durations_on_request(self):
+        session_id = self.test_pauses['sessionId'].iloc[0]
+        df = self.test_pauses[self.test_pauses['sessionId'] == session_id]
+        session = IncrementalSession()
+        session.update(df)
+        expected = pauses_metrics(df.copy())[session_id]
+        result = session.result(['pauses_metrics', 'num_pauses'])
+        self.assertGreater(expected['total_pauses'], 0)
+        self.assertNotIn('pause_durations', result['pauses_metrics'])
+        self.assert_metrics_equal({key: value for key, value in expected.items() if key != 'pause_durations'},
+                                  result['pauses_metrics'])
+        self.assertEqual(result['num_pauses']['num_pauses'], expected['total_pauses'])
+        self.assertEqual(session.result(pause_durations=True)['pauses_metrics']['pause_durations'], expected['pause_durations'])
+
+    def test_click_slip_across_updates(self):
+        df = self.test_data.copy()
+        df = df[df['sessionId'] == df['sessionId'].iloc[0]]
+        aggregator = ChunkedAggregator(click_slip_threshold=0)
+        for i in range(0, len(df), 2):
+            aggregator.update(df.iloc[i:i + 2])
+        self.assert_metrics_equal(click_slip(df.copy(), threshold=0)[df['sessionId'].iloc[0]],
+                                  aggregator.result(['click_slip'])['click_slip'][df['sessionId'].iloc[0]])
+
+    def test_other_session_raises(self):
+        sessions = self.test_data['sessionId'].unique()
+        session = IncrementalSession(session_id=sessions[0])
+        with self.assertRaises(ValueError):
+            session.update(self.test_data[self.test_data['sessionId'] == sessions[1]])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+import sys
+import os
+import tempfile
+sys.path.insert(0, os.path.dirname(__file__))
+from utils import process_csv, import_pyModule
+
+import_pyModule()
+
+from pywib import read_interactions, iter_interactions, columns_for_metrics, ColumnNames
+
+try:
+    import pyarrow
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+DEBUG = True
+
+class TestData:
+    if(DEBUG):
+        dataFile = 'test/test_data/test_mouse_keyboard.csv'
+    else:
+        dataFile = 'pywib/test/test_data/test_mouse_keyboard.csv'
+
+
+class TestColumnsForMetrics(unittest.TestCase):
+
+    def test_mouse_metrics_only_need_base_columns(self):
+        columns = columns_for_metrics(['velocity_metrics', 'click_slip'])
+        self.assertNotIn(ColumnNames.KEY_CODE_EVENT, columns)
+        self.assertIn(ColumnNames.SESSION_ID, columns)
+
+    def test_keyboard_metrics_add_key_columns(self):
+        columns = columns_for_metrics(['typing_speed'])
+        self.assertIn(ColumnNames.KEY_CODE_EVENT, columns)
+        self.assertIn(ColumnNames.KEY_VALUE_EVENT, columns)
+
+    def test_unknown_metric(self):
+        with self.assertRaises(ValueError):
+            columns_for_metrics(['not_a_metric'])
+
+
+@unittest.skipUnless(HAS_PYARROW, "pyarrow is not installed")
+class TestReadInteractions(unittest.TestCase):
+
+    def setUp(self):
+        self.test_data = process_csv(TestData.dataFile)
+        self.test_data[ColumnNames.ELEMENT_ID] = 'element'
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.parquet_file = os.path.join(self.tmp_dir.name, 'events.parquet')
+        self.arrow_file = os.path.join(self.tmp_dir.name, 'events.arrow')
+        self.test_data.to_parquet(self.parquet_file, index=False, row_group_size=10)
+        self.test_data.to_feather(self.arrow_file)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_projection(self):
+        df = read_interactions(self.parquet_file, metrics=['velocity_metrics'])
+        self.assertEqual(sorted(df.columns), sorted(columns_for_metrics(['velocity_metrics'])))
+        self.assertEqual(len(df), len(self.test_data))
+
+    def test_session_and_time_filters(self):
+        start = self.test_data[ColumnNames.TIME_STAMP].median()
+        df = read_interactions(self.parquet_file, sessions=['SESSION_A'], start=start)
+        expected = self.test_data[(self.test_data[ColumnNames.SESSION_ID] == 'SESSION_A') &
+                                  (self.test_data[ColumnNames.TIME_STAMP] >= start)]
+        self.assertEqual(len(df), len(expected))
+        self.assertEqual(set(df[ColumnNames.SESSION_ID]), {'SESSION_A'})
+
+    def test_arrow_ipc_as_traces(self):
+        traces = read_interactions(self.arrow_file, metrics=['velocity'], as_traces='mouse')
+        self.assertEqual(set(traces.keys()), {'SESSION_A', 'SESSION_B'})
+        keystrokes = read_interactions(self.arrow_file, metrics=['typing_speed'], as_traces='keyboard')
+        self.assertTrue(all(len(session) > 0 for session in keystrokes.values()))
+
+    def test_iter_interactions(self):
+        batches = list(iter_interactions(self.parquet_file, metrics=['velocity'], batch_size=16))
+        self.assertGreater(len(batches), 1)
+        self.assertEqual(sum(len(batch) for batch in batches), len(self.test_data))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+import sys
+import os
+import io
+import shutil
+import tempfile
+import contextlib
+import numpy as np
+import pandas as pd
+sys.path.insert(0, os.path.dirname(__file__))
+from utils import process_csv, import_pyModule
+
+import_pyModule()
+
+from pywib import keyboard_counts, keyboard_heatmap, keyboard_heatmaps
+from pywib.utils.visualization import KEYBOARD_LAYOUT
+
+DEBUG = True
+
+class TestData:
+    if(DEBUG):
+        dataFile = 'test/test_data/test_mouse_keyboard.csv'
+    else:
+        dataFile = 'pywib/test/test_data/test_mouse_keyboard.csv'
+
+
+def _random_keys(n=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({'sessionId': rng.choice(['a', 'b'], n), 'eventType': rng.choice([13, 15], n),
+                         'timeStamp': np.arange(n), 'x': 0, 'y': 0,
+                         'keyCodeEvent': rng.integers(0, 130, n).astype(float), 'keyValueEvent': -1})
+
+
+class TestKeyboardHeatmap(unittest.TestCase):
+
+    def test_counts_match_characters(self):
+        df = _random_keys()
+        counts = keyboard_counts(df)
+        for session_id, matrix in counts.items():
+            key_down = df[(df['sessionId'] == session_id) & (df['eventType'] == 13)]
+            characters = key_down['keyCodeEvent'].astype(int).apply(chr).str.lower().value_counts()
+            for row, keys in enumerate(KEYBOARD_LAYOUT):
+                for column, key in enumerate(keys):
+                    self.assertEqual(matrix[row, column], characters.get(' ' if key == 'space' else key, 0))
+                self.assertTrue(np.isnan(matrix[row, len(keys):]).all())
+
+    def test_headless_without_output(self):
+        df = process_csv(TestData.dataFile)
+        directory = tempfile.mkdtemp()
+        try:
+            stdout = io.StringIO()
+            with contextlib.redirect_stdout(stdout):
+                figure = keyboard_heatmap(df, 'SESSION_B', outfile=os.path.join(directory, 'b.png'), show=False)
+                paths = keyboard_heatmaps(df, directory)
+            self.assertEqual(stdout.getvalue(), '')
+            self.assertIsNotNone(figure)
+            self.assertEqual(sorted(os.path.basename(path) for path in paths), ['SESSION_A.png', 'SESSION_B.png'])
+            self.assertTrue(all(os.path.exists(path) for path in paths))
+        finally:
+            shutil.rmtree(directory)
+
+    def test_no_key_events(self):
+        df = process_csv(TestData.dataFile)
+        self.assertIsNone(keyboard_heatmap(df[df['eventType'] == 0], show=False))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+import unittest
+import sys
+import os
+import warnings
+import numpy as np
+import pandas as pd
+sys.path.insert(0, os.path.dirname(__file__))
+from utils import process_csv, import_pyModule
+
+import_pyModule()
+
+from pywib.algorithms import obtain_straight_patterns, detect_patterns, trace_features, PATTERNS
+from pywib.utils import extract_mouse_click_traces_by_session_with_intial_pause, extract_traces_by_session
+from pywib.utils.movement import _auc_execution_deviation
+
+DEBUG = True
+
+class TestData:
+    if(DEBUG):
+        dataFile = 'test/test_data/test_mouse.csv'
+    else:
+        dataFile = 'pywib/test/test_data/test_mouse.csv'
+
+
+def _random_sessions(num_sessions=10, num_events=300, seed=1):
+    rng = np.random.default_rng(seed)
+    n = num_sessions * num_events
+    return pd.DataFrame({
+        'sessionId': np.repeat([f'S{i}' for i in range(num_sessions)], num_events),
+        'eventType': rng.choice([0, 0, 0, 0, 0, 1, 3, 4, 13], n),
+        'timeStamp': np.cumsum(rng.choice([10, 300], n, p=[0.8, 0.2])),
+        'x': rng.integers(0, 800, n),
+        'y': rng.integers(0, 600, n),
+    })
+
+
+class TestStraightPattern(unittest.TestCase):
+
+    def _reference(self, traces, threshold):
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            return {session_id: [i for i, trace in enumerate(session_traces) if _auc_execution_deviation(trace) <= threshold]
+                    for session_id, session_traces in traces.items()}
+
+    def test_same_as_per_trace(self):
+        for df in (_random_sessions(), process_csv(TestData.dataFile)):
+            traces = extract_mouse_click_traces_by_session_with_intial_pause(df)
+            for threshold in (50, 100, 1e9):
+                expected = self._reference(traces, threshold)
+                for result in (obtain_straight_patterns(df, threshold=threshold),
+                               obtain_straight_patterns(traces=traces, threshold=threshold)):
+                    self.assertEqual({session_id: list(ids) for session_id, ids in result.items()}, expected)
+
+    def test_straight_trace(self):
+        df = pd.DataFrame({'sessionId': 'S', 'eventType': [0, 0, 0, 0, 1, 0, 0, 0, 1],
+                           'timeStamp': [0, 500, 510, 520, 530, 1000, 1500, 1510, 1520],
+                           'x': [0, 10, 100, 200, 200, 0, 30, 90, 100], 'y': [0, 10, 12, 10, 10, 0, 300, 0, 10]})
+        self.assertEqual(list(obtain_straight_patterns(df, threshold=10)['S']), [0])
+        self.assertEqual(list(obtain_straight_patterns(df, threshold=1e6)['S']), [0, 1])
+        self.assertEqual(list(obtain_straight_patterns(df, threshold=1e6, min_distance=150)['S']), [0])
+        with self.assertRaises(ValueError):
+            obtain_straight_patterns()
+
+
+def _trace_events(session_id, points, end_event=1, start=0, step=10):
+    """
+    Events of a trace through the points, followed by an end event.
+    """
+    rows = [(session_id, 0, start + i * step, x, y) for i, (x, y) in enumerate(points)]
+    rows.append((session_id, end_event, start + len(points) * step, *points[-1]))
+    return rows
+
+
+class TestPatternEngine(unittest.TestCase):
+
+    def test_features_match_traces(self):
+        df = _random_sessions()
+        features = trace_features(df)
+        traces = extract_traces_by_session(df)
+        self.assertEqual(len(features), sum(len(session_traces) for session_traces in traces.values()))
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            for row in features.itertuples():
+                trace = traces[row.sessionId][row.trace_id]
+                x, y = trace['x'].to_numpy(dtype=float), trace['y'].to_numpy(dtype=float)
+                dt = np.diff(trace['timeStamp'].to_numpy(dtype=float))
+                self.assertEqual(row.num_points, len(trace))
+                self.assertAlmostEqual(row.path_length, np.hypot(np.diff(x), np.diff(y)).sum())
+                self.assertEqual(row.num_pauses, (dt > 200).sum())
+                self.assertEqual(row.x_reversals, (np.diff(np.sign(np.diff(x)[np.diff(x) != 0])) != 0).sum())
+                np.testing.assert_allclose(row.auc, _auc_execution_deviation(trace))
+
+    def test_straight_as_detector(self):
+        df = _random_sessions()
+        result = detect_patterns(df, patterns=['straight'])
+        straight = obtain_straight_patterns(df)
+        counts = result.groupby('sessionId')['straight'].sum()
+        self.assertEqual({session_id: len(ids) for session_id, ids in straight.items()}, counts.to_dict())
+
+    def test_patterns(self):
+        rows = _trace_events('S', [(0, 0), (100, 0), (0, 5), (100, 10), (0, 15), (100, 20), (0, 25)], end_event=13)
+        rows += _trace_events('S', [(0, 0), (150, 0), (240, 0), (200, 0)], start=1000)
+        rows += _trace_events('S', [(0, 0), (300, 300), (600, 0), (300, -300), (10, 0)], end_event=13, start=2000)
+        df = pd.DataFrame(rows, columns=['sessionId', 'eventType', 'timeStamp', 'x', 'y'])
+        result = detect_patterns(df)
+        self.assertEqual(list(result['zigzag']), [True, False, False])
+        self.assertEqual(list(result['overshoot']), [False, True, False])
+        self.assertAlmostEqual(result['overshoot_distance'][1], 40)
+        self.assertEqual(list(result['exploratory']), [True, False, True])
+
+    def test_custom_patterns(self):
+        df = _random_sessions()
+        features = trace_features(df)
+        result = detect_patterns(features=features, patterns={'long': lambda f: f['num_points'] >= 5})
+        np.testing.assert_array_equal(result['long'], features['num_points'] >= 5)
+        self.assertEqual(list(detect_patterns(features=features).columns[-len(PATTERNS):]), list(PATTERNS))
+        with self.assertRaises(ValueError):
+            detect_patterns(features=features, patterns=['unknown'])
+        with self.assertRaises(ValueError):
+            detect_patterns(features=features, patterns={'auc': lambda f: f['auc'] > 0})
+        with self.assertRaises(ValueError):
+            detect_patterns()
+
+
+    def test_without_moves(self):
+        df = process_csv(TestData.dataFile)
+        clicks = df[df['eventType'] != 0].reset_index(drop=True)
+        straight = obtain_straight_patterns(clicks)
+        self.assertEqual(set(straight), set(clicks['sessionId']))
+        self.assertTrue(all(len(ids) == 0 for ids in straight.values()))
+        self.assertTrue(detect_patterns(clicks).empty)
+        self.assertEqual(obtain_straight_patterns(clicks.iloc[:0]), {})
+        self.assertTrue(detect_patterns(clicks.iloc[:0]).empty)
+
+
+if __name__ == '__main__':
+    unittest.main()
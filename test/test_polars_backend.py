@@ -0,0 +1,104 @@
+import unittest
+import sys
+import os
+import numpy as np
+import pandas as pd
+sys.path.insert(0, os.path.dirname(__file__))
+from utils import process_csv, import_pyModule
+
+import_pyModule()
+
+from pywib import (polars_backend, extract_traces_by_session, velocity_metrics, jerkiness_metrics, pauses_metrics,
+                   number_of_clicks, backspace_usage)
+
+try:
+    import polars as pl
+    HAS_POLARS = True
+except ImportError:
+    HAS_POLARS = False
+
+DEBUG = True
+
+class TestData:
+    if(DEBUG):
+        dataFile = 'test/test_data/test_window_resize_error.csv'
+        keyboardFile = 'test/test_data/test_mouse_keyboard.csv'
+    else:
+        dataFile = 'pywib/test/test_data/test_window_resize_error.csv'
+        keyboardFile = 'pywib/test/test_data/test_mouse_keyboard.csv'
+
+
+@unittest.skipUnless(HAS_POLARS, "polars is not installed")
+class TestPolarsBackend(unittest.TestCase):
+
+    def setUp(self):
+        self.test_data = process_csv(TestData.dataFile)
+        self.events = pl.from_pandas(self.test_data)
+
+    def assertMetricsEqual(self, expected, result):
+        self.assertEqual(set(expected), set(result))
+        for session_id, metrics in expected.items():
+            for key, value in metrics.items():
+                if isinstance(value, list):
+                    np.testing.assert_allclose(result[session_id][key], value)
+                elif np.isnan(value):
+                    self.assertTrue(np.isnan(result[session_id][key]))
+                else:
+                    self.assertAlmostEqual(result[session_id][key], value, places=9)
+
+    def test_traces(self):
+        expected = extract_traces_by_session(self.test_data)
+        traces = polars_backend.extract_traces_by_session(self.events.lazy())
+        self.assertEqual(set(expected), set(traces))
+        for session_id in expected:
+            self.assertEqual([len(trace) for trace in expected[session_id]], [len(trace) for trace in traces[session_id]])
+            for trace, expected_trace in zip(traces[session_id], expected[session_id]):
+                np.testing.assert_array_equal(trace["x"].to_numpy(), expected_trace["x"].to_numpy())
+
+    def test_kinematic_metrics(self):
+        self.assertMetricsEqual(velocity_metrics(self.test_data.copy()), polars_backend.velocity_metrics(self.events))
+        self.assertMetricsEqual(jerkiness_metrics(self.test_data.copy()), polars_backend.jerkiness_metrics(self.events.lazy()))
+
+    def test_sessions_without_traces(self):
+        # A session of clicks and lone moves has no traces, a stationary trace has no non zero velocity
+        extra = pd.DataFrame({
+            'sessionId': ['NO_TRACES'] * 4 + ['STILL'] * 3,
+            'eventType': [0, 1, 0, 1, 0, 0, 1],
+            'timeStamp': [1, 2, 3, 4, 1, 2, 3],
+            'x': [10, 10, 20, 20, 5, 5, 5],
+            'y': [10, 10, 20, 20, 5, 5, 5],
+        })
+        df = pd.concat([self.test_data, extra], ignore_index=True)
+        events = pl.from_pandas(df)
+        for metric, polars_metric in ((velocity_metrics, polars_backend.velocity_metrics),
+                                      (jerkiness_metrics, polars_backend.jerkiness_metrics)):
+            expected = metric(df.copy())
+            result = polars_metric(events)
+            self.assertNotIn('NO_TRACES', result)
+            self.assertIn('STILL', result)
+            self.assertMetricsEqual(expected, result)
+
+    def test_pauses_metrics(self):
+        for threshold in (50, 100, 500):
+            self.assertMetricsEqual(pauses_metrics(self.test_data.copy(), threshold),
+                                    polars_backend.pauses_metrics(self.events, threshold))
+
+    def test_counters(self):
+        self.assertEqual(number_of_clicks(self.test_data.copy()), polars_backend.number_of_clicks(self.events))
+        keyboard = process_csv(TestData.keyboardFile)
+        self.assertEqual(backspace_usage(keyboard.copy()), polars_backend.backspace_usage(pl.from_pandas(keyboard)))
+
+    def test_space_time_diff_keeps_laziness(self):
+        result = polars_backend.compute_space_time_diff(self.events.lazy())
+        self.assertIsInstance(result, pl.LazyFrame)
+        self.assertTrue({"dx", "dy", "dt"} <= set(result.collect().columns))
+
+    def test_invalid_input(self):
+        with self.assertRaises(ValueError):
+            polars_backend.velocity_metrics(self.test_data)
+        with self.assertRaises(ValueError):
+            polars_backend.velocity_metrics(self.events.drop("x"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+import sys
+import os
+import numpy as np
+import pandas as pd
+sys.path.insert(0, os.path.dirname(__file__))
+from utils import process_csv, import_pyModule
+
+import_pyModule()
+
+from pywib import rolling_metrics, velocity, velocity_metrics, pauses_metrics, extract_traces_by_session
+
+DEBUG = True
+
+class TestData:
+    if(DEBUG):
+        dataFile = 'test/test_data/test_window_resize_error.csv'
+    else:
+        dataFile = 'pywib/test/test_data/test_window_resize_error.csv'
+
+
+class TestRollingMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.test_data = process_csv(TestData.dataFile)
+
+    def test_whole_session_window(self):
+        result = rolling_metrics(self.test_data, window=1e9, step=1e9).set_index('sessionId')
+        expected_velocity = velocity_metrics(self.test_data.copy())
+        expected_pauses = pauses_metrics(self.test_data.copy())
+        for session_id, row in result.iterrows():
+            for key in ('mean', 'max', 'min'):
+                self.assertAlmostEqual(row[f'velocity.{key}'], expected_velocity[session_id][key])
+            self.assertEqual(row['pauses.total_pauses'], expected_pauses[session_id]['total_pauses'])
+            self.assertAlmostEqual(row['pauses.max_pause'], expected_pauses[session_id]['max_pause'])
+
+    def test_sliding_windows(self):
+        result = rolling_metrics(self.test_data, window=5000, step=1000, metrics=['velocity'])
+        self.assertEqual(list(result.columns), ['sessionId', 'window_start', 'window_end', 'velocity.count',
+                                                'velocity.mean', 'velocity.max', 'velocity.min'])
+        points = {session_id: pd.concat(traces) for session_id, traces in velocity(self.test_data.copy()).items()}
+        for _, row in result.iterrows():
+            trace = points[row['sessionId']]
+            time_stamp = pd.to_numeric(trace['timeStamp'])
+            values = trace['velocity'][(time_stamp >= row['window_start']) & (time_stamp < row['window_end'])
+                                       & (trace['velocity'] > 0)]
+            self.assertEqual(row['velocity.count'], len(values))
+            if len(values) == 0:
+                self.assertTrue(np.isnan(row['velocity.mean']))
+            else:
+                self.assertAlmostEqual(row['velocity.mean'], values.mean())
+                self.assertAlmostEqual(row['velocity.max'], values.max())
+                self.assertAlmostEqual(row['velocity.min'], values.min())
+
+    def test_windows_cover_sessions(self):
+        result = rolling_metrics(self.test_data, window=5000, step=2000)
+        for session_id, windows in result.groupby('sessionId'):
+            events = pd.to_numeric(self.test_data.loc[self.test_data['sessionId'] == session_id, 'timeStamp'])
+            self.assertEqual(windows['window_start'].iloc[0], events.min())
+            self.assertTrue((np.diff(windows['window_start']) == 2000).all())
+            self.assertLessEqual(windows['window_start'].iloc[-1], events.max())
+
+    def test_invalid_parameters(self):
+        with self.assertRaises(ValueError):
+            rolling_metrics(self.test_data, metrics=['speed'])
+        with self.assertRaises(ValueError):
+            rolling_metrics(self.test_data, window=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+from unittest import mock
+import numpy as np
+import pandas as pd
+sys.path.insert(0, os.path.dirname(__file__))
+from utils import process_csv, import_pyModule
+
+import_pyModule()
+
+from pywib.utils import similarity
+from pywib import (dtw_distance, lb_kim, lb_keogh, dtw_nearest, dtw_matrix, extract_traces_by_session, DiskCache)
+
+DEBUG = True
+
+class TestData:
+    if(DEBUG):
+        dataFile = 'test/test_data/test_mouse.csv'
+    else:
+        dataFile = 'pywib/test/test_data/test_mouse.csv'
+
+
+def _naive_dtw(a, b, window=None):
+    n, m = len(a), len(b)
+    window = max(n, m) if window is None else max(window, abs(n - m))
+    cost = np.full((n + 1, m + 1), np.inf)
+    cost[0, 0] = 0
+    for i in range(1, n + 1):
+        for j in range(max(1, i - window), min(m, i + window) + 1):
+            cost[i, j] = np.hypot(*(a[i - 1] - b[j - 1])) + min(cost[i - 1, j], cost[i, j - 1], cost[i - 1, j - 1])
+    return cost[n, m]
+
+
+def _random_traces(num_traces, low=2, high=30, seed=0):
+    rng = np.random.default_rng(seed)
+    return [np.cumsum(rng.normal(0, 3, (rng.integers(low, high), 2)), axis=0) + rng.normal(0, 50, 2)
+            for _ in range(num_traces)]
+
+
+class TestDTW(unittest.TestCase):
+
+    def test_same_as_naive(self):
+        traces = _random_traces(40, low=1)
+        for a, b in zip(traces[::2], traces[1::2]):
+            for window in (None, 0, 3):
+                distance = dtw_distance(a, b, window)
+                self.assertAlmostEqual(distance, _naive_dtw(a, b, window))
+                self.assertLessEqual(lb_kim(a, b), distance + 1e-9)
+                self.assertLessEqual(lb_keogh(a, b, window), distance + 1e-9)
+                if distance > 0:
+                    self.assertEqual(dtw_distance(a, b, window, max_distance=0.99 * distance), np.inf)
+
+    def test_traces(self):
+        df = process_csv(TestData.dataFile)
+        trace = extract_traces_by_session(df)['SESSION_A'][0]
+        self.assertEqual(dtw_distance(trace, trace), 0)
+        self.assertEqual(dtw_distance(trace, trace[['x', 'y']].to_numpy() + [3, 4]), 5 * len(trace))
+        with self.assertRaises(ValueError):
+            dtw_distance(trace, np.zeros((0, 2)))
+
+    def test_nearest(self):
+        candidates = _random_traces(200, low=20, high=40, seed=1)
+        query = candidates[42] + np.random.default_rng(2).normal(0, 1, candidates[42].shape)
+        distances = np.array([dtw_distance(query, candidate, 5) for candidate in candidates])
+        indices, nearest = dtw_nearest(query, candidates, window=5, k=4)
+        np.testing.assert_array_equal(indices, np.argsort(distances, kind='stable')[:4])
+        np.testing.assert_allclose(nearest, np.sort(distances)[:4])
+        self.assertEqual(indices[0], 42)
+
+
+class TestDTWMatrix(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_matrix(self):
+        traces = _random_traces(11, seed=3)
+        matrix = dtw_matrix(traces, window=4, n_jobs=2, block_size=3)
+        expected = [[dtw_distance(a, b, 4) for b in traces] for a in traces]
+        np.testing.assert_allclose(matrix.to_numpy(), expected)
+        np.testing.assert_allclose(matrix.to_numpy(), matrix.to_numpy().T)
+
+    def test_cache_and_sessions(self):
+        df = process_csv(TestData.dataFile)
+        traces = extract_traces_by_session(df)
+        cache = DiskCache(os.path.join(self.directory, 'cache.sqlite'))
+        first = dtw_matrix(traces, n_jobs=1, block_size=2, cache=cache)
+        self.assertEqual(cache.stats()['misses'], cache.stats()['entries'])
+        second = dtw_matrix(traces, n_jobs=1, block_size=2, cache=cache)
+        pd.testing.assert_frame_equal(first, second)
+        self.assertEqual(cache.stats()['hits'], cache.stats()['entries'])
+        self.assertEqual(first.index[0], ('SESSION_A', 0))
+        self.assertEqual(len(first), sum(len(session_traces) for session_traces in traces.values()))
+        cache.close()
+
+    def test_interrupted_matrix_is_resumed(self):
+        traces = _random_traces(9, seed=4)
+        cache = DiskCache(os.path.join(self.directory, 'cache.sqlite'))
+        compute = similarity._dtw_block
+        calls = []
+
+        def interrupted(block, *args):
+            calls.append(block)
+            if len(calls) == 4:
+                raise KeyboardInterrupt
+            return compute(block, *args)
+
+        # 6 blocks of 3 traces, the run is interrupted on the fourth one
+        with mock.patch.object(similarity, '_dtw_block', side_effect=interrupted):
+            with self.assertRaises(KeyboardInterrupt):
+                dtw_matrix(traces, window=3, n_jobs=1, block_size=3, cache=cache)
+        self.assertEqual(len(cache), 3)
+
+        with mock.patch.object(similarity, '_dtw_block', side_effect=compute) as resumed:
+            matrix = dtw_matrix(traces, window=3, n_jobs=1, block_size=3, cache=cache)
+        self.assertEqual(resumed.call_count, 3)
+        expected = [[dtw_distance(a, b, 3) for b in traces] for a in traces]
+        np.testing.assert_allclose(matrix.to_numpy(), expected)
+        cache.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+sys.path.insert(0, os.path.dirname(__file__))
+from utils import process_csv, import_pyModule
+
+import_pyModule()
+
+from pywib import rdp_mask, simplify_traces, extract_traces_by_session, write_traces, auc, path
+from pywib.utils.simplify import _segment_distances
+
+DEBUG = True
+
+class TestData:
+    if(DEBUG):
+        dataFile = 'test/test_data/test_window_resize_error.csv'
+    else:
+        dataFile = 'pywib/test/test_data/test_window_resize_error.csv'
+
+
+def _noisy_curve(n=500, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.linspace(0, 1, n)
+    return pd.DataFrame({'sessionId': 's', 'eventType': 0, 'timeStamp': np.arange(n) * 8,
+                         'x': t * 800, 'y': 200 * np.sin(t * 3) + rng.normal(0, 0.5, n)})
+
+
+class TestSimplify(unittest.TestCase):
+
+    def test_error_bound(self):
+        trace = _noisy_curve()
+        x, y = trace['x'].to_numpy(), trace['y'].to_numpy()
+        for tolerance in (0.5, 2, 10):
+            kept = np.flatnonzero(rdp_mask(x, y, tolerance))
+            self.assertEqual(kept[0], 0)
+            self.assertEqual(kept[-1], len(x) - 1)
+            for first, last in zip(kept[:-1], kept[1:]):
+                distances = _segment_distances(x[first:last], y[first:last], x[first], y[first], x[last], y[last])
+                self.assertLessEqual(distances.max(), tolerance)
+
+    def test_collinear_points(self):
+        keep = rdp_mask(np.arange(10), 2 * np.arange(10), 0.0)
+        self.assertEqual(list(np.flatnonzero(keep)), [0, 9])
+        with self.assertRaises(ValueError):
+            rdp_mask([0, 1, 2], [0, 1, 0], -1)
+
+    def test_metrics_opt_in(self):
+        trace = _noisy_curve()
+        tolerance = 2.0
+        exact = auc(trace)['s'][0]
+        simplified = auc(trace, tolerance=tolerance)['s'][0]
+        self.assertLessEqual(abs(simplified[0] - exact[0]), tolerance)
+
+        exact_length = path(trace)['s'][0]['distance'].sum()
+        simplified_traces = path(trace, tolerance=tolerance)['s']
+        self.assertLess(len(simplified_traces[0]), len(trace))
+        self.assertLessEqual(simplified_traces[0]['distance'].sum(), exact_length)
+
+    def test_trace_set(self):
+        traces = extract_traces_by_session(process_csv(TestData.dataFile))
+        directory = tempfile.mkdtemp()
+        try:
+            trace_set = write_traces(traces, directory)
+            indices, offsets = trace_set.simplify(1.0)
+            self.assertEqual(len(offsets), trace_set.num_traces + 1)
+            expected = [trace for session_id in trace_set.sessions for trace in simplify_traces(traces, 1.0)[session_id]]
+            x = np.load(os.path.join(directory, 'x.npy'))
+            for i, trace in enumerate(expected):
+                np.testing.assert_array_equal(x[indices[offsets[i]:offsets[i + 1]]], trace['x'].to_numpy(dtype=float))
+        finally:
+            shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    unittest.main()
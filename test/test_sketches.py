@@ -0,0 +1,84 @@
+import unittest
+import sys
+import os
+import numpy as np
+sys.path.insert(0, os.path.dirname(__file__))
+from utils import process_csv, import_pyModule
+
+import_pyModule()
+
+from pywib import KLLSketch, velocity, velocity_metrics, pauses_metrics, merge_states, finalize_states
+
+DEBUG = True
+
+class TestData:
+    if(DEBUG):
+        dataFile = 'test/test_data/test_window_resize_error.csv'
+    else:
+        dataFile = 'pywib/test/test_data/test_window_resize_error.csv'
+
+    quantiles = [0.5, 0.95]
+
+
+class TestSketches(unittest.TestCase):
+
+    def setUp(self):
+        self.test_data = process_csv(TestData.dataFile)
+        self.values = np.random.default_rng(0).lognormal(size=100000)
+
+    def assert_rank_error(self, sketch, values, max_error):
+        for q, estimate in zip(TestData.quantiles, sketch.quantiles(TestData.quantiles)):
+            self.assertLessEqual(abs((values <= estimate).mean() - q), max_error)
+
+    def test_exact_below_sketch_size(self):
+        sketch = KLLSketch(k=200)
+        values = np.arange(1, 101, dtype=float)
+        sketch.update(values)
+        np.testing.assert_array_equal(sketch.quantiles([0, 0.5, 1]),
+                                      np.quantile(values, [0, 0.5, 1], method='inverted_cdf'))
+
+    def test_bounded_size_and_accuracy(self):
+        sketch = KLLSketch(k=200, seed=0)
+        for chunk in np.array_split(self.values, 100):
+            sketch.update(chunk)
+        self.assertEqual(len(sketch), len(self.values))
+        self.assertLessEqual(sketch.size, 3 * 200)
+        self.assert_rank_error(sketch, self.values, 0.02)
+
+    def test_merge(self):
+        first, second = KLLSketch(seed=0), KLLSketch(seed=1)
+        first.update(self.values[:30000])
+        second.update(self.values[30000:])
+        merged = first.merge(second)
+        self.assertEqual(len(merged), len(self.values))
+        self.assert_rank_error(merged, self.values, 0.02)
+
+    def test_empty_sketch(self):
+        self.assertTrue(np.isnan(KLLSketch().quantile(0.5)))
+
+    def test_metric_quantiles(self):
+        traces = velocity(self.test_data.copy(), per_traces=True)
+        metrics = velocity_metrics(None, traces, quantiles=TestData.quantiles)
+        for session_id, session_traces in traces.items():
+            values = np.concatenate([trace['velocity'][trace['velocity'] > 0] for trace in session_traces])
+            expected = np.quantile(values, TestData.quantiles, method='inverted_cdf')
+            np.testing.assert_allclose(list(metrics[session_id]['quantiles'].values()), expected)
+
+    def test_metric_quantiles_merge(self):
+        traces = velocity(self.test_data.copy(), per_traces=True)
+        first = {session_id: session_traces[:1] for session_id, session_traces in traces.items()}
+        second = {session_id: session_traces[1:] for session_id, session_traces in traces.items()}
+        merged = finalize_states(merge_states(velocity_metrics(None, first, as_state=True, quantiles=TestData.quantiles),
+                                              velocity_metrics(None, second, as_state=True, quantiles=TestData.quantiles)))
+        expected = velocity_metrics(None, traces, quantiles=TestData.quantiles)
+        for session_id in expected:
+            self.assertEqual(merged[session_id]['quantiles'], expected[session_id]['quantiles'])
+            self.assertAlmostEqual(merged[session_id]['mean'], expected[session_id]['mean'])
+
+    def test_pause_quantiles(self):
+        metrics = pauses_metrics(self.test_data.copy(), quantiles=[0.5])
+        for session in metrics.values():
+            self.assertEqual(session['pause_quantiles'][0.5], np.median(session['pause_durations']))
+
+if __name__ == '__main__':
+    unittest.main()
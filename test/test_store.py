@@ -0,0 +1,106 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import pandas as pd
+sys.path.insert(0, os.path.dirname(__file__))
+from utils import process_csv, import_pyModule
+
+import_pyModule()
+
+from pywib import FeatureStore, session_hashes, session_features
+
+try:
+    import pyarrow
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+DEBUG = True
+
+class TestData:
+    if(DEBUG):
+        dataFile = 'test/test_data/test_window_resize_error.csv'
+    else:
+        dataFile = 'pywib/test/test_data/test_window_resize_error.csv'
+
+    metrics = ['velocity_metrics', 'movement_time']
+
+
+class TestSessionHashes(unittest.TestCase):
+
+    def setUp(self):
+        self.test_data = process_csv(TestData.dataFile)
+
+    def test_independent_of_row_order(self):
+        shuffled = self.test_data.sample(frac=1, random_state=0)
+        pd.testing.assert_series_equal(session_hashes(shuffled).sort_index(), session_hashes(self.test_data).sort_index())
+
+    def test_changes_only_for_modified_session(self):
+        modified = self.test_data.copy()
+        session_id = modified['sessionId'].iloc[-1]
+        modified.loc[modified.index[-1], 'x'] += 1
+        before, after = session_hashes(self.test_data), session_hashes(modified)
+        for other in before.index:
+            self.assertEqual(before[other] == after[other], other != session_id)
+
+
+@unittest.skipUnless(HAS_PYARROW, "pyarrow is not installed")
+class TestFeatureStore(unittest.TestCase):
+
+    def setUp(self):
+        self.test_data = process_csv(TestData.dataFile)
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_only_changed_sessions_are_computed(self):
+        store = FeatureStore(self.directory, TestData.metrics)
+        self.assertEqual(store.update(self.test_data), {'new': 2, 'modified': 0, 'unchanged': 0, 'dropped': 0})
+        self.assertEqual(store.update(self.test_data), {'new': 0, 'modified': 0, 'unchanged': 2, 'dropped': 0})
+
+        modified = self.test_data.copy()
+        modified.loc[modified.index[-1], 'x'] += 10
+        reopened = FeatureStore(self.directory, TestData.metrics)
+        self.assertEqual(reopened.update(modified), {'new': 0, 'modified': 1, 'unchanged': 1, 'dropped': 0})
+        expected = session_features(modified, TestData.metrics)
+        pd.testing.assert_frame_equal(reopened.scan().drop(columns='date').sort_index(), expected.sort_index(), check_like=True)
+
+    def test_settings_change_recomputes(self):
+        FeatureStore(self.directory, TestData.metrics).update(self.test_data)
+        store = FeatureStore(self.directory, ['number_of_clicks'])
+        self.assertEqual(store.update(self.test_data)['modified'], 2)
+
+    def test_settings_change_keeps_one_schema_per_partition(self):
+        FeatureStore(self.directory, TestData.metrics).update(self.test_data)
+        store = FeatureStore(self.directory, ['number_of_clicks'])
+        session_id = self.test_data['sessionId'].iloc[0]
+        one_session = self.test_data[self.test_data['sessionId'] == session_id]
+        self.assertEqual(store.update(one_session), {'new': 0, 'modified': 1, 'unchanged': 0, 'dropped': 1})
+
+        # The session of the old metrics left the partition, it is new when its events come again
+        features = store.scan()
+        self.assertEqual(list(features.index), [session_id])
+        self.assertEqual(set(features.columns), {'number_of_clicks', 'date'})
+        self.assertEqual(len(store), 1)
+        self.assertEqual(store.update(self.test_data), {'new': 1, 'modified': 0, 'unchanged': 1, 'dropped': 0})
+
+    def test_lookups_and_scans(self):
+        store = FeatureStore(self.directory, TestData.metrics)
+        store.update(self.test_data)
+        expected = session_features(self.test_data, TestData.metrics)
+        session_id = expected.index[0]
+
+        self.assertIn(session_id, store)
+        self.assertAlmostEqual(store.get(session_id)['movement_time'], expected.loc[session_id, 'movement_time'])
+        self.assertIsNone(store.get('UNKNOWN'))
+        self.assertEqual(list(store.scan(sessions=[session_id]).index), [session_id])
+
+        date = store.sessions.loc[session_id, 'date']
+        self.assertEqual(len(store.scan(start=date)), len(expected))
+        self.assertTrue(store.scan(end=date).empty)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+import unittest
+import asyncio
+import sys
+import os
+import numpy as np
+sys.path.insert(0, os.path.dirname(__file__))
+from utils import process_csv, import_pyModule
+
+import_pyModule()
+
+from pywib import StreamPipeline, LocalEventSource, stream_metrics, velocity_metrics, pauses_metrics, number_of_clicks
+
+DEBUG = True
+
+class TestData:
+    if(DEBUG):
+        dataFile = 'test/test_data/test_window_resize_error.csv'
+    else:
+        dataFile = 'pywib/test/test_data/test_window_resize_error.csv'
+
+
+async def _collect(results):
+    return [result async for result in results]
+
+
+class TestStreaming(unittest.TestCase):
+
+    def setUp(self):
+        self.test_data = process_csv(TestData.dataFile)
+
+    def window_events(self, result):
+        df = self.test_data
+        return df[(df['sessionId'] == result['sessionId']) & (df['timeStamp'] >= result['start']) & (df['timeStamp'] < result['end'])]
+
+    def test_tumbling_windows_match_batch(self):
+        async def run():
+            source = LocalEventSource.from_dataframe(self.test_data, maxsize=4)
+            return await _collect(stream_metrics(source, metrics=['velocity_metrics', 'pauses_metrics', 'number_of_clicks'],
+                                                 window=200, max_pending=2))
+        results = asyncio.run(run())
+        self.assertGreater(len(results), 1)
+        self.assertEqual(sum(len(self.window_events(result)) for result in results), len(self.test_data))
+        for result in results:
+            events = self.window_events(result)
+            session_id = result['sessionId']
+            self.assertEqual(result['metrics']['number_of_clicks'], number_of_clicks(events.copy())[session_id])
+            self.assertEqual(result['metrics']['pauses_metrics'], pauses_metrics(events.copy())[session_id])
+            expected = velocity_metrics(events.copy())
+            if session_id in expected:
+                self.assertEqual(result['metrics']['velocity_metrics'], expected[session_id])
+
+    def test_sliding_windows(self):
+        async def run():
+            source = LocalEventSource.from_dataframe(self.test_data)
+            return await _collect(stream_metrics(source, metrics=['number_of_clicks'], window=500, step=100))
+        results = asyncio.run(run())
+        for result in results:
+            self.assertEqual(result['end'] - result['start'], 500)
+            self.assertEqual(result['start'] % 100, 0)
+            self.assertFalse(self.window_events(result).empty)
+        self.assertEqual(len({(result['sessionId'], result['start']) for result in results}), len(results))
+
+    def test_backpressure(self):
+        consumed = []
+
+        async def source():
+            for i in range(10000):
+                consumed.append(i)
+                yield {'sessionId': 'S', 'eventType': 0, 'timeStamp': i * 10.0, 'x': i, 'y': i}
+
+        async def run():
+            results = StreamPipeline(metrics=['movement_time'], window=100, max_pending=1).run(source())
+            await results.__anext__()
+            await asyncio.sleep(0.1)
+            read = len(consumed)
+            await results.aclose()
+            return read
+        # One window being computed, one waiting and the one being filled
+        self.assertLess(asyncio.run(run()), 50)
+
+    def test_late_events_are_dropped(self):
+        async def source():
+            for time_stamp in (0, 20, 10, 30):
+                yield {'sessionId': 'S', 'eventType': 0, 'timeStamp': time_stamp, 'x': time_stamp, 'y': 0}
+
+        pipeline = StreamPipeline(metrics=['movement_time'], window=1000)
+        results = asyncio.run(_collect(pipeline.run(source())))
+        self.assertEqual(pipeline.late_events, 1)
+        self.assertEqual(results[0]['metrics']['movement_time'], 30)
+
+    def test_quiet_session_is_closed_by_watermark(self):
+        pipeline = StreamPipeline(metrics=['number_of_clicks'], window=1000, allowed_lateness=500)
+
+        async def run():
+            # The source is never closed, like a live websocket
+            source = LocalEventSource()
+            results = pipeline.run(source)
+            for time_stamp in range(0, 1000, 100):
+                await source.send({'sessionId': 'A', 'eventType': 1, 'timeStamp': time_stamp, 'x': 0, 'y': 0})
+            emitted = []
+            for time_stamp in range(0, 5000, 100):
+                await source.send({'sessionId': 'B', 'eventType': 1, 'timeStamp': time_stamp, 'x': 0, 'y': 0})
+            while not any(result['sessionId'] == 'A' for result in emitted):
+                emitted.append(await asyncio.wait_for(results.__anext__(), 5))
+            await results.aclose()
+            return emitted
+
+        emitted = asyncio.run(run())
+        quiet = [result for result in emitted if result['sessionId'] == 'A']
+        self.assertEqual(quiet, [{'sessionId': 'A', 'start': 0, 'end': 1000, 'metrics': {'number_of_clicks': 10}}])
+        self.assertNotIn('A', pipeline._sessions)
+        self.assertIn('B', pipeline._sessions)
+        # A closes when the event of B at 1500 moves the watermark to the end of its window
+        self.assertEqual([result['end'] for result in emitted if result['sessionId'] == 'B'], [1000])
+
+    def test_idle_timeout_and_tracking_end(self):
+        pipeline = StreamPipeline(metrics=['number_of_clicks'], window=1000, idle_timeout=0.05)
+
+        async def run():
+            source = LocalEventSource()
+            results = pipeline.run(source)
+            await source.send({'sessionId': 'A', 'eventType': 1, 'timeStamp': 0, 'x': 0, 'y': 0})
+            idle = await asyncio.wait_for(results.__anext__(), 5)
+            await source.send({'sessionId': 'B', 'eventType': 1, 'timeStamp': 0, 'x': 0, 'y': 0})
+            await source.send({'sessionId': 'B', 'eventType': 200, 'timeStamp': 10, 'x': -1, 'y': -1})
+            ended = await asyncio.wait_for(results.__anext__(), 5)
+            await results.aclose()
+            return idle, ended
+
+        idle, ended = asyncio.run(run())
+        self.assertEqual((idle['sessionId'], idle['metrics']['number_of_clicks']), ('A', 1))
+        self.assertEqual((ended['sessionId'], ended['metrics']['number_of_clicks']), ('B', 1))
+        self.assertEqual(pipeline._sessions, {})
+
+    def test_invalid_record_raises(self):
+        async def source():
+            yield {'sessionId': 'S', 'timeStamp': 0}
+
+        with self.assertRaises(ValueError):
+            asyncio.run(_collect(stream_metrics(source())))
+
+if __name__ == '__main__':
+    unittest.main()
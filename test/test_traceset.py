@@ -0,0 +1,66 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import numpy as np
+sys.path.insert(0, os.path.dirname(__file__))
+from utils import process_csv, import_pyModule
+
+import_pyModule()
+
+from pywib import (TraceSet, write_traces, extract_traces_by_session, velocity, velocity_metrics, pauses_metrics,
+                   movement_time)
+
+DEBUG = True
+
+class TestData:
+    if(DEBUG):
+        dataFile = 'test/test_data/test_window_resize_error.csv'
+    else:
+        dataFile = 'pywib/test/test_data/test_window_resize_error.csv'
+
+
+def _movement_time(traces):
+    return movement_time(None, traces)
+
+
+class TestTraceSet(unittest.TestCase):
+
+    def setUp(self):
+        self.test_data = process_csv(TestData.dataFile)
+        self.directory = tempfile.mkdtemp()
+        self.trace_set = write_traces(extract_traces_by_session(self.test_data), self.directory)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_round_trip(self):
+        expected = extract_traces_by_session(self.test_data)
+        traces = TraceSet(self.directory).to_traces()
+        self.assertEqual(list(traces.keys()), list(expected.keys()))
+        for session_id, session_traces in expected.items():
+            self.assertEqual(len(traces[session_id]), len(session_traces))
+            for trace, original in zip(traces[session_id], session_traces):
+                for column in ('x', 'y', 'timeStamp', 'eventType'):
+                    np.testing.assert_array_equal(trace[column].to_numpy(), original[column].to_numpy())
+
+    def test_metrics_over_trace_set(self):
+        traces = self.trace_set.to_traces()
+        self.assertEqual(velocity_metrics(None, velocity(None, traces)), velocity_metrics(self.test_data.copy()))
+        self.assertEqual(pauses_metrics(None, traces=traces), pauses_metrics(self.test_data.copy()))
+
+    def test_memory_mapped_arrays(self):
+        session_id = self.trace_set.sessions[0]
+        arrays = self.trace_set.arrays(session_id)
+        self.assertIsInstance(self.trace_set._columns['x'], np.memmap)
+        self.assertFalse(arrays['x'].flags.writeable)
+        self.assertEqual(arrays['offsets'][-1], len(arrays['x']))
+        self.assertEqual(len(arrays['offsets']) - 1, len(self.trace_set.session_traces(session_id)))
+
+    def test_parallel_map(self):
+        expected = movement_time(self.test_data.copy())
+        self.assertEqual(self.trace_set.map(_movement_time, n_jobs=2, batch_size=1), expected)
+
+if __name__ == '__main__':
+    unittest.main()
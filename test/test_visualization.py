@@ -0,0 +1,109 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+import cv2
+sys.path.insert(0, os.path.dirname(__file__))
+from utils import process_csv, import_pyModule
+
+import_pyModule()
+
+from pywib import (replay_frames, replay_session, video_from_trace, render_traces, render_sessions,
+                   extract_traces_by_session)
+
+DEBUG = True
+
+class TestData:
+    if(DEBUG):
+        dataFile = 'test/test_data/test_window_resize_error.csv'
+    else:
+        dataFile = 'pywib/test/test_data/test_window_resize_error.csv'
+
+
+class _FrameRecorder:
+    """
+    Stand-in for cv2.VideoWriter that keeps the written frames.
+    """
+    frames = []
+
+    def __init__(self, *args):
+        _FrameRecorder.frames = []
+
+    def write(self, frame):
+        _FrameRecorder.frames.append(frame.copy())
+
+    def release(self):
+        pass
+
+
+class TestReplay(unittest.TestCase):
+
+    def setUp(self):
+        self.test_data = process_csv(TestData.dataFile)
+        self.test_data['timeStamp'] = pd.to_numeric(self.test_data['timeStamp'])
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_frames_follow_timestamps(self):
+        session = self.test_data[self.test_data['sessionId'] == 'SESSION_A']
+        duration = session['timeStamp'].max() - session['timeStamp'].min()
+        for fps, speed in ((30, 1.0), (10, 4.0)):
+            frames = sum(1 for _ in replay_frames(self.test_data, 'SESSION_A', fps=fps, speed=speed))
+            self.assertEqual(frames, int(duration * fps / (1000 * speed)) + 1)
+
+    def test_same_drawing_as_video_from_trace(self):
+        original = cv2.VideoWriter
+        cv2.VideoWriter = _FrameRecorder
+        try:
+            video_from_trace(self.test_data, 'SESSION_A', os.path.join(self.directory, 'a.mp4'), width=1200, height=1100)
+        finally:
+            cv2.VideoWriter = original
+        last = None
+        for frame in replay_frames(self.test_data, 'SESSION_A', width=1200, height=1100):
+            last = frame
+        np.testing.assert_array_equal(last, _FrameRecorder.frames[-1])
+
+    def test_replay_session(self):
+        outfile = os.path.join(self.directory, 'replay.mp4')
+        frames = replay_session(self.test_data, 'SESSION_B', outfile, fps=10, speed=2.0)
+        capture = cv2.VideoCapture(outfile)
+        self.assertEqual(int(capture.get(cv2.CAP_PROP_FRAME_COUNT)), frames)
+        capture.release()
+        with self.assertRaises(ValueError):
+            replay_session(self.test_data, 'SESSION_C', outfile)
+
+
+class TestBatchRendering(unittest.TestCase):
+
+    def setUp(self):
+        self.test_data = process_csv(TestData.dataFile)
+        self.test_data['timeStamp'] = pd.to_numeric(self.test_data['timeStamp'])
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_render_traces(self):
+        traces = extract_traces_by_session(self.test_data)
+        expected = sorted(f"{session_id}_{i}.png" for session_id, session_traces in traces.items()
+                          for i in range(len(session_traces)))
+        for n_jobs in (1, 2):
+            directory = os.path.join(self.directory, str(n_jobs))
+            stats = render_traces(traces, directory, n_jobs=n_jobs, batch_size=2, show_info=True)
+            self.assertEqual(stats['rendered'], len(expected))
+            self.assertEqual(sorted(os.listdir(directory)), expected)
+            self.assertGreater(stats['per_second'], 0)
+
+    def test_render_sessions(self):
+        stats = render_sessions(self.test_data, self.directory, n_jobs=2, batch_size=1, fps=5, speed=4.0)
+        self.assertEqual(stats['rendered'], 2)
+        self.assertEqual(sorted(os.listdir(self.directory)), ['SESSION_A.mp4', 'SESSION_B.mp4'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+import sys
+import os
+import pandas as pd
+sys.path.insert(0, os.path.dirname(__file__))
+from utils import process_csv, import_pyModule
+
+import_pyModule()
+
+from pywib import (SessionIndex, velocity_metrics, pauses_metrics, number_of_clicks, execution_time, path,
+                   extract_traces_by_session)
+
+DEBUG = True
+
+class TestData:
+    if(DEBUG):
+        dataFile = 'test/test_data/test_window_resize_error.csv'
+    else:
+        dataFile = 'pywib/test/test_data/test_window_resize_error.csv'
+
+
+class TestSessionIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.test_data = process_csv(TestData.dataFile)
+        self.test_data['timeStamp'] = pd.to_numeric(self.test_data['timeStamp'])
+        self.index = SessionIndex(self.test_data)
+        start = self.test_data['timeStamp'].min()
+        self.windows = [('SESSION_A', start, start + 6000), ('SESSION_B', start + 2500, start + 10000),
+                        ('SESSION_A', None, None)]
+
+    def _mask(self, session_id, t_start, t_end):
+        df = self.test_data
+        mask = df['sessionId'] == session_id
+        if t_start is not None:
+            mask &= df['timeStamp'] >= t_start
+        if t_end is not None:
+            mask &= df['timeStamp'] < t_end
+        return df[mask]
+
+    def test_slice_matches_mask(self):
+        self.assertEqual(sorted(self.index.sessions), ['SESSION_A', 'SESSION_B'])
+        for window in self.windows:
+            events = self.index.slice(*window)
+            expected = self._mask(*window)
+            self.assertEqual(len(events), len(expected))
+            self.assertTrue(events['timeStamp'].is_monotonic_increasing)
+            self.assertTrue((events['sessionId'] == window[0]).all())
+        with self.assertRaises(KeyError):
+            self.index.slice('SESSION_C')
+
+    def test_metrics_accept_windows(self):
+        for metric in (velocity_metrics, pauses_metrics, number_of_clicks, execution_time):
+            results = metric(self.index, windows=self.windows)
+            self.assertEqual(list(results), self.windows)
+            for window in self.windows:
+                expected = metric(self._mask(*window).copy()).get(window[0])
+                self.assertEqual(results[window], expected)
+
+    def test_empty_window(self):
+        results = number_of_clicks(self.test_data, windows=[('SESSION_A', 0, 1)])
+        self.assertEqual(results, {('SESSION_A', 0, 1): None})
+
+    def test_windows_with_traces(self):
+        with self.assertRaises(ValueError):
+            velocity_metrics(self.test_data, traces={}, windows=self.windows)
+        traces = extract_traces_by_session(self.test_data)
+        with self.assertRaises(ValueError):
+            velocity_metrics(self.test_data, traces, windows=self.windows)
+        with self.assertRaises(ValueError):
+            path(self.test_data, traces, windows=self.windows)
+        with self.assertRaises(ValueError):
+            path(SessionIndex(self.test_data), traces, None, windows=self.windows)
+
+
+if __name__ == '__main__':
+    unittest.main()